@@ -0,0 +1,131 @@
+# benchmarks/bench_autocompletar.py
+# Índices de autocompletado (citador.autocompletar): que no se carguen al
+# importar, cuánto cuesta armarlos, y la latencia por búsqueda en los datos
+# incluidos y en índices sintéticos de decenas de miles de entradas (leyes
+# con nombres largos y autores), con prefijos de 1 a 12 letras, desde el
+# comienzo o desde una palabra interior.
+#
+# Falla si `import citador` arrastra el módulo, si importarlo lee los datos o
+# si el p99 de las búsquedas supera --presupuesto-us.
+#
+#   python benchmarks/bench_autocompletar.py [--n 50000] [--autores 20000] [--presupuesto-us 1000]
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import datos_sinteticos  # noqa: E402
+from citador import autocompletar  # noqa: E402
+
+SONDA = """
+import sys, time
+import citador
+sin_modulo = 'citador.autocompletar' not in sys.modules
+t0 = time.perf_counter()
+from citador import autocompletar
+dt = time.perf_counter() - t0
+print(int(sin_modulo), int(not autocompletar._cargados), dt * 1000.0)
+"""
+
+_SILABAS = ["ba", "ca", "de", "fi", "go", "lu", "ma", "ne", "ño", "pa", "que", "ri", "sa", "tu", "va", "za",
+            "ber", "cor", "dan", "gal", "lor", "mon", "rro", "ste"]
+
+
+def _perezoso():
+    out = subprocess.run([sys.executable, "-c", SONDA], cwd=RAIZ, capture_output=True, text=True,
+                         check=True).stdout.split()
+    return out[0] == "1", out[1] == "1", float(out[2])
+
+def _leyes(r, n):
+    for _ in range(n):
+        numero = f"{r.randint(1, 21999):,}".replace(",", ".")
+        nombre = datos_sinteticos._titulo(r, 4, 14)
+        yield f"Ley N° {numero}, {nombre}", {"tipo_norma": "Ley", "numero": numero, "nombre_norma": nombre}
+
+def _apellido(r):
+    return "".join(r.choice(_SILABAS) for _ in range(r.randint(2, 4))).capitalize()
+
+def _autores(r, n):
+    for _ in range(n):
+        yield {"autores": [{"apellido1": _apellido(r), "apellido2": r.choice(datos_sinteticos.APELLIDOS),
+                            "nombre": r.choice(datos_sinteticos.NOMBRES)}]}
+
+def _consultas(r, indice, n):
+    """Prefijos de entradas reales: desde el comienzo o desde una palabra, de 1 a 12 letras."""
+    entradas = indice._entradas
+    consultas = []
+    for _ in range(n):
+        palabras = r.choice(entradas).texto.split()
+        texto = " ".join(palabras[r.randrange(len(palabras)):]) if r.random() < 0.5 else " ".join(palabras)
+        consultas.append(texto[:r.randint(1, 12)])
+    return consultas
+
+def _percentil(ordenados, q):
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+def medir_busquedas(nombre, indice, consultas):
+    tiempos = []
+    for q in consultas:
+        t0 = time.perf_counter()
+        indice.buscar(q)
+        tiempos.append(time.perf_counter() - t0)
+    tiempos.sort()
+    p50, p99 = _percentil(tiempos, .5), _percentil(tiempos, .99)
+    print(f"  {nombre:<28} {len(indice):>7,} entradas {len(indice._claves):>8,} claves   "
+          f"p50 {p50 * 1e6:6.1f} µs  p99 {p99 * 1e6:6.1f} µs  máx {tiempos[-1] * 1e6:7.1f} µs")
+    return p99
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Latencia de los índices de autocompletado")
+    p.add_argument("--n", type=int, default=50000, help="leyes sintéticas")
+    p.add_argument("--autores", type=int, default=20000, help="autores sintéticos")
+    p.add_argument("--consultas", type=int, default=20000)
+    p.add_argument("--presupuesto-us", type=float, default=1000.0, help="p99 máximo por búsqueda")
+    p.add_argument("--seed", type=int, default=2025)
+    args = p.parse_args(argv)
+    r = random.Random(args.seed)
+    ok = True
+
+    sin_modulo, sin_datos, ms = _perezoso()
+    print(f"import citador sin autocompletar: {sin_modulo}; importarlo no lee datos: {sin_datos} ({ms:.2f} ms)")
+    ok &= sin_modulo and sin_datos
+
+    print("armado:")
+    p99s = []
+    incluidos = {}
+    for nombre in autocompletar.CARGADORES:
+        t0 = time.perf_counter()
+        incluidos[nombre] = autocompletar.indice(nombre)
+        print(f"  {nombre:<28} {(time.perf_counter() - t0) * 1000:8.2f} ms")
+
+    t0 = time.perf_counter()
+    leyes = autocompletar.IndicePrefijos(_leyes(r, args.n))
+    print(f"  {'leyes sintéticas':<28} {(time.perf_counter() - t0) * 1000:8.2f} ms")
+    t0 = time.perf_counter()
+    autores = autocompletar.IndicePrefijos()
+    autocompletar.agregar_autores(autores, _autores(r, args.autores))
+    print(f"  {'autores sintéticos (lote)':<28} {(time.perf_counter() - t0) * 1000:8.2f} ms")
+    # Como en la UI: una cita a la vez sobre un índice ya grande
+    nuevas = list(_autores(r, 200))
+    t0 = time.perf_counter()
+    for datos in nuevas:
+        autocompletar.agregar_autores(autores, [datos])
+    print(f"  {'autores, de a uno':<28} {(time.perf_counter() - t0) / len(nuevas) * 1e6:8.1f} µs por cita")
+
+    print("búsquedas:")
+    for nombre, indice in [*incluidos.items(), ("leyes sintéticas", leyes), ("autores sintéticos", autores)]:
+        p99s.append(medir_busquedas(nombre, indice, _consultas(r, indice, args.consultas)))
+
+    peor = max(p99s)
+    if peor * 1e6 > args.presupuesto_us:
+        print(f"ERROR: p99 de {peor * 1e6:.0f} µs supera el presupuesto de {args.presupuesto_us:.0f} µs")
+        ok = False
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+# benchmarks/bench_bibliografia.py
+# Arma una bibliografía sintética grande (por defecto 50k entradas, con muchos
+# autores repetidos en el mismo año) y mide el tiempo total: formateo,
+# desambiguación 2020a/2020b y orden. Verifica además que ninguna cita
+# abreviada quede repetida.
+#
+#   python benchmarks/bench_bibliografia.py [--n 50000]
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citador.bibliografia import construir_bibliografia  # noqa: E402
+from citador.texto import plegar  # noqa: E402
+
+_APELLIDOS = ["Pérez", "González", "Muñoz", "Núñez", "Ñuñez", "Rojas", "Díaz", "Soto", "Silva",
+              "Martínez", "Sepúlveda", "Morales", "Rodríguez", "López", "Álvarez", "Ibáñez",
+              "Fuentes", "Hernández", "Torres", "Araya", "Valenzuela", "Castillo", "Reyes"]
+_NOMBRES = ["Ana", "Juan", "María", "Pedro", "Óscar", "Elena"]
+_PALABRAS = ["derecho", "civil", "penal", "constitucional", "tratado", "manual", "teoría", "general",
+             "obligaciones", "contratos", "responsabilidad", "procesal", "administrativo", "chileno"]
+
+
+def corpus(n, seed=5):
+    r = random.Random(seed)
+    registros = []
+    for _ in range(n):
+        autores = [{"apellido1": r.choice(_APELLIDOS), "apellido2": r.choice(["", "", r.choice(_APELLIDOS)]),
+                    "nombre": r.choice(_NOMBRES)} for _ in range(r.choice([1, 1, 1, 2, 3]))]
+        titulo = " ".join(r.sample(_PALABRAS, r.randint(2, 5))).capitalize()
+        año = str(r.randint(1990, 2025))
+        if r.random() < 0.7:
+            registros.append(("Libro", {"autores": autores, "año": año, "titulo": titulo,
+                                        "ciudad": "Santiago", "editorial": "Editorial Jurídica"}, False))
+        else:
+            registros.append(("Artículo de revista", {"autores": autores, "año": año, "titulo": titulo,
+                                                      "revista": "Revista Chilena de Derecho",
+                                                      "volumen": str(r.randint(1, 50))}, False))
+    return registros
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark del armado de bibliografías")
+    p.add_argument("--n", type=int, default=50000)
+    args = p.parse_args(argv)
+
+    registros = corpus(args.n)
+    t0 = time.perf_counter()
+    bib = construir_bibliografia(registros)
+    dt = time.perf_counter() - t0
+
+    repetidas = sum(c - 1 for c in Counter(plegar(e.cita) for e in bib).values() if c > 1)
+    print(f"{len(registros)} registros -> {len(bib)} entradas en {dt:.2f} s "
+          f"({len(registros) / dt:,.0f} registros/s)")
+    print(f"con sufijo: {sum(1 for e in bib if e.sufijo)}; citas abreviadas repetidas: {repetidas}")
+    return 1 if repetidas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# benchmarks/bench_cache_disco.py
+# Reconstrucción incremental de la bibliografía con la caché en disco
+# (citador.cache_disco): --n registros sintéticos se arman sin caché, con la
+# caché vacía, de nuevo sin cambios, con --cambios de los registros
+# modificados y con otra versión del formateador (todo fallos). Informa el
+# tiempo de cada corrida, aciertos y fallos, y los bytes leídos y escritos.
+#
+# Falla si alguna corrida con caché no da la misma bibliografía que sin ella,
+# o si la reconstrucción sin cambios no es más rápida que armarla sin caché.
+#
+#   python benchmarks/bench_cache_disco.py [--n 100000] [--cambios 0.01]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import datos_sinteticos  # noqa: E402
+from citador import cache_disco  # noqa: E402
+from citador.bibliografia import construir_bibliografia  # noqa: E402
+
+
+def _modificados(registros, fraccion, seed):
+    """Copia de registros con una fracción de ellos cambiada (año o título)."""
+    r = random.Random(seed)
+    salida = list(registros)
+    for i in r.sample(range(len(salida)), int(len(salida) * fraccion)):
+        tipo, datos, libro_y_otros = salida[i]
+        datos = dict(datos)
+        campo = "titulo" if datos.get("titulo") else "año"
+        datos[campo] = f"{datos.get(campo, '')} (rev.)"
+        salida[i] = (tipo, datos, libro_y_otros)
+    return salida
+
+def _sin_cache(registros, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        bibliografia = construir_bibliografia(registros)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, bibliografia
+
+def _con_cache(ruta, registros):
+    with cache_disco.CacheDisco(ruta) as cache:
+        t0 = time.perf_counter()
+        bibliografia = construir_bibliografia(registros, cache=cache)
+        dt = time.perf_counter() - t0
+        cache.podar()
+        return dt, bibliografia, cache.estadisticas()
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Reconstrucción incremental con la caché en disco")
+    p.add_argument("--n", type=int, default=100000)
+    p.add_argument("--cambios", type=float, default=0.01, help="fracción de registros modificados")
+    p.add_argument("--repeticiones", type=int, default=3, help="corridas sin cambios (se toma la mejor)")
+    p.add_argument("--seed", type=int, default=2025)
+    args = p.parse_args(argv)
+    registros = [(f["tipo"], f["datos"], False) for f in datos_sinteticos.filas(args.n, seed=args.seed)]
+    modificados = _modificados(registros, args.cambios, args.seed)
+
+    base, esperada = _sin_cache(registros, args.repeticiones)
+    base_mod, esperada_mod = _sin_cache(modificados, 1)
+    print(f"{args.n:,} registros; sin caché {base:.2f} s (con {args.cambios:.0%} cambiados {base_mod:.2f} s)")
+    print(f"{'corrida':<34} {'s':>7} {'x':>6} {'aciertos':>9} {'fallos':>8} {'leídos MB':>10} {'escritos MB':>12}")
+    ok = True
+    with tempfile.TemporaryDirectory() as d:
+        ruta = os.path.join(d, "bibliografia.cache")
+
+        def corrida(nombre, regs, esperada_aqui, referencia):
+            nonlocal ok
+            dt, bibliografia, e = _con_cache(ruta, regs)
+            igual = bibliografia == esperada_aqui
+            ok &= igual
+            print(f"{nombre:<34} {dt:7.2f} {referencia / dt:6.2f} {e['aciertos']:>9,} {e['fallos']:>8,} "
+                  f"{e['bytes_leidos'] / 2**20:10.1f} {e['bytes_escritos'] / 2**20:12.1f}"
+                  + ("" if igual else "  DISTINTA"))
+            return dt
+
+        corrida("caché vacía", registros, esperada, base)
+        sin_cambios = min(corrida("sin cambios", registros, esperada, base) for _ in range(args.repeticiones))
+        corrida(f"{args.cambios:.0%} cambiados", modificados, esperada_mod, base_mod)
+        # Otra versión del formateador: las entradas anteriores no sirven y podar() las borra
+        cache_disco._version = None
+        version = cache_disco.version_formateador()
+        cache_disco._version = version[::-1]
+        try:
+            corrida("otra versión del formateador", modificados, esperada_mod, base_mod)
+        finally:
+            cache_disco._version = version
+        with cache_disco.CacheDisco(ruta, nueva_corrida=False) as cache:
+            print(cache.informe())
+
+    if sin_cambios >= base:
+        print(f"ERROR: sin cambios tardó {sin_cambios:.2f} s, sin caché {base:.2f} s")
+        ok = False
+    if not ok:
+        print("ERROR: la bibliografía con caché no es igual a la armada sin ella")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# benchmarks/bench_columnar.py
+# Modo columnar (citador.columnar) contra el camino por filas de
+# `python -m citador formatear`, en serie, sobre --n registros sintéticos
+# escritos como CSV plano (autores 'Apellido1|Apellido2|Nombre; ...') y como
+# Parquet (autores como lista de structs). Informa registros/s de cada camino
+# y compara fila a fila referencia, cita y error (una suma CRC32 por fila, así
+# no se guardan las salidas de un millón de registros).
+#
+# Falla si alguna fila difiere o si falta pyarrow.
+#
+#   python benchmarks/bench_columnar.py [--n 1000000] [--tam-lote 65536]
+import argparse
+import array
+import csv
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import datos_sinteticos  # noqa: E402
+from citador import columnar, lotes  # noqa: E402
+from citador.registros import CLASES  # noqa: E402
+from citador.render import a_texto  # noqa: E402
+
+# Columnas planas: el campo 'tipo' de Decreto / Oficio va como 'tipo_documento'
+COLUMNAS = sorted({"tipo_documento" if c.nombre == "tipo" else c.nombre for cl in CLASES.values() for c in cl.campos}
+                  | {"tipo"})
+AUTORES = sorted({c.nombre for cl in CLASES.values() for c in cl.campos if c.tipo == "autores"})
+
+
+def _plana(fila, autores_como_texto):
+    plana = {"tipo": fila["tipo"]}
+    for k, v in fila["datos"].items():
+        k = "tipo_documento" if k == "tipo" else k
+        if isinstance(v, list) and autores_como_texto:
+            v = "; ".join(f"{a['apellido1']}|{a['apellido2']}|{a['nombre']}" for a in v)
+        plana[k] = v
+    return plana
+
+def escribir_entradas(n, directorio, tam_lote):
+    """Escribe los mismos n registros en entrada.csv y entrada.parquet; devuelve ambas rutas."""
+    pa = columnar._pyarrow()
+    autor = pa.struct([(c, pa.string()) for c in ("apellido1", "apellido2", "nombre")])
+    esquema = pa.schema([(c, pa.list_(autor) if c in AUTORES else pa.string()) for c in COLUMNAS])
+    ruta_csv, ruta_parquet = os.path.join(directorio, "entrada.csv"), os.path.join(directorio, "entrada.parquet")
+    with open(ruta_csv, "w", encoding="utf-8", newline="") as f, pa.parquet.ParquetWriter(ruta_parquet, esquema) as pq:
+        w = csv.DictWriter(f, COLUMNAS)
+        w.writeheader()
+        bloque = []
+        for fila in datos_sinteticos.filas(n):
+            w.writerow(_plana(fila, True))
+            bloque.append(_plana(fila, False))
+            if len(bloque) == tam_lote:
+                pq.write_table(pa.Table.from_pylist(bloque, schema=esquema))
+                bloque = []
+        if bloque:
+            pq.write_table(pa.Table.from_pylist(bloque, schema=esquema))
+    return ruta_csv, ruta_parquet
+
+def _crc(tipo, referencia, cita, error):
+    return zlib.crc32("\x1f".join(v if v is not None else "\x00" for v in (tipo, referencia, cita, error)).encode())
+
+def por_filas(ruta):
+    """El camino de `formatear` en serie; devuelve (segundos, CRC por fila)."""
+    crcs = array.array("I")
+    t0 = time.perf_counter()
+    with open(ruta, encoding="utf-8-sig", newline="") as f:
+        for r in lotes.formatear_filas(lotes.leer_filas(f, "csv")):
+            crcs.append(_crc(r.tipo, a_texto(r.runs) if r.runs is not None else None, r.cita, r.error))
+    return time.perf_counter() - t0, crcs
+
+def por_columnas(entrada, salida, tam_lote):
+    """formatear_archivo; la salida se lee después, fuera del tiempo medido."""
+    pa = columnar._pyarrow()
+    t0 = time.perf_counter()
+    columnar.formatear_archivo(entrada, salida, tam_lote=tam_lote)
+    dt = time.perf_counter() - t0
+    crcs = array.array("I")
+    for lote in pa.parquet.ParquetFile(salida).iter_batches(columns=["tipo", "referencia", "cita", "error"]):
+        crcs.extend(map(_crc, *(lote.column(i).to_pylist() for i in range(4))))
+    return dt, crcs
+
+def _distintas(a, b):
+    return sum(x != y for x, y in zip(a, b)) + abs(len(a) - len(b))
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Modo columnar vs formateo por filas")
+    p.add_argument("--n", type=int, default=1000000)
+    p.add_argument("--tam-lote", type=int, default=columnar.TAM_LOTE)
+    args = p.parse_args(argv)
+    try:
+        columnar._pyarrow()
+    except ImportError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    with tempfile.TemporaryDirectory() as d:
+        t0 = time.perf_counter()
+        ruta_csv, ruta_parquet = escribir_entradas(args.n, d, args.tam_lote)
+        print(f"{args.n:,} registros escritos en {time.perf_counter() - t0:.1f} s "
+              f"(CSV {os.path.getsize(ruta_csv) / 2**20:.0f} MB, Parquet {os.path.getsize(ruta_parquet) / 2**20:.0f} MB)")
+
+        base, esperados = por_filas(ruta_csv)
+        print(f"{'por filas (CSV)':<24} {base:8.2f} s {args.n / base:>10,.0f} registros/s")
+        ok = True
+        for nombre, entrada in (("columnar (CSV)", ruta_csv), ("columnar (Parquet)", ruta_parquet)):
+            dt, crcs = por_columnas(entrada, os.path.join(d, "salida.parquet"), args.tam_lote)
+            distintas = _distintas(esperados, crcs)
+            ok &= not distintas
+            print(f"{nombre:<24} {dt:8.2f} s {args.n / dt:>10,.0f} registros/s  x{base / dt:.2f}  "
+                  f"{distintas} filas distintas")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# benchmarks/bench_duplicados.py
+# Detección de duplicados sobre un corpus sintético (por defecto 100k
+# registros) con variantes conocidas inyectadas: tildes, mayúsculas,
+# "Editorial" sí/no, "2ª" vs "segunda" edición y pequeñas erratas. Informa
+# tiempo, grupos encontrados y precisión/exhaustividad contra la verdad.
+#
+#   python benchmarks/bench_duplicados.py [--n 100000] [--tasa-dup 0.05]
+import argparse
+import os
+import random
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citador.duplicados import detectar_duplicados  # noqa: E402
+
+_APELLIDOS = ["Pérez", "González", "Muñoz", "Rojas", "Díaz", "Soto", "Contreras", "Silva", "Martínez",
+              "Sepúlveda", "Morales", "Rodríguez", "López", "Fuentes", "Hernández", "Torres", "Araya",
+              "Flores", "Espinoza", "Valenzuela", "Castillo", "Tapia", "Reyes", "Gutiérrez", "Castro"]
+_PALABRAS = ["derecho", "civil", "penal", "constitucional", "tratado", "manual", "teoría", "general",
+             "obligaciones", "contratos", "responsabilidad", "procesal", "administrativo", "chileno",
+             "estudios", "historia", "fuentes", "principios", "sistema", "análisis", "crítico", "reforma",
+             "justicia", "tribunales", "propiedad", "familia", "sucesiones", "bienes", "acto", "jurídico"]
+_EDITORIALES = ["Editorial Jurídica de Chile", "Thomson Reuters", "Ediciones UC", "Editorial Tirant lo Blanch",
+                "Der Ediciones", "Editorial Librotecnia"]
+_ED_VARIANTES = {"2": ["2", "2ª", "segunda", "Segunda edición"], "3": ["3", "3ª", "tercera"], "": [""]}
+
+
+def _sin_tildes(t):
+    return "".join(c for c in unicodedata.normalize("NFD", t) if not unicodedata.combining(c))
+
+def _variante(r, d):
+    d = dict(d)
+    d['autores'] = [dict(a) for a in d['autores']]
+    cambio = r.randrange(4)
+    if cambio == 0:
+        d['titulo'] = _sin_tildes(d['titulo']).upper()
+        d['autores'][0]['apellido1'] = _sin_tildes(d['autores'][0]['apellido1'])
+    elif cambio == 1:
+        d['editorial'] = d['editorial'].replace("Editorial ", "").replace("Ediciones ", "")
+    elif cambio == 2:
+        d['edicion'] = r.choice(_ED_VARIANTES[d['edicion_base']])
+    else:
+        t = d['titulo']
+        i = r.randrange(1, len(t) - 1)
+        d['titulo'] = t[:i] + t[i + 1:]   # errata: falta una letra
+    return d
+
+def corpus(n, tasa_dup, seed=11):
+    r = random.Random(seed)
+    registros, verdad = [], []
+    i = 0
+    while len(registros) < n:
+        ed = r.choice(["", "", "2", "3"])
+        base = {
+            'autores': [{'apellido1': r.choice(_APELLIDOS), 'apellido2': r.choice(_APELLIDOS), 'nombre': "Ana"}],
+            'año': str(r.randint(1960, 2025)),
+            'titulo': " ".join(r.sample(_PALABRAS, r.randint(3, 6))).capitalize(),
+            'editorial': r.choice(_EDITORIALES), 'ciudad': "Santiago",
+            'edicion': r.choice(_ED_VARIANTES[ed]), 'edicion_base': ed,
+        }
+        grupo = [i]
+        registros.append((i, "Libro", base))
+        i += 1
+        if r.random() < tasa_dup:
+            for _ in range(r.randint(1, 2)):
+                registros.append((i, "Libro", _variante(r, base)))
+                grupo.append(i)
+                i += 1
+        verdad.append(grupo)
+    return registros[:n], [g for g in verdad if len(g) > 1 and g[-1] < n]
+
+def _pares(grupos):
+    pares = set()
+    for g in grupos:
+        for a in range(len(g)):
+            for b in range(a + 1, len(g)):
+                pares.add((min(g[a], g[b]), max(g[a], g[b])))
+    return pares
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark de detección de duplicados")
+    p.add_argument("--n", type=int, default=100000)
+    p.add_argument("--tasa-dup", type=float, default=0.05)
+    args = p.parse_args(argv)
+
+    registros, verdad = corpus(args.n, args.tasa_dup)
+    t0 = time.perf_counter()
+    grupos = detectar_duplicados(registros)
+    dt = time.perf_counter() - t0
+
+    esperados, hallados = _pares(verdad), _pares([g.miembros for g in grupos])
+    ok = len(esperados & hallados)
+    print(f"{len(registros)} registros en {dt:.2f} s ({len(registros) / dt:,.0f} registros/s)")
+    print(f"grupos: {len(grupos)} encontrados, {len(verdad)} inyectados")
+    print(f"pares: precisión {ok / max(1, len(hallados)):.3f}, exhaustividad {ok / max(1, len(esperados)):.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
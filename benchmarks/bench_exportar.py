@@ -0,0 +1,87 @@
+# benchmarks/bench_exportar.py
+# Exportación a DOCX, RTF y HTML de --n referencias generadas al vuelo (libros,
+# artículos y capítulos sintéticos). Informa entradas/s, tamaño del archivo y
+# el pico de memoria de Python (tracemalloc) del exportador, que debe
+# ser el mismo con --n que con --n / 10: la salida se escribe en streaming.
+#
+#   python benchmarks/bench_exportar.py [--n 30000] [--formato docx]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citador import generar_runs  # noqa: E402
+from citador.exportar import EXPORTADORES, abrir_salida, exportar  # noqa: E402
+
+_APELLIDOS = ["Pérez", "González", "Muñoz", "Núñez", "Rojas", "Díaz", "Soto", "de la Fuente", "Ibáñez"]
+_NOMBRES = ["Ana", "Juan", "María José", "Pedro", "Óscar"]
+_PALABRAS = ["derecho", "civil", "penal", "constitucional", "tratado", "manual", "teoría", "general",
+             "obligaciones", "contratos", "responsabilidad", "procesal", "administrativo", "chileno"]
+
+
+def referencias(n, seed=5):
+    """Genera los runs de n referencias de a una."""
+    r = random.Random(seed)
+    for _ in range(n):
+        autores = [{"apellido1": r.choice(_APELLIDOS), "apellido2": r.choice(["", "Soto"]),
+                    "nombre": r.choice(_NOMBRES)} for _ in range(r.randint(1, 3))]
+        titulo = " ".join(r.sample(_PALABRAS, r.randint(3, 6))).capitalize()
+        año = str(r.randint(1960, 2025))
+        tipo = r.choice(["Libro", "Artículo de revista", "Capítulo de libro"])
+        if tipo == "Libro":
+            datos = {"autores": autores, "año": año, "titulo": titulo, "ciudad": "Santiago",
+                     "editorial": "Editorial Jurídica de Chile"}
+        elif tipo == "Artículo de revista":
+            datos = {"autores": autores, "año": año, "titulo": titulo,
+                     "revista": "Revista Chilena de Derecho", "volumen": str(r.randint(1, 50)),
+                     "numero": str(r.randint(1, 3)), "paginas": f"{r.randint(1, 200)}-{r.randint(201, 400)}"}
+        else:
+            datos = {"autor_capitulo": autores, "editores": autores[:1], "año": año, "titulo_capitulo": titulo,
+                     "titulo_libro": "Estudios de derecho", "ciudad": "Santiago", "editorial": "Thomson Reuters",
+                     "paginas": f"{r.randint(1, 200)}-{r.randint(201, 400)}"}
+        yield generar_runs(tipo, datos)[0]
+
+def medir(formato, n, ruta):
+    with abrir_salida(ruta, formato) as f:
+        t0 = time.perf_counter()
+        escritas = exportar(referencias(n), f, formato, titulo="Bibliografía")
+        dt = time.perf_counter() - t0
+    # Memoria: se ciclan runs ya generados para medir solo al exportador (las
+    # cachés acotadas de los helpers también se mueven al generar)
+    muestra = list(referencias(1000))
+    picos = []
+    for m in (max(1, n // 10), n):
+        with abrir_salida(ruta, formato) as f:
+            tracemalloc.start()
+            exportar((muestra[i % len(muestra)] for i in range(m)), f, formato)
+            picos.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    # El pico no puede crecer con la cantidad de entradas (holgura de 64 KB)
+    ok = escritas == n and picos[1] <= picos[0] + 65536
+    if formato == "docx":
+        with zipfile.ZipFile(ruta) as z:
+            ok &= z.testzip() is None
+    print(f"{formato:5s} {escritas:>7,} entradas  {dt:6.2f} s  {escritas / dt:>9,.0f} entradas/s  "
+          f"{os.path.getsize(ruta) / 1e6:6.1f} MB  pico {picos[0] / 1e6:.2f} MB ({n // 10:,}) / "
+          f"{picos[1] / 1e6:.2f} MB ({n:,})" + ("" if ok else "  ¡FALLA!"))
+    return ok
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark de los exportadores DOCX/RTF/HTML")
+    p.add_argument("--n", type=int, default=30000)
+    p.add_argument("--formato", choices=sorted(EXPORTADORES), action="append")
+    args = p.parse_args(argv)
+    ok = True
+    with tempfile.TemporaryDirectory() as d:
+        for formato in args.formato or sorted(EXPORTADORES):
+            ok &= medir(formato, args.n, os.path.join(d, "bibliografia" + EXPORTADORES[formato].extension))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# benchmarks/bench_fechas.py
+# Compara el normalize_date anterior (bucle de strptime con excepciones) con el
+# parser de citador.fechas sobre un corpus mixto de fechas de jurisprudencia.
+#
+#   python benchmarks/bench_fechas.py [--n 200000]
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citador.core import normalize_date  # noqa: E402
+from citador.fechas import normalizar_fecha  # noqa: E402
+
+
+def normalize_date_strptime(date_str):
+    # Implementación anterior, copiada tal cual para comparar
+    if not date_str:
+        return ""
+    d = date_str.strip()
+    formats_try = [
+        "%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%d %B %Y",
+        "%d de %B de %Y", "%d/%m/%y", "%d-%m-%y"
+    ]
+    for fmt in formats_try:
+        try:
+            dt = datetime.strptime(d, fmt)
+            return dt.strftime("%d/%m/%Y")
+        except Exception:
+            continue
+    if re.fullmatch(r"\d{8}", d):
+        try:
+            dt = datetime.strptime(d, "%d%m%Y")
+            return dt.strftime("%d/%m/%Y")
+        except Exception:
+            pass
+    return d
+
+def normalize_date_sin_cache(date_str):
+    if not date_str:
+        return ""
+    d = date_str.strip()
+    return normalizar_fecha(d) or d
+
+_MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+          "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+
+def corpus(n, seed=2025):
+    r = random.Random(seed)
+    formas = [
+        lambda d, m, y: f"{d:02d}/{m:02d}/{y}",
+        lambda d, m, y: f"{d}-{m}-{y}",
+        lambda d, m, y: f"{y}-{m:02d}-{d:02d}",
+        lambda d, m, y: f"{d} de {_MESES[m - 1]} de {y}",
+        lambda d, m, y: f"{d:02d}/{m:02d}/{y % 100:02d}",
+        lambda d, m, y: f"{d:02d}{m:02d}{y}",
+        lambda d, m, y: f"{_MESES[m - 1]} de {y}",
+        lambda d, m, y: f"rol {y}",   # no es fecha: camino de falla
+    ]
+    return [r.choice(formas)(r.randint(1, 28), r.randint(1, 12), r.randint(1980, 2025))
+            for _ in range(n)]
+
+def medir(fn, datos):
+    t0 = time.perf_counter()
+    for d in datos:
+        fn(d)
+    return time.perf_counter() - t0
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Throughput de normalize_date")
+    p.add_argument("--n", type=int, default=200000)
+    args = p.parse_args(argv)
+    datos = corpus(args.n)
+
+    casos = [
+        ("strptime (anterior)", normalize_date_strptime),
+        ("parser en una pasada", normalize_date_sin_cache),
+        ("parser + caché LRU", normalize_date),
+    ]
+    base = None
+    for nombre, fn in casos:
+        dt = medir(fn, datos)
+        base = base or dt
+        print(f"{nombre:<22} {args.n / dt:>12,.0f} fechas/s  x{base / dt:.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# benchmarks/bench_historial.py
+# Historial estructurado (citador.historial): cuánto cuesta mostrar la página
+# visible después de cambiar el umbral de "y otros" con --n entradas en el
+# historial, contra volver a formatear todas las entradas, y que lo mostrado
+# sea lo mismo que da generar_runs con la configuración nueva.
+#
+# Falla si alguna entrada difiere o si el cambio de umbral supera
+# --presupuesto-ms.
+#
+#   python benchmarks/bench_historial.py [--n 1000] [--presupuesto-ms 50]
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import datos_sinteticos  # noqa: E402
+from citador import generar_runs, limpiar_cache  # noqa: E402
+from citador.historial import TAM_PAGINA_POR_DEFECTO, Historial, renderizar  # noqa: E402
+from citador.render import a_texto  # noqa: E402
+
+
+def _pagina(historial, numero, config):
+    t0 = time.perf_counter()
+    salidas = [renderizar(e, config) for e in historial.pagina(numero)]
+    return time.perf_counter() - t0, salidas
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Cambio de configuración con el historial estructurado")
+    p.add_argument("--n", type=int, default=1000, help="entradas en el historial")
+    p.add_argument("--presupuesto-ms", type=float, default=50.0)
+    args = p.parse_args(argv)
+    limpiar_cache()
+    historial = Historial(args.n)
+    for f in datos_sinteticos.filas(args.n):
+        historial.agregar({"tipo": f["tipo"], "datos": f["datos"], "libro_y_otros": False})
+    cuatro, tres = {"y_otros_threshold": 4}, {"y_otros_threshold": 3}
+
+    primera, _ = _pagina(historial, 1, cuatro)
+    repetida, _ = _pagina(historial, 1, cuatro)
+    cambio, salidas = _pagina(historial, 1, tres)
+    vuelta, _ = _pagina(historial, 1, cuatro)
+    t0 = time.perf_counter()
+    for e in historial:
+        generar_runs(e["tipo"], e["datos"], tres)
+    completo = time.perf_counter() - t0
+
+    print(f"{args.n} entradas, páginas de {TAM_PAGINA_POR_DEFECTO}")
+    for nombre, dt in (("primera página", primera), ("misma página, otro rerun", repetida),
+                       ("umbral 4 -> 3", cambio), ("umbral 3 -> 4 (en caché)", vuelta),
+                       ("formatear todo el historial", completo)):
+        print(f"  {nombre:<30} {dt * 1000:9.3f} ms")
+
+    distintas = 0
+    for e, s in zip(historial.pagina(1), salidas):
+        runs, cita = generar_runs(e["tipo"], e["datos"], tres)
+        distintas += (a_texto(runs), cita) != (s.referencia, s.cita)
+    if distintas:
+        print(f"ERROR: {distintas} entradas distintas de generar_runs con umbral 3")
+    if cambio * 1000 > args.presupuesto_ms:
+        print(f"ERROR: el cambio de umbral tardó {cambio * 1000:.1f} ms (presupuesto {args.presupuesto_ms:.0f} ms)")
+    return 0 if not distintas and cambio * 1000 <= args.presupuesto_ms else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+# benchmarks/bench_importacion.py
+# Mide el arranque en frío de `import citador` en un intérprete nuevo y falla
+# si supera el presupuesto o si el import arrastra Streamlit.
+#
+#   python benchmarks/bench_importacion.py [--presupuesto-ms 50] [--repeticiones 15]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SONDA = """
+import sys, time
+t0 = time.perf_counter()
+import citador
+dt = time.perf_counter() - t0
+print(dt * 1000.0, int('streamlit' in sys.modules))
+"""
+
+def medir_una_vez():
+    out = subprocess.run(
+        [sys.executable, "-S", "-c", SONDA], cwd=RAIZ,
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(out[0]), out[1] == "1"
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Tiempo de importación de citador")
+    p.add_argument("--presupuesto-ms", type=float, default=50.0)
+    p.add_argument("--repeticiones", type=int, default=15)
+    args = p.parse_args(argv)
+
+    tiempos = []
+    for _ in range(args.repeticiones):
+        ms, con_streamlit = medir_una_vez()
+        if con_streamlit:
+            print("ERROR: `import citador` importó streamlit")
+            return 1
+        tiempos.append(ms)
+
+    mediana = statistics.median(tiempos)
+    print(f"import citador: mediana {mediana:.2f} ms, mín {min(tiempos):.2f} ms, "
+          f"máx {max(tiempos):.2f} ms ({args.repeticiones} arranques)")
+    if mediana > args.presupuesto_ms:
+        print(f"ERROR: supera el presupuesto de {args.presupuesto_ms:.0f} ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
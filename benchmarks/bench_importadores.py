@@ -0,0 +1,111 @@
+# benchmarks/bench_importadores.py
+# Rendimiento de los importadores BibTeX, RIS y CSL-JSON sobre exportaciones
+# sintéticas de varios MB. Informa entradas/s, MB/s y el pico de memoria de
+# Python durante la lectura (tracemalloc), que no debe crecer con el archivo.
+#
+#   python benchmarks/bench_importadores.py [--n 20000] [--formato bibtex]
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citador.importadores import LECTORES  # noqa: E402
+
+_APELLIDOS = ["Pérez", "González", "Muñoz", "Núñez", "Rojas", "Díaz", "Soto", "de la Fuente", "Ibáñez"]
+_NOMBRES = ["Ana", "Juan", "María José", "Pedro", "Óscar"]
+_PALABRAS = ["derecho", "civil", "penal", "constitucional", "tratado", "manual", "teoría", "general",
+             "obligaciones", "contratos", "responsabilidad", "procesal", "administrativo", "chileno"]
+_LATEX = {"á": "{\\'a}", "é": "{\\'e}", "í": "{\\'\\i}", "ó": "{\\'o}", "ú": "{\\'u}", "ñ": "{\\~n}",
+          "Ó": "{\\'O}", "Ñ": "{\\~N}"}
+
+
+def _entrada(r, i):
+    autores = [(r.choice(_APELLIDOS), r.choice(_NOMBRES)) for _ in range(r.randint(1, 3))]
+    return {
+        "i": i, "tipo": r.choice(["book", "article", "article", "incollection"]), "autores": autores,
+        "titulo": " ".join(r.sample(_PALABRAS, r.randint(3, 7))).capitalize(),
+        "año": str(r.randint(1960, 2025)), "vol": str(r.randint(1, 60)), "num": str(r.randint(1, 4)),
+        "pags": f"{r.randint(1, 200)}-{r.randint(201, 400)}",
+        "resumen": " ".join(r.choices(_PALABRAS, k=r.randint(30, 120))),
+    }
+
+def _latex(t):
+    return "".join(_LATEX.get(c, c) for c in t)
+
+def escribir_bibtex(f, entradas):
+    for e in entradas:
+        autores = " and ".join(_latex(f"{a}, {n}") for a, n in e["autores"])
+        f.write(f"@{e['tipo']}{{k{e['i']},\n  author = {{{autores}}},\n  title = {{{_latex(e['titulo'])}}},\n"
+                f"  journal = {{Revista Chilena de Derecho}},\n  booktitle = {{Estudios}},\n"
+                f"  publisher = {{Editorial Jur{{\\'\\i}}dica}},\n  address = {{Santiago}},\n"
+                f"  year = {e['año']},\n  volume = {{{e['vol']}}},\n  number = {{{e['num']}}},\n"
+                f"  pages = {{{e['pags'].replace('-', '--')}}},\n  abstract = {{{_latex(e['resumen'])}}}\n}}\n\n")
+
+def escribir_ris(f, entradas):
+    ty = {"book": "BOOK", "article": "JOUR", "incollection": "CHAP"}
+    for e in entradas:
+        f.write(f"TY  - {ty[e['tipo']]}\n")
+        for a, n in e["autores"]:
+            f.write(f"AU  - {a}, {n}\n")
+        ini, fin = e["pags"].split("-")
+        f.write(f"TI  - {e['titulo']}\nT2  - Revista Chilena de Derecho\nPY  - {e['año']}///\n"
+                f"VL  - {e['vol']}\nIS  - {e['num']}\nSP  - {ini}\nEP  - {fin}\nPB  - Editorial Jurídica\n"
+                f"CY  - Santiago\nAB  - {e['resumen']}\nER  - \n\n")
+
+def escribir_csl(f, entradas):
+    tipo = {"book": "book", "article": "article-journal", "incollection": "chapter"}
+    f.write("[\n")
+    for k, e in enumerate(entradas):
+        item = {"id": f"k{e['i']}", "type": tipo[e["tipo"]],
+                "author": [{"family": a, "given": n} for a, n in e["autores"]],
+                "title": e["titulo"], "container-title": "Revista Chilena de Derecho",
+                "publisher": "Editorial Jurídica", "publisher-place": "Santiago",
+                "issued": {"date-parts": [[int(e["año"])]]}, "volume": e["vol"], "issue": e["num"],
+                "page": e["pags"], "abstract": e["resumen"]}
+        f.write(("," if k else "") + json.dumps(item, ensure_ascii=False, indent=2) + "\n")
+    f.write("]\n")
+
+ESCRITORES = {"bibtex": (escribir_bibtex, ".bib"), "ris": (escribir_ris, ".ris"), "csl": (escribir_csl, ".json")}
+
+
+def medir(formato, n, directorio):
+    escribir, ext = ESCRITORES[formato]
+    r = random.Random(3)
+    ruta = os.path.join(directorio, f"export{ext}")
+    with open(ruta, "w", encoding="utf-8") as f:
+        escribir(f, (_entrada(r, i) for i in range(n)))
+    mb = os.path.getsize(ruta) / 1e6
+
+    with open(ruta, encoding="utf-8") as f:
+        t0 = time.perf_counter()
+        filas = sum(1 for _ in LECTORES[formato](f))
+        dt = time.perf_counter() - t0
+    with open(ruta, encoding="utf-8") as f:
+        tracemalloc.start()
+        for _ in LECTORES[formato](f):
+            pass
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    print(f"{formato:7s} {filas:>7,} entradas  {mb:6.1f} MB  {dt:6.2f} s  "
+          f"{filas / dt:>9,.0f} entradas/s  {mb / dt:5.1f} MB/s  pico {pico / 1e6:.2f} MB")
+    return filas == n
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark de importadores BibTeX/RIS/CSL-JSON")
+    p.add_argument("--n", type=int, default=20000)
+    p.add_argument("--formato", choices=sorted(ESCRITORES), action="append")
+    args = p.parse_args(argv)
+    ok = True
+    with tempfile.TemporaryDirectory() as d:
+        for formato in args.formato or ["bibtex", "ris", "csl"]:
+            ok &= medir(formato, args.n, d)
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
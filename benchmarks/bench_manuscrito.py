@@ -0,0 +1,87 @@
+# benchmarks/bench_manuscrito.py
+# Revisión de un manuscrito de largo de libro: bibliografía sintética de
+# --refs referencias y un texto con --notas notas al pie que las citan, con
+# algunas citas rotas inyectadas (año equivocado, autor inexistente). Mide la
+# construcción del índice y la pasada sobre el texto, por separado, y la
+# lectura del mismo texto como .docx (cuerpo + footnotes.xml).
+#
+#   python benchmarks/bench_manuscrito.py [--notas 2000] [--refs 600]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citador.bibliografia import construir_bibliografia  # noqa: E402
+from citador.manuscrito import Revisor, leer_docx  # noqa: E402
+
+_APELLIDOS = ["Pérez", "González", "Muñoz", "Núñez", "Rojas", "Díaz", "Soto", "Silva", "Martínez",
+              "Sepúlveda", "Morales", "Rodríguez", "López", "Álvarez", "Ibáñez", "Fuentes", "Torres"]
+_PALABRAS = ("el derecho civil chileno ha sostenido que la buena fe objetiva impone deberes de "
+             "conducta a las partes durante la ejecución del contrato y aun después de su término").split()
+
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def corpus(n_refs, n_notas, seed=9):
+    r = random.Random(seed)
+    registros = []
+    for _ in range(n_refs):
+        autores = [{"apellido1": r.choice(_APELLIDOS), "apellido2": "", "nombre": "Ana"}
+                   for _ in range(r.choice([1, 1, 2]))]
+        registros.append(("Libro", {"autores": autores, "año": str(r.randint(1980, 2024)),
+                                    "titulo": " ".join(r.sample(_PALABRAS, 4)), "editorial": "X"}, False))
+    bibliografia = construir_bibliografia(registros)
+    citas = [e.cita for e in bibliografia]
+    parrafos, notas, rotas = [], [], 0
+    for i in range(n_notas):
+        parrafos.append(" ".join(r.choices(_PALABRAS, k=50)) + f" [{i + 1}]")
+        cita = r.choice(citas)
+        if r.random() < 0.02:
+            cita, rotas = "ZÚÑIGA (1901)", rotas + 1
+        notas.append(f"{cita}, p. {r.randint(1, 400)}.")
+    return bibliografia, parrafos, notas, rotas
+
+def escribir_docx(ruta, parrafos, notas):
+    def cuerpo(ps):
+        return "".join(f"<w:p><w:r><w:t>{escape(p)}</w:t></w:r></w:p>" for p in ps)
+    with zipfile.ZipFile(ruta, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("word/document.xml", f"<w:document {_W}><w:body>{cuerpo(parrafos)}</w:body></w:document>")
+        z.writestr("word/footnotes.xml", f"<w:footnotes {_W}>{cuerpo(notas)}</w:footnotes>")
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark del revisor de citas de manuscritos")
+    p.add_argument("--notas", type=int, default=2000)
+    p.add_argument("--refs", type=int, default=600)
+    args = p.parse_args(argv)
+
+    bibliografia, parrafos, notas, rotas = corpus(args.refs, args.notas)
+    texto = "\n".join(parrafos + notas)
+
+    t0 = time.perf_counter()
+    revisor = Revisor(bibliografia)
+    t1 = time.perf_counter()
+    informe = revisor.revisar(texto)
+    t2 = time.perf_counter()
+    with tempfile.TemporaryDirectory() as d:
+        ruta = os.path.join(d, "manuscrito.docx")
+        escribir_docx(ruta, parrafos, notas)
+        t3 = time.perf_counter()
+        desde_docx = leer_docx(ruta)
+        t4 = time.perf_counter()
+
+    print(f"texto: {len(texto) / 1e6:.2f} M caracteres, {args.notas} notas, {len(bibliografia)} referencias")
+    print(f"índice: {(t1 - t0) * 1000:.1f} ms   revisión: {(t2 - t1) * 1000:.1f} ms   "
+          f"lectura docx: {(t4 - t3) * 1000:.1f} ms")
+    print(f"citas: {informe.total_citas}; sin referencia: {len(informe.sin_referencia)} "
+          f"(inyectadas {rotas}); no citadas: {len(informe.sin_citar)}")
+    ok = len(informe.sin_referencia) == rotas and desde_docx == texto
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# benchmarks/bench_memoria_registros.py
+# Memoria por registro: dicts libres (como los arma la UI) frente a los
+# registros tipados con __slots__ de citador.registros.
+#
+#   python benchmarks/bench_memoria_registros.py [--n 100000]
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citador.registros import como_registro  # noqa: E402
+
+_APELLIDOS = ["Pérez", "González", "Muñoz", "Rojas", "Díaz", "Soto", "Contreras", "Silva"]
+_NOMBRES = ["Juan", "María José", "Ana", "Pedro", "Carolina"]
+
+
+def registros_dict(n, seed=7):
+    r = random.Random(seed)
+    for i in range(n):
+        autores = [{'apellido1': r.choice(_APELLIDOS), 'apellido2': r.choice(_APELLIDOS + [""]),
+                    'nombre': r.choice(_NOMBRES)} for _ in range(r.randint(1, 3))]
+        if i % 2:
+            yield "Libro", {
+                'autores': autores, 'año': str(r.randint(1950, 2025)), 'titulo': f"Tratado de derecho {i}",
+                'ciudad': "Santiago", 'editorial': "Editorial Jurídica de Chile", 'edicion': "2",
+                'tomo': str(r.randint(0, 4) or ""), 'paginas': "",
+            }
+        else:
+            yield "Artículo de revista", {
+                'autores': autores, 'año': str(r.randint(1950, 2025)), 'titulo': f"Sobre el artículo {i}",
+                'revista': "Revista Chilena de Derecho", 'volumen': str(r.randint(1, 50)),
+                'numero': str(r.randint(1, 3)), 'paginas': "1-20", 'doi': "", 'url': "",
+            }
+
+def medir(construir, n):
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    retenidos = construir(n)
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(retenidos) == n
+    return (despues - antes) / n
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Memoria por registro: dict vs registro tipado")
+    p.add_argument("--n", type=int, default=100000)
+    args = p.parse_args(argv)
+
+    # Las cadenas de cada registro se crean dentro de la medición en ambos
+    # casos, así que la diferencia es la del contenedor y los autores.
+    con_dict = medir(lambda n: [d for _, d in registros_dict(n)], args.n)
+    con_slots = medir(lambda n: [como_registro(t, d) for t, d in registros_dict(n)], args.n)
+    print(f"dict + autores dict:       {con_dict:8.0f} bytes/registro")
+    print(f"__slots__ + Autor (tupla): {con_slots:8.0f} bytes/registro "
+          f"({100 * (1 - con_slots / con_dict):.0f}% menos)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
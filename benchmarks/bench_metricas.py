@@ -0,0 +1,52 @@
+# benchmarks/bench_metricas.py
+# Costo de la instrumentación de citador.metricas sobre generar_runs: sin
+# activar nunca, activada, y de nuevo desactivada (que debe volver a dejar las
+# funciones originales de core, es decir, costo cero). Verifica también que
+# los contadores por tipo sumen las llamadas hechas.
+#
+#   python benchmarks/bench_metricas.py [--n 100000]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datos_sinteticos  # noqa: E402
+from citador import core, limpiar_cache, metricas  # noqa: E402
+from citador.registros import como_registro  # noqa: E402
+
+
+def medir(registros):
+    limpiar_cache()
+    t0 = time.perf_counter()
+    for tipo, datos in registros:
+        core.generar_runs(tipo, datos)
+    return time.perf_counter() - t0
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Overhead de las métricas de citador")
+    p.add_argument("--n", type=int, default=100000)
+    args = p.parse_args(argv)
+    registros = [(f["tipo"], como_registro(f["tipo"], f["datos"])) for f in datos_sinteticos.filas(args.n)]
+    originales = (dict(core.TIPOS_RUNS), core.cita_abreviada)
+
+    metricas.desactivar()
+    base = min(medir(registros) for _ in range(3))
+    metricas.activar()
+    metricas.limpiar()
+    activas = medir(registros)
+    llamadas = sum(f["llamadas"] for f in metricas.resumen() if f["métrica"] == "generar")
+    activas = min([activas] + [medir(registros) for _ in range(2)])
+    metricas.desactivar()
+    despues = min(medir(registros) for _ in range(3))
+    restauradas = originales == (dict(core.TIPOS_RUNS), core.cita_abreviada)
+
+    for nombre, dt in (("sin métricas", base), ("activadas", activas), ("desactivadas", despues)):
+        print(f"{nombre:<14} {args.n / dt:>10,.0f} registros/s  {dt / args.n * 1e6:6.2f} µs/registro "
+              f"({(dt / base - 1) * 100:+.1f}%)")
+    print(f"llamadas contadas: {llamadas:,} de {args.n:,}; funciones originales restauradas: {restauradas}")
+    return 0 if llamadas == args.n and restauradas else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
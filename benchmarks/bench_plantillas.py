@@ -0,0 +1,103 @@
+# benchmarks/bench_plantillas.py
+# Plantillas compiladas (citador.plantillas) contra los generadores escritos a
+# mano de una revisión anterior de citador/core.py: tiempo por referencia de
+# cada tipo (TIPOS_RUNS, el camino de generar_runs) y que la salida sea la
+# misma. Las únicas diferencias aceptadas son las normas que antes caían en la
+# rama de decretos aunque fueran tratados o instrumentos de la Unión Europea.
+#
+# Por defecto compara con la revisión anterior a la que agregó plantillas.py.
+# Falla si hay diferencias no esperadas o si en total las plantillas son más
+# lentas que los generadores anteriores en más de --tolerancia.
+#
+#   python benchmarks/bench_plantillas.py [--n 20000] [--antes REV] [--tolerancia 0.05]
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import datos_sinteticos  # noqa: E402
+from citador import core  # noqa: E402
+from citador.registros import como_registro  # noqa: E402
+from citador.render import a_html, a_texto  # noqa: E402
+
+CONFIG = {"y_otros_threshold": 4}
+
+
+def _git(*args):
+    return subprocess.run(["git", *args], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+
+def revision_anterior():
+    agregada = _git("log", "--diff-filter=A", "--format=%H", "-1", "--", "citador/plantillas.py")
+    return f"{agregada}^" if agregada else "HEAD"
+
+def core_de(revision):
+    """citador/core.py de una revisión, cargado como módulo aparte del paquete."""
+    fuente = _git("show", f"{revision}:citador/core.py")
+    spec = importlib.util.spec_from_loader("citador._core_anterior", loader=None)
+    modulo = importlib.util.module_from_spec(spec)
+    modulo.__package__ = "citador"
+    exec(compile(fuente, f"{revision}:citador/core.py", "exec"), modulo.__dict__)
+    return modulo
+
+
+def _salida(r):
+    runs, cita = r if isinstance(r, tuple) else (r, None)
+    return a_html(runs), a_texto(runs), cita
+
+def _una_pasada(gen, registros):
+    t0 = time.perf_counter()
+    for d in registros:
+        gen(d, CONFIG)
+    return time.perf_counter() - t0
+
+def medir(viejo, nuevo, registros, repeticiones):
+    """Mejor tiempo por registro de cada uno, alternando las pasadas para que el ruido les toque a ambos."""
+    antes = ahora = float("inf")
+    for _ in range(repeticiones):
+        antes = min(antes, _una_pasada(viejo, registros))
+        ahora = min(ahora, _una_pasada(nuevo, registros))
+    return antes / len(registros), ahora / len(registros)
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Plantillas compiladas vs generadores escritos a mano")
+    p.add_argument("--n", type=int, default=20000, help="registros sintéticos (repartidos entre los tipos)")
+    p.add_argument("--antes", metavar="REV", help="revisión con los generadores anteriores")
+    p.add_argument("--repeticiones", type=int, default=15)
+    p.add_argument("--tolerancia", type=float, default=0.05)
+    args = p.parse_args(argv)
+
+    revision = args.antes or revision_anterior()
+    anterior = core_de(revision)
+    por_tipo = {}
+    for f in datos_sinteticos.filas(args.n):
+        por_tipo.setdefault(f["tipo"], []).append(como_registro(f["tipo"], f["datos"]))
+
+    print(f"contra {revision}")
+    print(f"{'tipo':<48} {'antes µs':>9} {'ahora µs':>9} {'ahora/antes':>12}  distintas")
+    total_antes = total_ahora = 0.0
+    inesperadas = 0
+    for tipo, registros in por_tipo.items():
+        viejo, nuevo = anterior.TIPOS_RUNS[tipo], core.TIPOS_RUNS[tipo]
+        distintas = 0
+        for d in registros:
+            if _salida(viejo(d, CONFIG)) != _salida(nuevo(d, CONFIG)):
+                distintas += 1
+                esperada = tipo == "Norma" and core.clasificar_norma(d.tipo_norma, d.nombre_norma) in (
+                    "tratado", "union_europea")
+                inesperadas += not esperada
+        antes, ahora = medir(viejo, nuevo, registros, args.repeticiones)
+        total_antes += antes * len(registros)
+        total_ahora += ahora * len(registros)
+        print(f"{tipo:<48} {antes * 1e6:>9.2f} {ahora * 1e6:>9.2f} {ahora / antes:>12.2f}  {distintas}")
+    print(f"{'total':<48} {total_antes * 1e3:>8.1f}ms {total_ahora * 1e3:>8.1f}ms {total_ahora / total_antes:>12.2f}")
+    if inesperadas:
+        print(f"{inesperadas} referencias distintas fuera de las ramas corregidas de Norma")
+    return 0 if not inesperadas and total_ahora <= total_antes * (1 + args.tolerancia) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
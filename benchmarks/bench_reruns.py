@@ -0,0 +1,147 @@
+# benchmarks/bench_reruns.py
+# Ejecuciones del script y latencia de cada rerun de la UI al completar un
+# libro de --autores autores, medidas con el AppTest de Streamlit:
+#
+#   formulario   campos en st.form: escribir no recalcula nada, un solo
+#                rerun al enviar
+#   en vivo      vista previa: cada campo confirmado es un rerun (en el
+#                navegador, solo del fragmento)
+#   antes        (con --antes REV) el citas_rchd.py de esa revisión de git,
+#                donde cada campo es un rerun del script completo
+#
+# El historial se precarga con --historial entradas (con espacio para las
+# nuevas) para que cada rerun completo pague también su página. A la revisión
+# de --antes se le da en el formato que esa versión espera: lista de textos
+# si no usa citador.historial. Requiere streamlit.
+#
+#   python benchmarks/bench_reruns.py [--autores 3] [--historial 200] [--antes REV]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from citador.historial import Historial  # noqa: E402
+
+# Valores por comienzo de la etiqueta (ver citador.registros)
+VALORES = {
+    "Primer apellido": "Pérez", "Segundo apellido": "Soto", "Nombre": "Ana", "Año": "2020",
+    "Título": "Tratado de derecho civil", "Ciudad": "Santiago", "Editorial": "Editorial Jurídica de Chile",
+    "Número de edición": "2", "Tomo": "3",
+}
+
+def _valor(etiqueta):
+    return next((v for k, v in VALORES.items() if etiqueta.startswith(k)), None)
+
+
+def _historial(n, fuente):
+    """
+    n entradas con lugar para 10 más. Entradas con los datos (versión actual)
+    o solo con el texto, en un Historial o en una lista según lo que use
+    fuente, el citas_rchd.py que se va a correr.
+    """
+    actual = "renderizar" in fuente
+    entradas = []
+    for i in range(n):
+        año = str(1950 + i % 70)
+        if actual:
+            entradas.append({"tipo": "Libro", "libro_y_otros": False,
+                             "datos": {"autores": [{"apellido1": "Pérez", "nombre": "Ana"}], "año": año,
+                                       "titulo": f"Obra {i}"}})
+        else:
+            entradas.append({"tipo": "Libro", "referencia": f"PÉREZ, Ana ({año}): Obra {i}.",
+                             "cita": f"PÉREZ ({año})"})
+    if "citador.historial" not in fuente:
+        return entradas
+    h = Historial(n + 10)
+    for entrada in entradas:
+        h.agregar(entrada)
+    return h
+
+def _citas_nuevas(historial):
+    """Entradas del historial con el título que escribe este benchmark."""
+    titulo = VALORES["Título"]
+    return sum(1 for e in historial
+               if titulo in (e["datos"].get("titulo") if "datos" in e else e["referencia"]))
+
+def _boton(at, etiqueta):
+    return next(b for b in at.button if b.label == etiqueta)
+
+def completar(ruta, autores, historial, modo):
+    """Completa el formulario de un libro; devuelve (tiempos de cada run, citas nuevas en el historial)."""
+    with open(ruta, encoding="utf-8") as f:
+        fuente = f.read()
+    at = AppTest.from_file(ruta, default_timeout=60)
+    tiempos = []
+
+    def correr():
+        t0 = time.perf_counter()
+        at.run()
+        tiempos.append(time.perf_counter() - t0)
+
+    correr()
+    at.session_state["historial_citas"] = _historial(historial, fuente)
+    # La app ajusta el historial a la capacidad de la barra lateral (200 por omisión)
+    capacidad = [w for w in at.number_input if w.label.startswith("Máximo de citas")]
+    if capacidad:
+        capacidad[0].set_value(min(-(-(historial + 10) // 10) * 10, 1000))
+        at.run()
+    if modo == "en vivo":
+        at.checkbox(key="vista_previa").check()
+        correr()
+    # Número de autores (fuera del formulario: cambia qué campos hay)
+    next(w for w in at.number_input if w.label.startswith("Número de autores")).set_value(autores)
+    correr()
+    for i in range(len(at.text_input)):
+        w = at.text_input[i]
+        valor = _valor(w.label)
+        if valor is None:
+            continue
+        w.input(valor)
+        if modo != "formulario":
+            correr()        # un campo confirmado = un rerun
+    _boton(at, "Generar cita").click()
+    correr()
+    return tiempos, _citas_nuevas(at.session_state["historial_citas"])
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Reruns de la UI: formulario vs vista previa vs versión anterior")
+    p.add_argument("--autores", type=int, default=3)
+    p.add_argument("--historial", type=int, default=200)
+    p.add_argument("--antes", metavar="REV", help="revisión de git con la UI anterior para comparar")
+    args = p.parse_args(argv)
+
+    casos = [("formulario", os.path.join(RAIZ, "citas_rchd.py")), ("en vivo", os.path.join(RAIZ, "citas_rchd.py"))]
+    tmp = None
+    if args.antes:
+        fuente = subprocess.run(["git", "show", f"{args.antes}:citas_rchd.py"], cwd=RAIZ,
+                                capture_output=True, text=True, check=True).stdout
+        tmp = tempfile.NamedTemporaryFile("w", suffix=".py", dir=RAIZ, delete=False, encoding="utf-8")
+        tmp.write(fuente)
+        tmp.close()
+        casos.append(("antes", tmp.name))
+
+    ok = True
+    try:
+        print(f"{'modo':<12} {'ejecuciones':>11} {'mediana ms':>11} {'total ms':>9}  citas")
+        for modo, ruta in casos:
+            tiempos, nuevas = completar(ruta, args.autores, args.historial, modo)
+            # La primera carga es igual en todos los modos y no cuenta
+            reruns = tiempos[1:]
+            print(f"{modo:<12} {len(reruns):>11} {statistics.median(reruns) * 1000:>11.1f} "
+                  f"{sum(reruns) * 1000:>9.1f}  {nuevas}")
+            ok &= nuevas == 1
+    finally:
+        if tmp is not None:
+            os.unlink(tmp.name)
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
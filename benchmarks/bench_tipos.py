@@ -0,0 +1,205 @@
+# benchmarks/bench_tipos.py
+# Suite de rendimiento del motor: latencia por llamada de generar_runs para
+# cada uno de los 14 TIPOS y de los helpers más usados (formatear_autores,
+# norma, normalize_date), y throughput del camino por lotes (formatear_filas)
+# a 1k/100k/1M registros con su pico de memoria. Los datos salen de
+# datos_sinteticos.py, siempre los mismos para un mismo seed.
+#
+# Los resultados se guardan en JSON (--json) y se pueden comparar contra una
+# corrida anterior (--base): si alguna métrica empeora más que --umbral, la
+# corrida termina con código 1.
+#
+#   python benchmarks/bench_tipos.py [--tamaños 1000,100000,1000000] [--json res.json] [--base base.json]
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datos_sinteticos  # noqa: E402
+from citador import (  # noqa: E402
+    CONFIG_POR_DEFECTO, TIPOS, formatear_autores, generar_runs, limpiar_cache, norma, normalize_date,
+)
+from citador.lotes import formatear_filas  # noqa: E402
+
+VERSION_RESULTADOS = 1
+
+
+# ---------------- Mediciones ----------------
+def _percentiles(tiempos_ns):
+    tiempos = sorted(tiempos_ns)
+    return {
+        "p50_us": tiempos[len(tiempos) // 2] / 1000,
+        "p95_us": tiempos[int(len(tiempos) * 0.95)] / 1000,
+        "media_us": statistics.fmean(tiempos) / 1000,
+    }
+
+def _latencia(fn, argumentos, repeticiones):
+    """
+    Mide cada llamada por separado, con la caché vacía al empezar cada
+    repetición, y se queda con la mejor repetición de cada percentil (a escala
+    de microsegundos el ruido del sistema pesa más que el código).
+    """
+    reloj = time.perf_counter_ns
+    mejores = None
+    for _ in range(repeticiones):
+        limpiar_cache()
+        tiempos = []
+        for args in argumentos:
+            t0 = reloj()
+            fn(*args)
+            tiempos.append(reloj() - t0)
+        m = _percentiles(tiempos)
+        mejores = m if mejores is None else {k: min(v, mejores[k]) for k, v in m.items()}
+    return mejores
+
+def latencia_tipos(k, seed, repeticiones):
+    r = random.Random(seed)
+    resultado = {}
+    for tipo in TIPOS:
+        argumentos = [(tipo, datos_sinteticos.datos(tipo, r), CONFIG_POR_DEFECTO) for _ in range(k)]
+        resultado[tipo] = _latencia(generar_runs, argumentos, repeticiones)
+    return resultado
+
+def latencia_helpers(k, seed, repeticiones):
+    r = random.Random(seed)
+    diez = [[datos_sinteticos._autor(r) for _ in range(10)] for _ in range(k)]
+    fechas = [datos_sinteticos._fecha(r) for _ in range(k)]
+    normas = [datos_sinteticos.datos("Norma", r) for _ in range(k)]
+    return {
+        "formatear_autores (10 autores)": _latencia(formatear_autores, [(a,) for a in diez], repeticiones),
+        "normalize_date": _latencia(normalize_date, [(f,) for f in fechas], repeticiones),
+        "norma": _latencia(norma, [(d,) for d in normas], repeticiones),
+    }
+
+def _rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1e3     # bytes en macOS, KB en Linux
+
+def lotes(n, seed, max_memoria):
+    """
+    Throughput de formatear_filas sobre n filas y pico de memoria
+    (tracemalloc). Los lotes chicos se repiten hasta sumar ~100k registros y
+    se toma la mejor corrida.
+    """
+    dt = None
+    for _ in range(min(5, max(1, 100000 // n))):
+        limpiar_cache()
+        t0 = time.perf_counter()
+        errores = sum(1 for r in formatear_filas(enumerate(datos_sinteticos.filas(n, seed), 1))
+                      if r.error is not None)
+        dt = min(dt or float("inf"), time.perf_counter() - t0)
+    pico = None
+    # tracemalloc vuelve todo varias veces más lento: solo hasta max_memoria
+    if n <= max_memoria:
+        limpiar_cache()
+        tracemalloc.start()
+        for _ in formatear_filas(enumerate(datos_sinteticos.filas(n, seed), 1)):
+            pass
+        pico = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return {"registros_s": n / dt, "segundos": dt, "errores": errores, "pico_mb": pico, "rss_max_mb": _rss_mb()}
+
+
+# ---------------- Comparación ----------------
+def metricas(resultados):
+    """
+    Itera (nombre, valor, mayor_es_mejor, piso) de las métricas que se
+    comparan. El p95 no entra (es casi todo ruido del sistema); piso es la
+    diferencia absoluta bajo la cual un cambio no cuenta.
+    """
+    for grupo in ("tipos", "helpers"):
+        for nombre, m in resultados[grupo].items():
+            yield f"{grupo}/{nombre}/p50_us", m["p50_us"], False, 1.0
+    for n, m in resultados["lotes"].items():
+        yield f"lotes/{n}/registros_s", m["registros_s"], True, 0.0
+        if m["pico_mb"] is not None:
+            yield f"lotes/{n}/pico_mb", m["pico_mb"], False, 0.1
+
+def comparar(actual, base, umbral):
+    """Lista de (nombre, antes, ahora, cambio) de las métricas que empeoraron más que umbral."""
+    anteriores = {nombre: valor for nombre, valor, _, _ in metricas(base)}
+    regresiones = []
+    for nombre, valor, mayor_es_mejor, piso in metricas(actual):
+        antes = anteriores.get(nombre)
+        if not antes or abs(valor - antes) < piso:
+            continue
+        cambio = (antes / valor - 1) if mayor_es_mejor else (valor / antes - 1)
+        if cambio > umbral:
+            regresiones.append((nombre, antes, valor, cambio))
+    return regresiones
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Suite de rendimiento: 14 tipos, helpers y lotes")
+    p.add_argument("--tamaños", default="1000,100000,1000000", help="tamaños de lote separados por coma")
+    p.add_argument("--llamadas", type=int, default=2000, help="llamadas por tipo para la latencia")
+    p.add_argument("--repeticiones", type=int, default=5, help="repeticiones de la latencia (se toma la mejor)")
+    p.add_argument("--max-memoria", type=int, default=100000,
+                   help="mide el pico de memoria solo en lotes de hasta este tamaño")
+    p.add_argument("--seed", type=int, default=2025)
+    p.add_argument("--json", help="guarda los resultados en este archivo")
+    p.add_argument("--base", help="resultados anteriores (JSON) contra los cuales comparar")
+    p.add_argument("--umbral", type=float, default=0.25,
+                   help="empeoramiento relativo tolerado antes de fallar (0.25 = 25%%)")
+    args = p.parse_args(argv)
+    tamaños = [int(t) for t in args.tamaños.split(",") if t.strip()]
+
+    resultados = {
+        "version": VERSION_RESULTADOS,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {"llamadas": args.llamadas, "repeticiones": args.repeticiones, "seed": args.seed},
+        "tipos": latencia_tipos(args.llamadas, args.seed, args.repeticiones),
+        "helpers": latencia_helpers(args.llamadas, args.seed, args.repeticiones),
+        "lotes": {},
+    }
+    print(f"{'latencia por llamada':<48} {'p50 µs':>9} {'p95 µs':>9} {'media µs':>9}")
+    for grupo in ("tipos", "helpers"):
+        for nombre, m in resultados[grupo].items():
+            print(f"{nombre[:48]:<48} {m['p50_us']:9.1f} {m['p95_us']:9.1f} {m['media_us']:9.1f}")
+
+    print(f"\n{'lote':>10} {'registros/s':>12} {'s':>8} {'pico MB':>8} {'RSS MB':>8}")
+    ok = True
+    for n in tamaños:
+        m = lotes(n, args.seed, args.max_memoria)
+        resultados["lotes"][str(n)] = m
+        pico = f"{m['pico_mb']:.2f}" if m["pico_mb"] is not None else "—"
+        rss = f"{m['rss_max_mb']:.0f}" if m["rss_max_mb"] is not None else "—"
+        print(f"{n:>10,} {m['registros_s']:>12,.0f} {m['segundos']:>8.2f} {pico:>8} {rss:>8}")
+        if m["errores"]:
+            print(f"ERROR: {m['errores']} registros con error en el lote de {n:,}")
+            ok = False
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(resultados, base, args.umbral)
+        for nombre, antes, ahora, cambio in regresiones:
+            print(f"REGRESIÓN {nombre}: {antes:,.2f} -> {ahora:,.2f} ({cambio:+.0%})")
+        if regresiones:
+            ok = False
+        else:
+            print(f"\nsin regresiones mayores a {args.umbral:.0%} respecto de {args.base}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
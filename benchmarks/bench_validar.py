@@ -0,0 +1,95 @@
+# benchmarks/bench_validar.py
+# Validación por lotes (citador.validar) de --n filas sintéticas, con una
+# fracción --defectos de ellas dañadas a propósito (año o traductor vacíos,
+# páginas con raya, DOI con prefijo, URL sin https://, boletín sin punto, rol
+# con "Rol N°"). Mide registros/s en serie y con --procesos procesos.
+#
+# Falla si alguna fila dañada no recibe el aviso esperado, si el modo
+# paralelo no da los mismos avisos que en serie, o si en serie tarda más de
+# --max-s segundos.
+#
+#   python benchmarks/bench_validar.py [--n 100000] [--defectos 0.05] [--procesos 0]
+import argparse
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import datos_sinteticos  # noqa: E402
+from citador import validar  # noqa: E402
+
+_CON_AÑO = ("Libro", "Traducción de libro", "Capítulo de libro", "Artículo de revista", "Tesis")
+
+# (se aplica a (tipo, datos), daña los datos, código esperado)
+DEFECTOS = [
+    (lambda t, d: t in _CON_AÑO, lambda d: d.update(año=""), "campo_vacio"),
+    (lambda t, d: t == "Traducción de libro", lambda d: d.update(traductor=""), "campo_vacio"),
+    (lambda t, d: "paginas" in d, lambda d: d.update(paginas="45–47"), "paginas_guion"),
+    (lambda t, d: "doi" in d, lambda d: d.update(doi="https://doi.org/10.1000/182"), "doi_prefijo"),
+    (lambda t, d: "url" in d, lambda d: d.update(url="www.ejemplo.cl/entrada"), "url_formato"),
+    (lambda t, d: "boletin" in d, lambda d: d.update(boletin="12345-04"), "boletin_formato"),
+    (lambda t, d: "rol" in d, lambda d: d.update(rol="Rol N° 1234-2020"), "rol_prefijo"),
+]
+
+
+def filas_con_defectos(n, fraccion, seed):
+    """[(n, fila)] y {n: código esperado} de las filas dañadas."""
+    r = random.Random(seed)
+    filas, esperados = [], {}
+    for i, fila in enumerate(datos_sinteticos.filas(n, seed=seed), 1):
+        if r.random() < fraccion:
+            aplicables = [(dañar, codigo) for aplica, dañar, codigo in DEFECTOS if aplica(fila["tipo"], fila["datos"])]
+            if aplicables:
+                dañar, codigo = r.choice(aplicables)
+                dañar(fila["datos"])
+                esperados[i] = codigo
+        filas.append((i, fila))
+    return filas, esperados
+
+def medir(filas, generador):
+    t0 = time.perf_counter()
+    resultados = list(generador(filas))
+    return time.perf_counter() - t0, resultados
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Validación por lotes de registros")
+    p.add_argument("--n", type=int, default=100000)
+    p.add_argument("--defectos", type=float, default=0.05, help="fracción de filas dañadas")
+    p.add_argument("--procesos", type=int, default=0, help="procesos del modo paralelo (0 = uno por núcleo)")
+    p.add_argument("--max-s", type=float, default=5.0, help="tiempo máximo en serie")
+    p.add_argument("--seed", type=int, default=2025)
+    args = p.parse_args(argv)
+    filas, esperados = filas_con_defectos(args.n, args.defectos, args.seed)
+
+    serie, resultados = medir(filas, validar.validar_filas)
+    paralelo, resultados_paralelo = medir(
+        filas, lambda f: validar.validar_filas_paralelo(f, procesos=args.procesos or None))
+    print(f"{args.n:,} registros, {len(esperados):,} dañados")
+    print(f"{'en serie':<22} {serie:7.2f} s {args.n / serie:>10,.0f} registros/s")
+    print(f"{'en paralelo':<22} {paralelo:7.2f} s {args.n / paralelo:>10,.0f} registros/s  "
+          f"({args.procesos or os.cpu_count()} procesos)")
+
+    totales = validar.resumen(resultados)
+    print(f"con errores {totales['con_errores']:,}, con advertencias {totales['con_advertencias']:,}")
+    for codigo, cuantos in totales["por_codigo"].items():
+        print(f"  {codigo:<18} {cuantos:>8,}")
+
+    ok = True
+    no_detectados = [n for n, _, avisos in resultados
+                     if n in esperados and esperados[n] not in {a.codigo for a in avisos}]
+    if no_detectados:
+        print(f"ERROR: {len(no_detectados)} filas dañadas sin su aviso (p.ej. fila {no_detectados[0]})")
+        ok = False
+    if resultados_paralelo != resultados:
+        print("ERROR: el modo paralelo no da los mismos avisos que en serie")
+        ok = False
+    if serie > args.max_s:
+        print(f"ERROR: en serie tardó {serie:.2f} s (máximo {args.max_s} s)")
+        ok = False
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+# benchmarks/carga_api.py
+# Prueba de carga de la API HTTP (citador.api) contra localhost. Si no se da
+# --url, levanta 'python -m citador api' en un puerto libre y lo baja al final.
+#
+#   formatear   --concurrencia clientes con keep-alive haciendo POST /formatear
+#               con filas sintéticas durante --segundos: peticiones/s y
+#               latencia p50/p95/p99
+#   lotes       un POST /lotes con --filas filas NDJSON enviadas en chunked:
+#               tiempo hasta la primera línea, filas/s, y que salgan todas y
+#               en el orden de entrada
+#
+# Al final muestra las latencias por ruta que el servidor expone en /metricas.
+#
+#   python benchmarks/carga_api.py [--concurrencia 16] [--segundos 5] [--filas 100000]
+#   python benchmarks/carga_api.py --url http://127.0.0.1:8000
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import datos_sinteticos  # noqa: E402
+
+
+# ---------------- Cliente HTTP mínimo ----------------
+class Cliente:
+    """Una conexión keep-alive; suficiente para hablar con citador.servidor o uvicorn."""
+
+    def __init__(self, host, puerto):
+        self.host, self.puerto = host, puerto
+        self.reader = self.writer = None
+
+    async def abrir(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.puerto, limit=1 << 20)
+
+    def cerrar(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    async def enviar(self, metodo, ruta, cuerpo=b"", extra=()):
+        cabecera = [f"{metodo} {ruta} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(cuerpo)}", *extra]
+        self.writer.write(("\r\n".join(cabecera) + "\r\n\r\n").encode("latin-1") + cuerpo)
+        await self.writer.drain()
+
+    async def cabeceras(self):
+        estado = int((await self.reader.readline()).split()[1])
+        hd = {}
+        while True:
+            linea = await self.reader.readline()
+            if linea in (b"\r\n", b""):
+                return estado, hd
+            k, _, v = linea.decode("latin-1").partition(":")
+            hd[k.strip().lower()] = v.strip()
+
+    async def trozos(self, hd):
+        """Itera el cuerpo de la respuesta a medida que llega."""
+        if hd.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                tam = int((await self.reader.readline()).split(b";")[0], 16)
+                if tam == 0:
+                    await self.reader.readline()
+                    return
+                datos = await self.reader.readexactly(tam)
+                await self.reader.readline()
+                yield datos
+        else:
+            yield await self.reader.readexactly(int(hd.get("content-length", "0")))
+
+    async def pedir(self, metodo, ruta, cuerpo=b""):
+        await self.enviar(metodo, ruta, cuerpo)
+        estado, hd = await self.cabeceras()
+        return estado, b"".join([t async for t in self.trozos(hd)])
+
+
+# ---------------- Escenarios ----------------
+def _percentil(ordenados, q):
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+async def carga_formatear(host, puerto, concurrencia, segundos, cuerpos):
+    latencias, errores = [], 0
+    fin = time.perf_counter() + segundos
+
+    async def cliente(i):
+        nonlocal errores
+        c = Cliente(host, puerto)
+        await c.abrir()
+        try:
+            k = i
+            while time.perf_counter() < fin:
+                t0 = time.perf_counter()
+                estado, _ = await c.pedir("POST", "/formatear", cuerpos[k % len(cuerpos)])
+                latencias.append(time.perf_counter() - t0)
+                errores += estado != 200
+                k += concurrencia
+        finally:
+            c.cerrar()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(cliente(i) for i in range(concurrencia)))
+    total = time.perf_counter() - t0
+    latencias.sort()
+    print(f"formatear  {len(latencias):,} peticiones en {total:.1f} s con {concurrencia} clientes: "
+          f"{len(latencias) / total:,.0f} pet/s")
+    print(f"           latencia p50 {_percentil(latencias, .5) * 1000:.2f} ms  "
+          f"p95 {_percentil(latencias, .95) * 1000:.2f} ms  p99 {_percentil(latencias, .99) * 1000:.2f} ms  "
+          f"errores {errores}")
+    return errores == 0
+
+async def carga_lotes(host, puerto, filas):
+    c = Cliente(host, puerto)
+    await c.abrir()
+    try:
+        t0 = time.perf_counter()
+        await c.enviar("POST", "/lotes", extra=("Transfer-Encoding: chunked",))
+
+        async def subir():
+            # Bloques de 1000 filas, como un cliente que lee de un archivo
+            for i in range(0, len(filas), 1000):
+                trozo = b"".join(filas[i:i + 1000])
+                c.writer.write(f"{len(trozo):x}\r\n".encode("latin-1") + trozo + b"\r\n")
+                await c.writer.drain()
+            c.writer.write(b"0\r\n\r\n")
+            await c.writer.drain()
+
+        subida = asyncio.ensure_future(subir())
+        estado, hd = await c.cabeceras()
+        primera, n_esperado, en_orden, errores, pendiente = None, 1, True, 0, b""
+        async for trozo in c.trozos(hd):
+            if primera is None:
+                primera = time.perf_counter() - t0
+            *lineas, pendiente = (pendiente + trozo).split(b"\n")
+            for linea in lineas:
+                d = json.loads(linea)
+                en_orden &= d.get("n") == n_esperado
+                errores += "error" in d
+                n_esperado += 1
+        await subida
+        total = time.perf_counter() - t0
+    finally:
+        c.cerrar()
+    recibidas = n_esperado - 1
+    completo = estado == 200 and recibidas == len(filas) and en_orden
+    print(f"lotes      {recibidas:,} de {len(filas):,} filas en {total:.2f} s: {recibidas / total:,.0f} filas/s; "
+          f"primera línea a los {primera * 1000:.1f} ms; en orden: {en_orden}; filas con error: {errores}")
+    return completo
+
+async def mostrar_metricas(host, puerto):
+    c = Cliente(host, puerto)
+    await c.abrir()
+    try:
+        _, cuerpo = await c.pedir("GET", "/metricas")
+    finally:
+        c.cerrar()
+    sumas, cuentas = {}, {}
+    for linea in cuerpo.decode("utf-8").splitlines():
+        if linea.startswith("#") or "_bucket" in linea:
+            continue
+        nombre, _, valor = linea.rpartition(" ")
+        if nombre.endswith("_sum"):
+            sumas[nombre[:-4]] = float(valor)
+        elif nombre.endswith("_count"):
+            cuentas[nombre[:-6]] = int(valor)
+    print("métricas del servidor (media por petición):")
+    for nombre, n in sorted(cuentas.items()):
+        if n:
+            print(f"  {nombre:<46} {n:>9,}  {sumas.get(nombre, 0) / n * 1000:8.3f} ms")
+
+
+# ---------------- Servidor de prueba ----------------
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def levantar(procesos):
+    puerto = _puerto_libre()
+    proc = subprocess.Popen([sys.executable, "-m", "citador", "api", "--puerto", str(puerto),
+                             "--procesos", str(procesos)], cwd=RAIZ, stderr=subprocess.PIPE, text=True)
+    linea = proc.stderr.readline()
+    if "escuchando" not in linea:
+        proc.kill()
+        raise RuntimeError(f"el servidor no arrancó: {linea.strip()}")
+    return proc, puerto
+
+async def correr(args, host, puerto):
+    filas = list(datos_sinteticos.filas(max(args.filas, 1000), seed=args.seed))
+    cuerpos = [json.dumps(f, ensure_ascii=False).encode("utf-8") for f in filas[:1000]]
+    ndjson = [json.dumps(f, ensure_ascii=False).encode("utf-8") + b"\n" for f in filas[:args.filas]]
+    ok = await carga_formatear(host, puerto, args.concurrencia, args.segundos, cuerpos)
+    ok &= await carga_lotes(host, puerto, ndjson)
+    await mostrar_metricas(host, puerto)
+    return ok
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Prueba de carga de la API HTTP de citador")
+    p.add_argument("--url", help="servidor ya levantado (por defecto se levanta uno local)")
+    p.add_argument("--procesos", type=int, default=0, help="procesos del servidor que se levanta")
+    p.add_argument("--concurrencia", type=int, default=16)
+    p.add_argument("--segundos", type=float, default=5)
+    p.add_argument("--filas", type=int, default=100000)
+    p.add_argument("--seed", type=int, default=2025)
+    args = p.parse_args(argv)
+
+    proc = None
+    if args.url:
+        u = urlsplit(args.url)
+        host, puerto = u.hostname, u.port or 80
+    else:
+        proc, puerto = levantar(args.procesos)
+        host = "127.0.0.1"
+    try:
+        ok = asyncio.run(correr(args, host, puerto))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# benchmarks/carga_sesiones.py
+# Prueba de carga de la UI con varias sesiones a la vez, con el AppTest de
+# Streamlit: --usuarios sesiones vivas, cada una con su session_state, que
+# generan --citas citas cada una con datos sintéticos de tipos distintos
+# (elegir el tipo, el número de autores, completar los campos, "Generar cita"
+# y de vez en cuando cambiar de página del historial). Una fracción
+# --en-vivo usa la vista previa, donde cada campo confirmado es un rerun.
+#
+# Las sesiones se turnan de a un rerun, en un solo proceso, como los hilos de
+# un servidor de Streamlit en un contenedor de un núcleo: lo que se mide es lo
+# que le cuesta al proceso atender a todos (las cachés del proceso, como la de
+# renderizar del historial, son compartidas). Informa:
+#
+#   reruns      latencia p50/p95/p99 y CPU (time.process_time) por rerun, en
+#               total y por acción
+#   memoria     session_state por usuario al final (mediana y máximo), las
+#               claves que más ocupan y, aparte, historial_citas: entradas,
+#               bytes por entrada y lo que ocuparía lleno (su capacidad)
+#   proceso     RSS al comienzo y al final, y el crecimiento por usuario
+#
+# Con --json guarda los resultados. Termina con código 1 si alguna sesión
+# tuvo excepciones o no quedó con todas sus citas en el historial, o si se
+# pasa de --max-p95-ms o --max-kb-usuario (para fijar límites de capacidad y
+# detectar regresiones). Requiere streamlit.
+#
+#   python benchmarks/carga_sesiones.py [--usuarios 20] [--citas 20] [--en-vivo 0.25]
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import datos_sinteticos  # noqa: E402
+from citador import memoria  # noqa: E402
+from citador.historial import CAPACIDAD_POR_DEFECTO  # noqa: E402
+
+# Keys de los campos de autores en citas_rchd.agregar_autores_ui: "ape1_0",
+# "editores_nom_1"...
+_CLAVE_AUTOR = re.compile(r"^(?:(.+)_)?(ape1|ape2|nom)_(\d+)$")
+_PARTES = {"ape1": "apellido1", "ape2": "apellido2", "nom": "nombre"}
+
+
+def _percentil(ordenados, q):
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+def _rss():
+    """RSS actual del proceso en bytes (Linux); en otros sistemas, el máximo alcanzado."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+def _valor_campo(clave, datos):
+    """Valor de los datos sintéticos para el text_input con esa key, o None si no es un campo del tipo."""
+    if clave.startswith("campo_"):
+        return datos.get(clave[len("campo_"):]) or ""
+    m = _CLAVE_AUTOR.match(clave)
+    if m is None:
+        return None
+    autores = datos.get(m.group(1) or "autores") or []
+    i = int(m.group(3))
+    return autores[i].get(_PARTES[m.group(2)], "") if i < len(autores) else ""
+
+def _cantidades(at, datos):
+    """(number_input, valor) del número de autores y de cada campo de autores del tipo."""
+    for w in at.number_input:
+        # Por key primero: "Número de autores del capítulo" también empieza como el general
+        if (w.key or "").startswith("n_"):
+            yield w, max(1, len(datos.get(w.key[2:]) or []))
+        elif w.label.startswith("Número de autores"):
+            yield w, len(datos.get("autores") or [])
+
+
+class Medicion:
+    """Latencia y CPU de cada rerun, por acción."""
+
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.cpu = defaultdict(list)
+
+    def correr(self, at, accion):
+        t0, c0 = time.perf_counter(), time.process_time()
+        at.run()
+        self.latencias[accion].append(time.perf_counter() - t0)
+        self.cpu[accion].append(time.process_time() - c0)
+
+    def resumen(self, accion=None):
+        acciones = [accion] if accion else list(self.latencias)
+        lat = sorted(x for a in acciones for x in self.latencias[a])
+        cpu = [x for a in acciones for x in self.cpu[a]]
+        return {"reruns": len(lat), "p50_ms": _percentil(lat, .5) * 1000, "p95_ms": _percentil(lat, .95) * 1000,
+                "p99_ms": _percentil(lat, .99) * 1000, "cpu_ms": statistics.mean(cpu) * 1000,
+                "cpu_total_s": sum(cpu)}
+
+
+def usuario(at, medicion, citas, en_vivo, r):
+    """
+    Una sesión: genera `citas` citas de tipos al azar. Es un generador que
+    cede el turno después de cada rerun, para intercalar las sesiones.
+    """
+    medicion.correr(at, "carga inicial")
+    yield
+    if en_vivo:
+        at.checkbox(key="vista_previa").check()
+        medicion.correr(at, "ajustes")
+        yield
+    tipos = list(datos_sinteticos.GENERADORES)
+    for n in range(citas):
+        tipo = r.choice(tipos)
+        datos = datos_sinteticos.datos(tipo, r)
+        selector = next(w for w in at.selectbox if w.label == "Tipo de fuente")
+        if selector.value != tipo:
+            selector.set_value(tipo)
+            medicion.correr(at, "tipo")
+            yield
+        # Cantidades de autores: cambian qué campos hay, cada una es un rerun
+        # (y después de cada uno hay que volver a buscar los widgets)
+        while True:
+            cambio = next(((w, c) for w, c in _cantidades(at, datos) if w.value != c), None)
+            if cambio is None:
+                break
+            cambio[0].set_value(cambio[1])
+            medicion.correr(at, "autores")
+            yield
+        for i in range(len(at.text_input)):
+            w = at.text_input[i]
+            valor = _valor_campo(w.key or "", datos)
+            if valor is None or valor == w.value:
+                continue
+            w.input(valor)
+            if en_vivo:
+                medicion.correr(at, "campo")
+                yield
+        next(b for b in at.button if b.label == "Generar cita").click()
+        medicion.correr(at, "generar")
+        yield
+        if n % 5 == 4:
+            pagina = next((w for w in at.number_input if w.key == "hist_pagina"), None)
+            if pagina is not None:
+                pagina.set_value(r.randint(1, int(pagina.max or 1)))
+                medicion.correr(at, "página del historial")
+                yield
+
+def memoria_sesion(at):
+    # Por la API de mapping (claves del usuario y widgets con key, sin las internas)
+    estado = {k: at.session_state[k] for k in list(at.session_state)}
+    historial = estado.get("historial_citas")
+    return {"bytes": memoria.tamaño(estado), "claves": memoria.por_clave(estado),
+            "historial_entradas": len(historial) if historial is not None else 0,
+            "historial_bytes": memoria.tamaño(historial) if historial is not None else 0}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Carga de la UI con varias sesiones: latencia, CPU y memoria por usuario")
+    p.add_argument("--usuarios", type=int, default=20)
+    p.add_argument("--citas", type=int, default=20, help="citas que genera cada usuario")
+    p.add_argument("--en-vivo", type=float, default=0.25, help="fracción de usuarios con vista previa en vivo")
+    p.add_argument("--seed", type=int, default=2025)
+    p.add_argument("--json", metavar="ARCHIVO", help="guarda los resultados en JSON")
+    p.add_argument("--max-p95-ms", type=float, help="falla si el p95 de los reruns lo supera")
+    p.add_argument("--max-kb-usuario", type=float, help="falla si algún session_state lo supera")
+    args = p.parse_args(argv)
+    r = random.Random(args.seed)
+    ruta = os.path.join(RAIZ, "citas_rchd.py")
+
+    medicion = Medicion()
+    rss_inicio = _rss()
+    t0 = time.perf_counter()
+    sesiones = [AppTest.from_file(ruta, default_timeout=60) for _ in range(args.usuarios)]
+    en_vivo = [i < args.usuarios * args.en_vivo for i in range(args.usuarios)]
+    activas = [usuario(at, medicion, args.citas, vivo, random.Random(r.random()))
+               for at, vivo in zip(sesiones, en_vivo)]
+    while activas:
+        for u in list(activas):
+            try:
+                next(u)
+            except StopIteration:
+                activas.remove(u)
+    total = time.perf_counter() - t0
+    rss_fin = _rss()
+
+    ok = True
+    memorias = [memoria_sesion(at) for at in sesiones]
+    for i, (at, m) in enumerate(zip(sesiones, memorias)):
+        if len(at.exception) or m["historial_entradas"] != min(args.citas, CAPACIDAD_POR_DEFECTO):
+            print(f"ERROR: usuario {i}: {len(at.exception)} excepciones, "
+                  f"{m['historial_entradas']} de {args.citas} citas en el historial")
+            ok = False
+
+    # ---------------- Reruns ----------------
+    general = medicion.resumen()
+    print(f"{args.usuarios} usuarios x {args.citas} citas ({sum(en_vivo)} con vista previa): "
+          f"{general['reruns']:,} reruns en {total:.1f} s, CPU {general['cpu_total_s']:.1f} s")
+    print(f"{'acción':<22} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'CPU ms':>8}")
+    for accion in [None, *medicion.latencias]:
+        s = medicion.resumen(accion)
+        print(f"{accion or 'todas':<22} {s['reruns']:>7,} {s['p50_ms']:8.1f} {s['p95_ms']:8.1f} "
+              f"{s['p99_ms']:8.1f} {s['cpu_ms']:8.1f}")
+
+    # ---------------- Memoria ----------------
+    por_usuario = sorted(m["bytes"] for m in memorias)
+    historial = sorted(m["historial_bytes"] for m in memorias)
+    por_entrada = statistics.median(m["historial_bytes"] / m["historial_entradas"]
+                                    for m in memorias if m["historial_entradas"]) if args.citas else 0
+    claves = defaultdict(list)
+    for m in memorias:
+        for k, b in m["claves"]:
+            claves[k].append(b)
+    mayores = sorted(claves, key=lambda k: -statistics.median(claves[k]))[:5]
+    print(f"session_state por usuario: mediana {statistics.median(por_usuario) / 1024:,.1f} KB, "
+          f"máximo {por_usuario[-1] / 1024:,.1f} KB")
+    print("  claves que más ocupan (mediana): "
+          + ", ".join(f"{k} {statistics.median(claves[k]) / 1024:,.1f} KB" for k in mayores))
+    print(f"historial_citas: mediana {statistics.median(historial) / 1024:,.1f} KB con "
+          f"{statistics.median(m['historial_entradas'] for m in memorias):.0f} entradas, "
+          f"{por_entrada:,.0f} B por entrada; lleno ({CAPACIDAD_POR_DEFECTO} citas) "
+          f"~{por_entrada * CAPACIDAD_POR_DEFECTO / 1024:,.0f} KB por usuario")
+    print(f"proceso: RSS {rss_inicio / 2**20:,.0f} MB al comienzo, {rss_fin / 2**20:,.0f} MB al final, "
+          f"{(rss_fin - rss_inicio) / max(1, args.usuarios) / 1024:,.0f} KB por usuario")
+
+    if args.max_p95_ms is not None and general["p95_ms"] > args.max_p95_ms:
+        print(f"ERROR: p95 {general['p95_ms']:.1f} ms > {args.max_p95_ms} ms")
+        ok = False
+    if args.max_kb_usuario is not None and por_usuario[-1] / 1024 > args.max_kb_usuario:
+        print(f"ERROR: session_state de {por_usuario[-1] / 1024:,.1f} KB > {args.max_kb_usuario} KB")
+        ok = False
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"usuarios": args.usuarios, "citas": args.citas, "en_vivo": args.en_vivo,
+                       "segundos": total, "reruns": {a or "todas": medicion.resumen(a)
+                                                     for a in [None, *medicion.latencias]},
+                       "memoria": {"session_state_bytes": por_usuario, "historial_bytes": historial,
+                                   "historial_bytes_por_entrada": por_entrada,
+                                   "claves_bytes": {k: statistics.median(v) for k, v in claves.items()}},
+                       "rss_inicio": rss_inicio, "rss_fin": rss_fin}, f, ensure_ascii=False, indent=2)
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
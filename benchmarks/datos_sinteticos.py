@@ -0,0 +1,150 @@
+# benchmarks/datos_sinteticos.py
+# Registros sintéticos realistas para los 14 TIPOS, con los casos que más
+# cuestan: 10 autores (y otros), tomos en números romanos, ediciones en
+# palabras, tipos de norma largos, fechas en varios formatos. Un mismo seed da
+# siempre las mismas filas, así que dos corridas miden el mismo trabajo.
+#
+# Las filas tienen la forma {"tipo", "datos"} que acepta lotes.registro_desde_fila.
+import random
+
+APELLIDOS = ["Pérez", "González", "Muñoz", "Núñez", "Rojas", "Díaz", "Soto", "Silva", "Contreras",
+             "Sepúlveda", "Ibáñez", "de la Fuente", "Álvarez", "Fernández", "Zúñiga", "Vial"]
+NOMBRES = ["Ana", "Juan", "María José", "Pedro", "Óscar", "Carolina", "Luis Felipe", "Ángela"]
+_PALABRAS = ["derecho", "civil", "penal", "constitucional", "tratado", "manual", "teoría", "general",
+             "obligaciones", "contratos", "responsabilidad", "procesal", "administrativo", "chileno",
+             "buena", "fe", "interpretación", "reforma", "sistema", "acción"]
+_MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+          "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+_TIPOS_NORMA = [
+    "Ley", "Ley Orgánica Constitucional", "Decreto con Fuerza de Ley", "Decreto Ley", "Código",
+    "Constitución Política de la República", "Decreto Supremo", "Reglamento", "Circular",
+    "Decreto con Fuerza de Ley que fija el texto refundido, coordinado y sistematizado de la ley",
+    "Oficio Ordinario de la Dirección del Trabajo sobre jornada y descansos",
+]
+
+
+def _autor(r):
+    return {"apellido1": r.choice(APELLIDOS), "apellido2": r.choice(APELLIDOS + ["", ""]),
+            "nombre": r.choice(NOMBRES)}
+
+def _autores(r):
+    # 1 de cada 10 con 10 autores, para el camino de "y otros"
+    n = 10 if r.random() < 0.1 else r.randint(1, 3)
+    return [_autor(r) for _ in range(n)]
+
+def _titulo(r, minimo=3, maximo=8):
+    return " ".join(r.sample(_PALABRAS, r.randint(minimo, maximo))).capitalize()
+
+def _año(r):
+    return str(r.randint(1950, 2025))
+
+def _fecha(r):
+    d, m, y = r.randint(1, 28), r.randint(1, 12), r.randint(1980, 2025)
+    return r.choice([f"{d:02d}/{m:02d}/{y}", f"{y}-{m:02d}-{d:02d}", f"{d} de {_MESES[m - 1]} de {y}",
+                     f"{d:02d}{m:02d}{y}", f"{d}-{m}-{y % 100:02d}"])
+
+def _paginas(r):
+    ini = r.randint(1, 400)
+    return f"{ini}-{ini + r.randint(1, 60)}"
+
+
+def _libro(r):
+    return {"autores": _autores(r), "año": _año(r), "titulo": _titulo(r), "ciudad": "Santiago",
+            "editorial": r.choice(["Editorial Jurídica de Chile", "Thomson Reuters", "Tirant lo Blanch"]),
+            "edicion": r.choice(["", "", "2", "3", "12", "segunda", "2ª ed."]),
+            "tomo": r.choice(["", "", "1", "4", "9", "14", "III"]), "paginas": ""}
+
+def _traduccion(r):
+    año = int(_año(r))
+    return {"autores": _autores(r), "año_original": str(año - r.randint(5, 80)), "año": str(año),
+            "titulo": _titulo(r), "traductor": f"{r.choice(NOMBRES)} {r.choice(APELLIDOS)}",
+            "ciudad": "Madrid", "editorial": "Marcial Pons"}
+
+def _capitulo(r):
+    return {"autores": [], "autor_capitulo": _autores(r), "editores": _autores(r), "año": _año(r),
+            "titulo_capitulo": _titulo(r), "titulo_libro": _titulo(r, 2, 5), "ciudad": "Valparaíso",
+            "editorial": "Ediciones Universitarias", "paginas": _paginas(r)}
+
+def _articulo(r):
+    return {"autores": _autores(r), "año": _año(r), "titulo": _titulo(r),
+            "revista": r.choice(["Revista Chilena de Derecho", "Ius et Praxis", "Revista de Derecho (Valdivia)"]),
+            "volumen": str(r.randint(1, 52)), "numero": str(r.randint(1, 4)), "paginas": _paginas(r),
+            "doi": r.choice(["", f"10.7764/R.{r.randint(100, 999)}.{r.randint(1, 9)}"]),
+            "url": r.choice(["", "https://www.scielo.cl/articulo"])}
+
+def _norma(r):
+    return {"pais": "Chile", "tipo_norma": r.choice(_TIPOS_NORMA), "numero": str(r.randint(1, 21500)),
+            "nombre_norma": r.choice(["", _titulo(r, 4, 10)]), "organismo": r.choice(["", "Ministerio de Justicia"]),
+            "año": _año(r)}
+
+def _decreto(r):
+    return {"pais": "Chile", "organismo": r.choice(["Ministerio de Hacienda", "Servicio de Impuestos Internos"]),
+            "tipo": r.choice(["Decreto Supremo", "Oficio", "Reglamento"]), "numero": str(r.randint(1, 999)),
+            "titulo": _titulo(r), "año": _año(r)}
+
+def _proyecto(r):
+    return {"pais": "Chile", "nombre": _titulo(r, 5, 10), "boletin": f"{r.randint(1000, 16000)}-{r.randint(1, 15):02d}",
+            "año": _año(r)}
+
+def _historia(r):
+    return {"pais": "Chile", "numero": str(r.randint(18000, 21500)), "titulo": _titulo(r), "año": _año(r)}
+
+def _documento(r):
+    return {"organismo": r.choice(["Organización de las Naciones Unidas", "Organización de Estados Americanos"]),
+            "titulo": _titulo(r, 4, 10), "año": _año(r)}
+
+def _instrumento(r):
+    return {"nombre": _titulo(r), "conferencia": "Conferencia Internacional del Trabajo", "año": _año(r)}
+
+def _jurisprudencia(r):
+    return {"estado": "Chile", "tribunal": r.choice(["Corte Suprema", "Tribunal Constitucional",
+                                                     "Corte de Apelaciones de Santiago"]),
+            "año": _año(r), "fecha": _fecha(r), "rol": f"{r.randint(1, 99999)}-{r.randint(2000, 2025)}",
+            "nombre_caso": r.choice(["", f"{r.choice(APELLIDOS)} con {r.choice(APELLIDOS)}"]),
+            "info_extra": r.choice(["", "recurso de protección"]), "fuente": r.choice(["", "vLex", "Westlaw"])}
+
+def _jurisprudencia_int(r):
+    return {"tribunal": "Corte Interamericana de Derechos Humanos",
+            "nombre_caso": f"{r.choice(APELLIDOS)} y otros vs. Chile", "fecha": _fecha(r),
+            "serie": f"Serie C N° {r.randint(1, 500)}"}
+
+def _web(r):
+    sin_autor = r.random() < 0.3
+    return {"autores": [] if sin_autor else _autores(r),
+            "autor_sin_autor": "Biblioteca del Congreso Nacional" if sin_autor else "", "año": _año(r),
+            "titulo": _titulo(r), "url": "https://www.bcn.cl/leychile", "fecha_consulta": _fecha(r)}
+
+def _tesis(r):
+    return {"autores": [_autor(r)], "año": _año(r), "titulo": _titulo(r),
+            "grado": r.choice(["Licenciado en Ciencias Jurídicas", "Doctor en Derecho"]),
+            "institucion": "Pontificia Universidad Católica de Chile", "paginas": str(r.randint(80, 600))}
+
+GENERADORES = {
+    "Libro": _libro,
+    "Traducción de libro": _traduccion,
+    "Capítulo de libro": _capitulo,
+    "Artículo de revista": _articulo,
+    "Norma": _norma,
+    "Decreto / Oficio / Reglamento": _decreto,
+    "Proyecto de ley": _proyecto,
+    "Historia de la ley": _historia,
+    "Documento internacional (ONU, OEA, etc.)": _documento,
+    "Instrumento emanado de congreso / conferencia": _instrumento,
+    "Jurisprudencia": _jurisprudencia,
+    "Jurisprudencia internacional": _jurisprudencia_int,
+    "Página web o blog": _web,
+    "Tesis": _tesis,
+}
+
+
+def datos(tipo, r):
+    """Un dict de datos para tipo, con el Random r."""
+    return GENERADORES[tipo](r)
+
+def filas(n, seed=2025, tipos=None):
+    """Itera n filas {"tipo", "datos"} repartidas entre los tipos, sin acumular."""
+    r = random.Random(seed)
+    tipos = list(tipos or GENERADORES)
+    for i in range(n):
+        tipo = tipos[i % len(tipos)]
+        yield {"tipo": tipo, "datos": GENERADORES[tipo](r)}
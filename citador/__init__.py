@@ -0,0 +1,14 @@
+# citador: motor de citas RChD sin UI.
+# Solo importa el núcleo; los módulos de lote, exportación, etc. se importan aparte.
+from .core import (
+    versalitas, smallcaps_html, limpiar_html, to_roman, edicion_spanish,
+    pages_prefix, normalize_date, clave_autor, formatear_autor, formatear_autores,
+    cita_abreviada, libro, traduccion_libro, capitulo_libro, articulo_revista,
+    norma, jurisprudencia, jurisprudencia_internacional, decreto_oficio,
+    proyecto_ley, historia_ley, documento_internacional, instrumento_conferencia,
+    web, tesis, TIPOS, TIPOS_CON_ABREVIADA, CONFIG_POR_DEFECTO, generar_cita,
+    TIPOS_RUNS, autor_runs, autores_runs, generar_runs, clasificar_norma,
+)
+from .render import a_html, a_texto, a_markdown
+from .memo import configurar_cache, estadisticas_cache, limpiar_cache
+from .registros import Autor, Registro, ESQUEMAS, CLASES, como_registro
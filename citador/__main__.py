@@ -0,0 +1,55 @@
+# citador/__main__.py
+# Punto de entrada de línea de comandos: python -m citador <subcomando> ...
+import argparse
+import sys
+
+from . import api, biblioteca, bibliografia, cache_disco, columnar, duplicados, lotes, manuscrito, validar
+
+
+def construir_parser():
+    p = argparse.ArgumentParser(prog="python -m citador", description="Citador RChD sin interfaz")
+    sub = p.add_subparsers(dest="subcomando", required=True)
+
+    fmt = sub.add_parser("formatear", help="formatea una bibliografía desde CSV/JSONL, BibTeX, RIS o CSL-JSON")
+    lotes.agregar_argumentos(fmt)
+    fmt.set_defaults(func=lotes.ejecutar)
+
+    col = sub.add_parser("columnar", help="formatea Parquet/Arrow/CSV por columnas (pyarrow) y escribe Parquet")
+    columnar.agregar_argumentos(col)
+    col.set_defaults(func=columnar.ejecutar)
+
+    bib = sub.add_parser("biblioteca", help="biblioteca de citas en SQLite")
+    biblioteca.agregar_argumentos(bib)
+    bib.set_defaults(func=biblioteca.ejecutar)
+
+    bibl = sub.add_parser("bibliografia", help="arma la bibliografía ordenada, con 2020a/2020b")
+    bibliografia.agregar_argumentos(bibl)
+    bibl.set_defaults(func=bibliografia.ejecutar)
+
+    cac = sub.add_parser("cache", help="revisa, poda o vacía la caché en disco de 'bibliografia --cache'")
+    cache_disco.agregar_argumentos(cac)
+    cac.set_defaults(func=cache_disco.ejecutar)
+
+    rev = sub.add_parser("revisar", help="revisa las citas de un manuscrito contra su bibliografía")
+    manuscrito.agregar_argumentos(rev)
+    rev.set_defaults(func=manuscrito.ejecutar)
+
+    val = sub.add_parser("validar", help="revisa los registros y avisa campos vacíos o mal escritos (JSONL)")
+    validar.agregar_argumentos(val)
+    val.set_defaults(func=validar.ejecutar)
+
+    dup = sub.add_parser("duplicados", help="agrupa referencias casi duplicadas")
+    duplicados.agregar_argumentos(dup)
+    dup.set_defaults(func=duplicados.ejecutar)
+
+    srv = sub.add_parser("api", help="API HTTP JSON local (formatear, cita abreviada y lotes en NDJSON)")
+    api.agregar_argumentos(srv)
+    srv.set_defaults(func=api.ejecutar)
+    return p
+
+def main(argv=None):
+    args = construir_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
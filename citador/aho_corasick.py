@@ -0,0 +1,79 @@
+# citador/aho_corasick.py
+# Búsqueda de muchos patrones a la vez (Aho-Corasick): el texto se recorre una
+# sola vez sin importar cuántos patrones haya, en vez de una regex o un find
+# por patrón. Las transiciones se completan a medida que aparecen caracteres
+# nuevos, así que cada carácter del texto cuesta un acceso a dict.
+
+
+class AhoCorasick:
+    def __init__(self, patrones=()):
+        self._hijos = [{}]      # trie: estado -> {carácter: estado}
+        self._falla = [0]
+        self._salida = [()]     # estado -> índices de patrones que terminan ahí
+        self._largos = []
+        self._delta = None      # transiciones completas, se llenan al buscar
+        for p in patrones:
+            self.agregar(p)
+
+    def agregar(self, patron):
+        """Agrega un patrón (no vacío) y devuelve su índice."""
+        if not patron:
+            raise ValueError("patrón vacío")
+        estado = 0
+        for c in patron:
+            sig = self._hijos[estado].get(c)
+            if sig is None:
+                sig = len(self._hijos)
+                self._hijos[estado][c] = sig
+                self._hijos.append({})
+                self._falla.append(0)
+                self._salida.append(())
+            estado = sig
+        indice = len(self._largos)
+        self._largos.append(len(patron))
+        self._salida[estado] += (indice,)
+        self._delta = None
+        return indice
+
+    def __len__(self):
+        return len(self._largos)
+
+    def _construir(self):
+        # BFS: la falla de cada estado es el sufijo propio más largo que
+        # también está en el trie; las salidas se heredan por la falla
+        hijos, falla, salida = self._hijos, self._falla, self._salida
+        cola = list(hijos[0].values())
+        for s in cola:
+            falla[s] = 0
+        for estado in cola:
+            for c, sig in hijos[estado].items():
+                f = falla[estado]
+                while f and c not in hijos[f]:
+                    f = falla[f]
+                falla[sig] = hijos[f].get(c, 0)
+                salida[sig] += salida[falla[sig]]
+                cola.append(sig)
+        self._delta = [dict(h) for h in hijos]
+
+    def _paso(self, estado, c):
+        # Transición que no está en delta: se resuelve por la falla y se guarda
+        inicial = estado
+        hijos, falla = self._hijos, self._falla
+        while estado and c not in hijos[estado]:
+            estado = falla[estado]
+        sig = hijos[estado].get(c, 0)
+        self._delta[inicial][c] = sig
+        return sig
+
+    def buscar(self, texto):
+        """Itera (inicio, fin, índice) de cada aparición, en orden de fin."""
+        if self._delta is None:
+            self._construir()
+        delta, salida, largos, paso = self._delta, self._salida, self._largos, self._paso
+        estado = 0
+        for i, c in enumerate(texto):
+            sig = delta[estado].get(c)
+            estado = paso(estado, c) if sig is None else sig
+            if salida[estado]:
+                for indice in salida[estado]:
+                    yield i + 1 - largos[indice], i + 1, indice
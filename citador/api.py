@@ -0,0 +1,283 @@
+# citador/api.py
+# API HTTP JSON para sistemas externos (ASGI puro, sin frameworks). Expone los
+# generadores de TIPOS y cita_abreviada:
+#
+#   GET  /salud             {"estado": "ok"}
+#   GET  /tipos             tipos y campos de cada uno (citador.registros)
+#   POST /formatear         {"tipo", "datos", "libro_y_otros"?, "umbral"?} -> referencia y cita
+#   POST /cita_abreviada    {"autores", "año", "paginas"?, "tomo"?, "tipo"?, "libro_y_otros"?, "umbral"?}
+#   POST /lotes?umbral=4    NDJSON, una fila por línea (como 'formatear') -> NDJSON en streaming
+#   GET  /metricas          latencias por ruta (y del motor, si están activas) en formato Prometheus
+#
+# /lotes lee el cuerpo de a trozos, arma bloques de filas y los reparte en un
+# pool de procesos; los resultados salen en el orden de entrada a medida que
+# terminan los bloques, con a lo más 2 bloques por proceso en vuelo. Nada se
+# acumula: miles de filas se procesan con memoria acotada.
+#
+#   python -m citador api --puerto 8000          (servidor propio, citador.servidor)
+#   uvicorn citador.api:app                      (si uvicorn está instalado)
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from . import core, lotes, memo, metricas
+from .core import CONFIG_POR_DEFECTO, TIPOS, generar_runs
+from .registros import campos_de
+from .render import a_html, a_texto
+
+MAX_CUERPO = 1 << 20        # 1 MB para las rutas de un registro
+_JSON = [(b"content-type", b"application/json; charset=utf-8")]
+_NDJSON = [(b"content-type", b"application/x-ndjson; charset=utf-8")]
+
+
+class ErrorPeticion(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# ---------------- Procesamiento ----------------
+def _config(umbral):
+    if umbral in (None, ""):
+        return CONFIG_POR_DEFECTO
+    try:
+        return {"y_otros_threshold": int(umbral)}
+    except (TypeError, ValueError):
+        raise ErrorPeticion(400, f"umbral inválido: {umbral!r}") from None
+
+def formatear_registro(cuerpo):
+    """Respuesta de /formatear para un registro ya decodificado."""
+    if not isinstance(cuerpo, dict):
+        raise ErrorPeticion(400, "se esperaba un objeto JSON")
+    config = _config(cuerpo.get("umbral"))
+    try:
+        tipo, registro, libro_y_otros = lotes.registro_desde_fila(cuerpo)
+    except lotes.RegistroInvalido as e:
+        raise ErrorPeticion(422, str(e)) from None
+    runs, cita = generar_runs(tipo, registro, config, libro_y_otros=libro_y_otros)
+    return {"tipo": tipo, "referencia": a_texto(runs), "referencia_html": a_html(runs), "cita": cita}
+
+def cita_de(cuerpo):
+    """Respuesta de /cita_abreviada."""
+    if not isinstance(cuerpo, dict):
+        raise ErrorPeticion(400, "se esperaba un objeto JSON")
+    config = _config(cuerpo.get("umbral"))
+    try:
+        autores = lotes.parsear_autores(cuerpo.get("autores"))
+        # Por el módulo: metricas.activar() reemplaza core.cita_abreviada
+        cita = core.cita_abreviada(autores, lotes._como_texto(cuerpo.get("año")),
+                                   paginas=lotes._como_texto(cuerpo.get("paginas")) or None,
+                                   tomo=lotes._como_texto(cuerpo.get("tomo")) or None, tipo=cuerpo.get("tipo"),
+                                   libro_y_otros=bool(cuerpo.get("libro_y_otros")),
+                                   y_otros_threshold=config["y_otros_threshold"])
+    except lotes.RegistroInvalido as e:
+        raise ErrorPeticion(422, str(e)) from None
+    return {"cita": cita}
+
+def _procesar_lineas(n0, lineas, config):
+    """Bloque de /lotes (corre en el pool): líneas NDJSON -> bytes NDJSON, en orden."""
+    salida = []
+    for n, linea in enumerate(lineas, n0):
+        try:
+            fila = json.loads(linea)
+        except ValueError as e:
+            r = lotes.Resultado(n, None, None, None, f"JSON inválido: {e}", linea)
+        else:
+            r = lotes.procesar_fila(n, fila, config)
+        if r.error is None:
+            d = {"n": n, "tipo": r.tipo, "referencia": a_texto(r.runs), "referencia_html": a_html(r.runs),
+                 "cita": r.cita}
+        else:
+            d = {"n": n, "error": r.error}
+        salida.append(json.dumps(d, ensure_ascii=False))
+    return ("\n".join(salida) + "\n").encode("utf-8")
+
+
+# ---------------- App ASGI ----------------
+class App:
+    def __init__(self, procesos=None, tam_bloque=200):
+        self.procesos = procesos if procesos is not None else int(os.environ.get("CITADOR_API_PROCESOS", "0"))
+        self.tam_bloque = tam_bloque
+        self._pool = None
+        self._trabajadores = 1
+
+    def _ejecutor(self):
+        # Perezoso: crear la app (uvicorn citador.api:app) no lanza procesos
+        if self._pool is None:
+            self._trabajadores = self.procesos or os.cpu_count() or 1
+            if self._trabajadores == 1:
+                self._pool = ThreadPoolExecutor(max_workers=1)
+            else:
+                self._pool = ProcessPoolExecutor(max_workers=self._trabajadores,
+                                                 initializer=memo.aplicar_configuracion,
+                                                 initargs=(memo.configuracion_actual(),))
+        return self._pool
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            msg = await receive()
+            if msg["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif msg["type"] == "lifespan.shutdown":
+                self.cerrar()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        metodo, ruta = scope["method"], scope["path"].rstrip("/") or "/"
+        nombre = "api_" + (ruta.strip("/") or "raiz")
+        t0 = time.perf_counter()
+        try:
+            if ruta == "/lotes" and metodo == "POST":
+                await self._lotes(scope, receive, send)
+            elif ruta in ("/formatear", "/cita_abreviada") and metodo == "POST":
+                cuerpo = await _leer_json(receive)
+                r = formatear_registro(cuerpo) if ruta == "/formatear" else cita_de(cuerpo)
+                await _responder(send, 200, r, t0)
+            elif ruta == "/salud" and metodo == "GET":
+                await _responder(send, 200, {"estado": "ok"}, t0)
+            elif ruta == "/tipos" and metodo == "GET":
+                await _responder(send, 200, {t: [{"nombre": c.nombre, "etiqueta": c.etiqueta, "tipo": c.tipo}
+                                                 for c in campos_de(t)] for t in TIPOS}, t0)
+            elif ruta == "/metricas" and metodo == "GET":
+                await _responder_texto(send, 200, metricas.a_prometheus().encode("utf-8"),
+                                       b"text/plain; version=0.0.4; charset=utf-8")
+            elif ruta in ("/lotes", "/formatear", "/cita_abreviada", "/salud", "/tipos", "/metricas"):
+                raise ErrorPeticion(405, f"método {metodo} no permitido en {ruta}")
+            else:
+                nombre = "api_desconocida"
+                raise ErrorPeticion(404, f"no existe {ruta}")
+        except ErrorPeticion as e:
+            metricas.contar_error(nombre)
+            await _responder(send, e.estado, {"error": str(e)}, t0)
+        except Exception as e:
+            metricas.contar_error(nombre)
+            await _responder(send, 500, {"error": f"{type(e).__name__}: {e}"}, t0)
+        finally:
+            metricas.observar(nombre, time.perf_counter() - t0)
+
+    async def _lotes(self, scope, receive, send):
+        config = _config(parse_qs(scope["query_string"].decode("latin-1")).get("umbral", [None])[0])
+        loop = asyncio.get_running_loop()
+        pool = self._ejecutor()
+        max_en_vuelo = 2 * self._trabajadores
+        en_vuelo = deque()
+        await send({"type": "http.response.start", "status": 200, "headers": _NDJSON})
+        try:
+            await self._lotes_cuerpo(receive, send, loop, pool, config, en_vuelo, max_en_vuelo)
+        except Exception as e:
+            # El 200 ya salió: el error va como última línea del NDJSON
+            metricas.contar_error("api_lotes")
+            for f in en_vuelo:
+                f.cancel()
+            linea = json.dumps({"error": f"{type(e).__name__}: {e}"}, ensure_ascii=False) + "\n"
+            await send({"type": "http.response.body", "body": linea.encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _lotes_cuerpo(self, receive, send, loop, pool, config, en_vuelo, max_en_vuelo):
+        async def enviar_primero():
+            await send({"type": "http.response.body", "body": await en_vuelo.popleft(), "more_body": True})
+
+        async def despachar(bloque, n0):
+            en_vuelo.append(loop.run_in_executor(pool, _procesar_lineas, n0, bloque, config))
+            if len(en_vuelo) >= max_en_vuelo:
+                await enviar_primero()
+
+        pendiente, bloque, n = b"", [], 1
+        mas = True
+        while mas:
+            msg = await receive()
+            if msg["type"] == "http.disconnect":
+                break
+            mas = msg.get("more_body", False)
+            trozo = pendiente + msg.get("body", b"")
+            lineas = trozo.split(b"\n")
+            pendiente = lineas.pop() if mas else b""
+            for linea in lineas:
+                if linea.strip():
+                    bloque.append(linea)
+                if len(bloque) >= self.tam_bloque:
+                    await despachar(bloque, n)
+                    n += len(bloque)
+                    bloque = []
+        if bloque:
+            await despachar(bloque, n)
+        while en_vuelo:
+            await enviar_primero()
+
+
+async def _leer_json(receive):
+    partes, total = [], 0
+    while True:
+        msg = await receive()
+        if msg["type"] == "http.disconnect":
+            break
+        partes.append(msg.get("body", b""))
+        total += len(partes[-1])
+        if total > MAX_CUERPO:
+            raise ErrorPeticion(413, f"cuerpo de más de {MAX_CUERPO} bytes; usar /lotes")
+        if not msg.get("more_body", False):
+            break
+    try:
+        return json.loads(b"".join(partes))
+    except ValueError as e:
+        raise ErrorPeticion(400, f"JSON inválido: {e}") from None
+
+async def _responder(send, estado, cuerpo, t0):
+    datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+    headers = _JSON + [(b"content-length", str(len(datos)).encode()),
+                       (b"server-timing", f"app;dur={(time.perf_counter() - t0) * 1000:.3f}".encode())]
+    await send({"type": "http.response.start", "status": estado, "headers": headers})
+    await send({"type": "http.response.body", "body": datos})
+
+async def _responder_texto(send, estado, datos, tipo_contenido):
+    await send({"type": "http.response.start", "status": estado,
+                "headers": [(b"content-type", tipo_contenido), (b"content-length", str(len(datos)).encode())]})
+    await send({"type": "http.response.body", "body": datos})
+
+
+app = App()
+
+
+# ---------------- CLI ----------------
+def agregar_argumentos(p):
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--puerto", type=int, default=8000)
+    p.add_argument("--procesos", type=lotes.entero_no_negativo, default=0,
+                   help="procesos para /lotes (0 = uno por núcleo, 1 = un hilo en el mismo proceso)")
+    p.add_argument("--tam-bloque", type=lotes.entero_positivo, default=200, help="filas por bloque en /lotes")
+    p.add_argument("--metricas", action="store_true", help="mide también los tiempos del motor por tipo")
+    p.add_argument("--servidor", choices=["propio", "uvicorn"], default="propio",
+                   help="servidor ASGI (uvicorn debe estar instalado)")
+
+def ejecutar(args):
+    if args.metricas:
+        metricas.activar()
+    aplicacion = App(procesos=args.procesos, tam_bloque=args.tam_bloque)
+    if args.servidor == "uvicorn":
+        try:
+            import uvicorn
+        except ImportError:
+            print("uvicorn no está instalado; usar --servidor propio", file=sys.stderr)
+            return 2
+        uvicorn.run(aplicacion, host=args.host, port=args.puerto, log_level="warning")
+    else:
+        from .servidor import correr
+        correr(aplicacion, args.host, args.puerto)
+    return 0
@@ -0,0 +1,206 @@
+# citador/autocompletar.py
+# Índices de autocompletado sin conexión: leyes chilenas (por número y por
+# nombre), tribunales y revistas, desde los archivos de citador/datos/, y los
+# autores que el usuario ya usó, que se agregan a medida que genera citas.
+#
+# Cada índice es un arreglo ordenado de claves plegadas (sin mayúsculas,
+# tildes ni puntuación, "Ley N° 19.880" -> "ley 19880") en el que se busca el
+# prefijo con bisect: O(log n) más las coincidencias revisadas, que tienen un
+# tope. Cada entrada se indexa también desde el comienzo de cada palabra
+# significativa, así "suprema" encuentra "Corte Suprema" y "procedimientos"
+# la Ley N° 19.880.
+#
+# Los archivos se leen recién cuando se pide el índice (indice()), no al
+# importar el módulo; `import citador` no lo importa.
+import bisect
+import csv
+import os
+import re
+import threading
+from collections import namedtuple
+
+from .texto import plegar_palabras
+
+# texto: lo que se muestra; valores: campo -> valor para completar el formulario
+Sugerencia = namedtuple("Sugerencia", "texto valores")
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos")
+
+# Más allá de este largo las consultas y claves se truncan: nadie escribe 48
+# letras antes de elegir una sugerencia, y las claves de sufijo no crecen
+LARGO_CLAVE = 48
+# Coincidencias que se revisan para ordenar por peso; con un prefijo de una
+# letra sobre decenas de miles de entradas, el costo no depende de cuántas calcen
+MAX_REVISADAS = 200
+
+_RE_PUNTO_NUMERO = re.compile(r"(?<=\d)\.(?=\d)")
+_RE_ORDINAL = re.compile(r"[°ºª]")
+# "N°", "Nro." no distinguen nada: "ley 19880" debe encontrar "Ley N° 19.880"
+_RUIDO = frozenset(("n", "nro", "num"))
+# No se indexa desde estas palabras (sí cuentan dentro de la clave)
+_VACIAS = frozenset("a al con de del e el en la las lo los o para por que se sobre su sus u y "
+                    "of the and".split())
+
+
+def clave(texto):
+    """'Ley N° 19.880' -> 'ley 19880'; la misma normalización para entradas y consultas."""
+    t = plegar_palabras(_RE_ORDINAL.sub(" ", _RE_PUNTO_NUMERO.sub("", texto)))
+    return " ".join(p for p in t.split() if p not in _RUIDO)
+
+def _claves_de(texto):
+    """La clave completa y una desde cada palabra significativa (truncadas)."""
+    palabras = clave(texto).split()
+    for i, p in enumerate(palabras):
+        if i == 0 or p not in _VACIAS:
+            yield " ".join(palabras[i:i + LARGO_CLAVE // 2])[:LARGO_CLAVE], i == 0
+
+
+# ---------------- Índice ----------------
+class IndicePrefijos:
+    """
+    Arreglo ordenado de claves con la entrada de cada una. Las entradas
+    repetidas (misma clave completa) no se duplican: suben de peso, y a igual
+    posición de la coincidencia se sugieren primero las de más peso.
+    """
+
+    def __init__(self, entradas=()):
+        self._claves = []
+        self._refs = []          # por clave: n_entrada * 2 + (1 si es la clave completa)
+        self._entradas = []
+        self._pesos = []
+        self._por_clave = {}     # clave completa -> n_entrada
+        if entradas:
+            self.extender(entradas)
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _nueva(self, texto, valores, alias, peso):
+        """Registra la entrada; devuelve su número, o None si ya existía (y le suma el peso)."""
+        k = clave(texto)
+        if not k:
+            return None
+        n = self._por_clave.get(k)
+        if n is not None:
+            self._pesos[n] += peso
+            self._entradas[n] = Sugerencia(texto, valores)
+            return None
+        n = self._por_clave[k] = len(self._entradas)
+        self._entradas.append(Sugerencia(texto, valores))
+        self._pesos.append(peso)
+        return [(c, n * 2 + completa) for t in (texto, *alias) for c, completa in _claves_de(t)]
+
+    def agregar(self, texto, valores=None, alias=(), peso=1):
+        """Agrega una entrada (o le suma peso si ya estaba)."""
+        self.extender([(texto, valores if valores is not None else {}, alias)], peso)
+
+    def extender(self, entradas, peso=1):
+        """
+        Agrega muchas entradas (texto, valores[, alias]). Pocas claves nuevas se
+        insertan en su lugar; muchas se agregan al final y se reordena una vez.
+        """
+        nuevas = []
+        for texto, valores, *alias in entradas:
+            nuevas.extend(self._nueva(texto, valores, alias[0] if alias else (), peso) or ())
+        if len(nuevas) <= 32:
+            for c, ref in nuevas:
+                i = bisect.bisect_right(self._claves, c)
+                self._claves.insert(i, c)
+                self._refs.insert(i, ref)
+            return
+        pares = sorted([*zip(self._claves, self._refs), *nuevas])
+        self._claves = [c for c, _ in pares]
+        self._refs = [r for _, r in pares]
+
+    def buscar(self, consulta, limite=8):
+        """
+        Sugerencias cuyo texto (o alguna palabra de él) empieza como `consulta`:
+        primero las que calzan desde el comienzo, luego por peso.
+        """
+        q = clave(consulta)[:LARGO_CLAVE]
+        if not q:
+            return []
+        claves = self._claves
+        i = bisect.bisect_left(claves, q)
+        fin = bisect.bisect_left(claves, q + "\U0010ffff", i, min(len(claves), i + MAX_REVISADAS))
+        vistas = {}
+        for ref in self._refs[i:fin]:
+            n = ref >> 1
+            vistas[n] = vistas.get(n, 0) | ref & 1
+        pesos = self._pesos
+        orden = sorted(vistas, key=lambda n: (-vistas[n], -pesos[n]))
+        return [self._entradas[n] for n in orden[:limite]]
+
+
+# ---------------- Datos incluidos ----------------
+def _leer_tsv(nombre):
+    with open(os.path.join(DIRECTORIO_DATOS, nombre), encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f, delimiter="\t")
+
+def _leyes():
+    for f in _leer_tsv("leyes.tsv"):
+        valores = {"tipo_norma": f["tipo_norma"], "numero": f["numero"], "nombre_norma": f["nombre_norma"]}
+        if f["año"]:
+            valores["año"] = f["año"]  # los códigos no traen año: no se borra el que se haya escrito
+        if f["numero"]:
+            texto = f"{f['tipo_norma']} N° {f['numero']}, {f['nombre_norma']}"
+        else:
+            texto = f["nombre_norma"]
+        yield texto, valores, [a for a in (f["alias"],) if a]
+
+def _tribunales():
+    for f in _leer_tsv("tribunales.tsv"):
+        yield f["tribunal"], {"tribunal": f["tribunal"], "estado": f["estado"]}
+
+def _revistas():
+    for f in _leer_tsv("revistas.tsv"):
+        yield f["revista"], {"revista": f["revista"]}
+
+CARGADORES = {"leyes": _leyes, "tribunales": _tribunales, "revistas": _revistas}
+
+# Qué índice sugiere cada campo de los formularios: (tipo de fuente, campo) -> índice
+CAMPOS = {
+    ("Norma", "tipo_norma"): "leyes",
+    ("Norma", "numero"): "leyes",
+    ("Norma", "nombre_norma"): "leyes",
+    ("Jurisprudencia", "tribunal"): "tribunales",
+    ("Jurisprudencia internacional", "tribunal"): "tribunales",
+    ("Artículo de revista", "revista"): "revistas",
+}
+
+_cargados = {}
+_candado = threading.Lock()
+
+def indice(nombre):
+    """
+    Índice de los datos incluidos ('leyes', 'tribunales', 'revistas'); se
+    arma la primera vez que se pide y luego se comparte (solo lectura) entre
+    sesiones e hilos.
+    """
+    ind = _cargados.get(nombre)
+    if ind is None:
+        with _candado:
+            ind = _cargados.get(nombre)
+            if ind is None:
+                ind = _cargados[nombre] = IndicePrefijos(CARGADORES[nombre]())
+    return ind
+
+
+# ---------------- Autores ----------------
+def texto_autor(autor):
+    """'Pérez González, Ana' (o solo los apellidos, para entidades)."""
+    apellidos = " ".join(p for p in (autor.get("apellido1", ""), autor.get("apellido2", "")) if p)
+    nombre = autor.get("nombre", "")
+    return f"{apellidos}, {nombre}" if nombre else apellidos
+
+def agregar_autores(ind, registros):
+    """
+    Agrega al índice los autores de registros o dicts de datos (autores,
+    editores, autores del capítulo...); los que ya estaban suben de peso.
+    """
+    ind.extender((texto_autor(a), {"apellido1": a.get("apellido1", ""), "apellido2": a.get("apellido2", ""),
+                                   "nombre": a.get("nombre", "")})
+                 for datos in registros
+                 for campo in ("autores", "autor_capitulo", "editores")
+                 for a in datos.get(campo) or ()
+                 if a.get("apellido1", ""))
@@ -0,0 +1,218 @@
+# citador/bibliografia.py
+# Armado de la bibliografía completa: formatea un conjunto de registros, quita
+# los repetidos, desambigua con a/b/c las obras del mismo autor y año, y
+# ordena alfabéticamente con reglas del español.
+#
+# Todo en una pasada: cada entrada se formatea una vez y se indexa por
+# (autores de la cita abreviada, año). Solo los grupos con más de una obra
+# reciben sufijo, que se escribe igual en la referencia ("(2020a):") y en la
+# cita abreviada ("PÉREZ (2020a)"). Las claves de orden se calculan una vez
+# por entrada (y una vez por apellido distinto) antes de ordenar.
+#
+# Con --cache, lo que depende solo de cada registro (runs, cita sin sufijo y
+# las partes de la clave de orden) se guarda en una caché en disco
+# (citador.cache_disco): una reconstrucción nocturna con pocos cambios solo
+# formatea los registros nuevos o modificados.
+import json
+import sys
+from collections import defaultdict, namedtuple
+
+from .cache_disco import MAX_BYTES_POR_DEFECTO, CacheDisco
+from .core import CONFIG_POR_DEFECTO, generar_runs
+from .registros import como_registro, titulo_principal
+from .render import RENDERERS, a_texto
+from .texto import clave_orden
+
+# runs y cita ya llevan el sufijo; clave es la clave de orden precalculada
+Entrada = namedtuple("Entrada", "tipo registro libro_y_otros runs cita sufijo clave")
+
+# Campo de autores con que parte la referencia, si no es "autores"
+_AUTORES_REFERENCIA = {"Capítulo de libro": "autor_capitulo"}
+
+
+def sufijo(i):
+    """0 -> 'a', 25 -> 'z', 26 -> 'aa', ..."""
+    letras = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        letras = chr(ord("a") + r) + letras
+    return letras
+
+def _clave_año(año):
+    # Años numéricos en orden numérico; "s.f." y similares al final
+    return (0, int(año), "") if año.isdigit() else (1, 0, clave_orden(año))
+
+def _con_sufijo(runs, cita, año, letra):
+    marca = f"{año})"
+    runs = list(runs)
+    for i, (texto, estilo) in enumerate(runs):
+        if marca in texto:
+            runs[i] = (texto.replace(marca, f"{año}{letra})", 1), estilo)
+            break
+    return runs, cita.replace(f" ({año})", f" ({año}{letra})", 1)
+
+
+# ---------------- API ----------------
+def _datos_entrada(tipo, registro, libro_y_otros, config, k):
+    """
+    Lo que depende solo del registro: runs y cita sin sufijo, la clave del
+    grupo de a/b/c (None si la cita no es "AUTOR (año)..."), la clave de los
+    autores de la referencia, si esta sale de los runs (sin autores: hay que
+    recalcularla si recibe sufijo) y la del título.
+    """
+    runs, cita = generar_runs(tipo, registro, config, libro_y_otros)
+    año = registro.get("año")
+    # Solo las citas de la forma "AUTOR (año)..." pueden chocar; el autor
+    # se compara plegado, para que "PEREZ" y "PÉREZ" cuenten como el mismo
+    pos = cita.find(f" ({año})") if año else -1
+    autores = [a for a in registro.get(_AUTORES_REFERENCIA.get(tipo, "autores"), ()) if a.apellido1 or a.nombre]
+    if autores:
+        principal = tuple((k(a.apellido1), k(a.apellido2), k(a.nombre)) for a in autores)
+    else:
+        principal = ((k(a_texto(runs)), "", ""),)
+    return runs, cita, k(cita[:pos]) if pos > 0 else None, principal, not autores, k(titulo_principal(registro))
+
+def _sin_repetir(registros, config, k):
+    vistos = set()
+    for tipo, datos, libro_y_otros in registros:
+        registro = como_registro(tipo, datos)
+        antes = len(vistos)
+        vistos.add((tipo, registro, bool(libro_y_otros)))
+        if len(vistos) > antes:
+            yield tipo, registro, bool(libro_y_otros), _datos_entrada(tipo, registro, libro_y_otros, config, k)
+
+def _sin_repetir_con_cache(registros, config, k, cache):
+    """
+    Como _sin_repetir, pero primero se calculan las claves de todos los
+    registros y se piden a la caché de una vez; solo se formatean los que
+    faltan, que se guardan juntos al final.
+    """
+    vistos = set()
+    pendientes = []
+    for tipo, datos, libro_y_otros in registros:
+        registro = como_registro(tipo, datos)
+        clave = cache.clave(tipo, registro, libro_y_otros, config)
+        if clave not in vistos:
+            vistos.add(clave)
+            pendientes.append((clave, tipo, registro, bool(libro_y_otros)))
+    guardados = cache.obtener_muchos([p[0] for p in pendientes])
+    nuevos = []
+    for clave, tipo, registro, libro_y_otros in pendientes:
+        # marshal devuelve las mismas tuplas y listas que se guardaron
+        datos_entrada = guardados.get(clave)
+        if datos_entrada is None:
+            datos_entrada = _datos_entrada(tipo, registro, libro_y_otros, config, k)
+            nuevos.append((clave, datos_entrada))
+        yield tipo, registro, libro_y_otros, datos_entrada
+    cache.guardar_muchos(nuevos)
+
+def construir_bibliografia(registros, config=None, cache=None):
+    """
+    registros: iterable de (tipo, datos, libro_y_otros). Devuelve la lista de
+    Entrada ordenada como va en la bibliografía. Los registros idénticos se
+    incluyen una sola vez. Lanza KeyError si un tipo no existe. Con cache (una
+    CacheDisco) solo se formatean los registros que no estén en ella.
+    """
+    config = config or CONFIG_POR_DEFECTO
+    claves = {}     # texto -> clave_orden, compartido entre entradas
+
+    def k(texto):
+        c = claves.get(texto)
+        if c is None:
+            c = claves[texto] = clave_orden(texto)
+        return c
+
+    if cache is None:
+        fuente = _sin_repetir(registros, config, k)
+    else:
+        fuente = _sin_repetir_con_cache(registros, config, k, cache)
+    entradas = []
+    grupos = defaultdict(list)
+    for tipo, registro, libro_y_otros, (runs, cita, grupo, principal, de_runs, titulo) in fuente:
+        if grupo is not None:
+            grupos[(grupo, registro.get("año"))].append(len(entradas))
+        entradas.append([tipo, registro, libro_y_otros, runs, cita, "", principal, de_runs, titulo])
+
+    for indices in grupos.values():
+        if len(indices) < 2:
+            continue
+        indices.sort(key=lambda i: (entradas[i][8], i))
+        for n, i in enumerate(indices):
+            e = entradas[i]
+            e[5] = sufijo(n)
+            e[3], e[4] = _con_sufijo(e[3], e[4], e[1].año, e[5])
+
+    resultado = []
+    for tipo, registro, libro_y_otros, runs, cita, letra, principal, de_runs, titulo in entradas:
+        if de_runs and letra:
+            principal = ((k(a_texto(runs)), "", ""),)
+        clave = (principal, _clave_año(registro.get("año")), letra, titulo)
+        resultado.append(Entrada(tipo, registro, libro_y_otros, runs, cita, letra, clave))
+    resultado.sort(key=lambda e: e.clave)
+    return resultado
+
+
+# ---------------- CLI ----------------
+def agregar_argumentos(p):
+    from .lotes import FORMATOS_ENTRADA
+
+    p.add_argument("entrada", help="registros en CSV, JSONL, BibTeX, RIS o CSL-JSON (como 'formatear')")
+    p.add_argument("-o", "--salida", default="-", help="archivo de salida ('-' = stdout)")
+    p.add_argument("--formato-entrada", choices=FORMATOS_ENTRADA)
+    p.add_argument("--formato-salida", choices=["lista", "jsonl", "docx", "rtf", "html"],
+                   help="lista: una referencia por línea; jsonl: referencia y cita; docx/rtf/html: documento "
+                        "con cursivas y versalitas (por defecto según la extensión)")
+    p.add_argument("--titulo", help="título del documento (docx, rtf, html)")
+    p.add_argument("--render", choices=sorted(RENDERERS), default="texto")
+    p.add_argument("--umbral", type=int, default=CONFIG_POR_DEFECTO["y_otros_threshold"],
+                   help="umbral para 'y otros' (3 o 4)")
+    p.add_argument("--cache", metavar="ARCHIVO",
+                   help="caché en disco de las entradas: en la corrida siguiente solo se formatean los registros "
+                        "nuevos o cambiados")
+    p.add_argument("--cache-max-mb", type=float, default=MAX_BYTES_POR_DEFECTO / 2**20,
+                   help="tamaño máximo de los valores en la caché")
+
+def ejecutar(args):
+    from . import exportar, lotes
+
+    fmt_in = args.formato_entrada or lotes.detectar_formato(args.entrada)
+    fmt_out = (args.formato_salida or exportar.formato_por_extension(args.salida)
+               or ("jsonl" if lotes.detectar_formato(args.salida) == "jsonl" else "lista"))
+    render = RENDERERS[args.render]
+
+    def registros():
+        for n, fila in lotes.leer_filas(entrada, fmt_in):
+            try:
+                yield lotes.registro_desde_fila(fila)
+            except lotes.RegistroInvalido as e:
+                print(f"fila {n}: {e}", file=sys.stderr)
+
+    cache = None
+    if args.cache:
+        cache = CacheDisco(args.cache, max_bytes=int(args.cache_max_mb * 2**20))
+    try:
+        with lotes.abrir_texto(args.entrada) as entrada:
+            bibliografia = construir_bibliografia(registros(), {"y_otros_threshold": args.umbral}, cache=cache)
+        if cache is not None:
+            cache.podar()
+            print(cache.informe(), file=sys.stderr)
+    finally:
+        if cache is not None:
+            cache.cerrar()
+    if fmt_out in exportar.EXPORTADORES:
+        salida = exportar.abrir_salida(args.salida, fmt_out)
+        exportar.exportar((e.runs for e in bibliografia), salida, fmt_out, titulo=args.titulo)
+    else:
+        salida = lotes.abrir_texto(args.salida, "w")
+        for e in bibliografia:
+            if fmt_out == "jsonl":
+                salida.write(json.dumps({"tipo": e.tipo, "referencia": render(e.runs), "cita": e.cita},
+                                        ensure_ascii=False) + "\n")
+            else:
+                salida.write(render(e.runs) + "\n")
+    if salida not in (sys.stdout, sys.stdout.buffer):
+        salida.close()
+    print(f"{len(bibliografia)} entradas, {sum(1 for e in bibliografia if e.sufijo)} con sufijo",
+          file=sys.stderr)
+    return 0
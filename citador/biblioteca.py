@@ -0,0 +1,274 @@
+# citador/biblioteca.py
+# Biblioteca de citas persistente en SQLite local. Guarda los datos
+# estructurados (JSON), el tipo, la referencia renderizada y la cita abreviada,
+# con índices por apellido del primer autor, año y tipo, y búsqueda de texto
+# completo (FTS5) sobre los títulos.
+#
+# La base usa WAL, así que varios procesos de la app pueden leer mientras
+# otro escribe. Las lecturas son paginadas por keyset (id), de modo que abrir
+# una biblioteca de decenas de miles de entradas solo lee la primera página.
+import json
+import re
+import sqlite3
+import sys
+
+from .core import CONFIG_POR_DEFECTO, generar_cita, generar_runs
+from .registros import Registro, como_registro, primer_autor, titulo_principal
+from .texto import plegar
+
+TAM_PAGINA = 50
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS citas (
+    id INTEGER PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    datos TEXT NOT NULL,
+    libro_y_otros INTEGER NOT NULL DEFAULT 0,
+    referencia TEXT NOT NULL,
+    referencia_html TEXT NOT NULL,
+    cita TEXT NOT NULL,
+    apellido TEXT NOT NULL DEFAULT '',
+    año TEXT NOT NULL DEFAULT '',
+    titulo TEXT NOT NULL DEFAULT '',
+    creada TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_citas_apellido ON citas(apellido);
+CREATE INDEX IF NOT EXISTS idx_citas_año ON citas(año);
+CREATE INDEX IF NOT EXISTS idx_citas_tipo ON citas(tipo);
+"""
+
+_ESQUEMA_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS citas_fts USING fts5(
+    titulo, content='citas', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS citas_ai AFTER INSERT ON citas BEGIN
+    INSERT INTO citas_fts(rowid, titulo) VALUES (new.id, new.titulo);
+END;
+CREATE TRIGGER IF NOT EXISTS citas_ad AFTER DELETE ON citas BEGIN
+    INSERT INTO citas_fts(citas_fts, rowid, titulo) VALUES ('delete', old.id, old.titulo);
+END;
+CREATE TRIGGER IF NOT EXISTS citas_au AFTER UPDATE OF titulo ON citas BEGIN
+    INSERT INTO citas_fts(citas_fts, rowid, titulo) VALUES ('delete', old.id, old.titulo);
+    INSERT INTO citas_fts(rowid, titulo) VALUES (new.id, new.titulo);
+END;
+"""
+
+_RE_TERMINO = re.compile(r"\w+")
+
+
+def _apellido(registro):
+    """apellido1 del primer autor con datos, plegado para indexar."""
+    a = primer_autor(registro)
+    return plegar(a.apellido1) if a is not None else ""
+
+def _consulta_fts(texto):
+    # Cada palabra como término literal con prefijo: 'derecho civ' -> "derecho"* "civ"*
+    return " ".join(f'"{t}"*' for t in _RE_TERMINO.findall(texto))
+
+
+class Biblioteca:
+    def __init__(self, ruta, timeout=30.0):
+        self.ruta = ruta
+        self.conn = sqlite3.connect(ruta, timeout=timeout, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(_ESQUEMA)
+            try:
+                self.conn.executescript(_ESQUEMA_FTS)
+                self.fts = True
+            except sqlite3.OperationalError:
+                # SQLite sin FTS5: la búsqueda por título cae a LIKE
+                self.fts = False
+
+    def cerrar(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    # ---------------- Escritura ----------------
+    def _fila(self, tipo, datos, libro_y_otros, config, renderizada):
+        registro = datos if isinstance(datos, Registro) else como_registro(tipo, datos)
+        if renderizada is None:
+            renderizada = generar_cita(tipo, registro, config, libro_y_otros=libro_y_otros)
+        ref_html, ref_texto, cita = renderizada
+        return (tipo, json.dumps(registro.a_dict(), ensure_ascii=False), int(bool(libro_y_otros)),
+                ref_texto, ref_html, cita, _apellido(registro), registro.get("año"), titulo_principal(registro))
+
+    def guardar(self, tipo, datos, libro_y_otros=False, config=None, renderizada=None):
+        """
+        Guarda un registro y devuelve su id. Si ya se tiene la salida de
+        generar_cita se puede pasar en renderizada para no volver a formatear.
+        """
+        fila = self._fila(tipo, datos, libro_y_otros, config or CONFIG_POR_DEFECTO, renderizada)
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO citas (tipo, datos, libro_y_otros, referencia, referencia_html, cita, "
+                "apellido, año, titulo) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", fila)
+        return cur.lastrowid
+
+    def guardar_muchos(self, registros, config=None):
+        """registros: iterable de (tipo, datos, libro_y_otros). Una sola transacción."""
+        config = config or CONFIG_POR_DEFECTO
+        filas = (self._fila(t, d, l, config, None) for t, d, l in registros)
+        with self.conn:
+            cur = self.conn.executemany(
+                "INSERT INTO citas (tipo, datos, libro_y_otros, referencia, referencia_html, cita, "
+                "apellido, año, titulo) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", filas)
+        return cur.rowcount
+
+    def eliminar(self, id_cita):
+        with self.conn:
+            self.conn.execute("DELETE FROM citas WHERE id = ?", (id_cita,))
+
+    def limpiar(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM citas")
+
+    # ---------------- Lectura ----------------
+    def _filtros(self, tipo=None, apellido=None, año=None, texto=None):
+        where, params = [], []
+        if tipo:
+            where.append("tipo = ?")
+            params.append(tipo)
+        if apellido:
+            where.append("apellido >= ? AND apellido < ?")
+            a = plegar(apellido)
+            params += [a, a + "\uffff"]   # prefijo, usando el índice
+        if año:
+            where.append("año = ?")
+            params.append(str(año).strip())
+        if texto:
+            if self.fts:
+                consulta = _consulta_fts(texto)
+                if consulta:
+                    where.append("id IN (SELECT rowid FROM citas_fts WHERE citas_fts MATCH ?)")
+                    params.append(consulta)
+            else:
+                where.append("titulo LIKE ?")
+                params.append(f"%{texto.strip()}%")
+        return where, params
+
+    def pagina(self, despues_de=None, limite=TAM_PAGINA, **filtros):
+        """
+        Una página de entradas, de la más nueva a la más antigua. Para la
+        siguiente página se pasa despues_de=<id de la última entrada recibida>.
+        Filtros: tipo, apellido (prefijo, sin tildes), año, texto (título).
+        """
+        where, params = self._filtros(**filtros)
+        if despues_de is not None:
+            where.append("id < ?")
+            params.append(despues_de)
+        sql = ("SELECT id, tipo, datos, libro_y_otros, referencia, referencia_html, cita, año, creada "
+               "FROM citas")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limite)
+        return [self._entrada(f) for f in self.conn.execute(sql, params)]
+
+    def iterar(self, tam_pagina=500, **filtros):
+        """Recorre toda la biblioteca (o el resultado de los filtros) página a página."""
+        despues_de = None
+        while True:
+            pagina = self.pagina(despues_de=despues_de, limite=tam_pagina, **filtros)
+            yield from pagina
+            if len(pagina) < tam_pagina:
+                return
+            despues_de = pagina[-1]["id"]
+
+    def contar(self, **filtros):
+        where, params = self._filtros(**filtros)
+        sql = "SELECT COUNT(*) FROM citas" + (" WHERE " + " AND ".join(where) if where else "")
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def obtener(self, id_cita):
+        f = self.conn.execute(
+            "SELECT id, tipo, datos, libro_y_otros, referencia, referencia_html, cita, año, creada "
+            "FROM citas WHERE id = ?", (id_cita,)).fetchone()
+        return self._entrada(f) if f else None
+
+    @staticmethod
+    def _entrada(f):
+        return {
+            "id": f["id"], "tipo": f["tipo"], "datos": json.loads(f["datos"]),
+            "libro_y_otros": bool(f["libro_y_otros"]), "referencia": f["referencia"],
+            "referencia_html": f["referencia_html"], "cita": f["cita"], "año": f["año"],
+            "creada": f["creada"],
+        }
+
+
+# ---------------- CLI ----------------
+def agregar_argumentos(p):
+    from .lotes import FORMATOS_ENTRADA
+
+    p.add_argument("db", help="archivo SQLite de la biblioteca (se crea si no existe)")
+    sub = p.add_subparsers(dest="accion", required=True)
+    imp = sub.add_parser("importar", help="agrega registros desde CSV/JSONL/BibTeX/RIS/CSL-JSON (como 'formatear')")
+    imp.add_argument("entrada")
+    imp.add_argument("--formato-entrada", choices=FORMATOS_ENTRADA)
+    imp.add_argument("--umbral", type=int, default=CONFIG_POR_DEFECTO["y_otros_threshold"])
+    bus = sub.add_parser("buscar", help="lista entradas, con filtros opcionales")
+    bus.add_argument("texto", nargs="?", help="palabras del título")
+    bus.add_argument("--apellido")
+    bus.add_argument("--año")
+    bus.add_argument("--tipo")
+    bus.add_argument("--limite", type=int, default=TAM_PAGINA)
+    exp = sub.add_parser("exportar", help="escribe la biblioteca (o lo filtrado) en DOCX, RTF o HTML")
+    exp.add_argument("salida", help="archivo .docx, .rtf o .html ('-' = stdout, con --formato)")
+    exp.add_argument("--formato", choices=["docx", "rtf", "html"])
+    exp.add_argument("--titulo")
+    exp.add_argument("--apellido")
+    exp.add_argument("--año")
+    exp.add_argument("--tipo")
+    exp.add_argument("--umbral", type=int, default=CONFIG_POR_DEFECTO["y_otros_threshold"])
+
+def ejecutar(args):
+    from . import lotes
+
+    with Biblioteca(args.db) as bib:
+        if args.accion == "importar":
+            fmt = args.formato_entrada or lotes.detectar_formato(args.entrada)
+            malos = []
+
+            def validos():
+                for n, fila in lotes.leer_filas(entrada, fmt):
+                    try:
+                        yield lotes.registro_desde_fila(fila)
+                    except lotes.RegistroInvalido as e:
+                        malos.append(n)
+                        print(f"fila {n}: {e}", file=sys.stderr)
+
+            with lotes.abrir_texto(args.entrada) as entrada:
+                ok = bib.guardar_muchos(validos(), {"y_otros_threshold": args.umbral})
+            print(f"{ok} entradas importadas, {len(malos)} filas inválidas; "
+                  f"{bib.contar()} en total", file=sys.stderr)
+        elif args.accion == "exportar":
+            from . import exportar
+
+            formato = args.formato or exportar.formato_por_extension(args.salida)
+            if formato is None:
+                print("no se reconoce la extensión de salida; usar --formato", file=sys.stderr)
+                return 2
+            config = {"y_otros_threshold": args.umbral}
+            # La biblioteca guarda el texto plano y el HTML; los runs se
+            # regeneran desde los datos, una entrada a la vez
+            runs = (generar_runs(e["tipo"], e["datos"], config, e["libro_y_otros"])[0]
+                    for e in bib.iterar(apellido=args.apellido, año=args.año, tipo=args.tipo))
+            salida = exportar.abrir_salida(args.salida, formato)
+            try:
+                n = exportar.exportar(runs, salida, formato, titulo=args.titulo)
+            finally:
+                if salida not in (sys.stdout, sys.stdout.buffer):
+                    salida.close()
+            print(f"{n} entradas exportadas", file=sys.stderr)
+        else:
+            for e in bib.pagina(limite=args.limite, texto=args.texto, apellido=args.apellido,
+                                año=args.año, tipo=args.tipo):
+                print(f"{e['id']}\t{e['tipo']}\t{e['referencia']}\t{e['cita']}")
+    return 0
@@ -0,0 +1,254 @@
+# citador/cache_disco.py
+# Caché en disco (SQLite) para reconstrucciones repetidas de una bibliografía:
+# la salida de cada registro se guarda bajo un hash de su contenido (tipo,
+# datos normalizados como registro, libro_y_otros, configuración y versión del
+# formateador), así que en la corrida siguiente solo los registros nuevos o
+# cambiados pasan por los generadores de TIPOS y cita_abreviada.
+#
+# La versión del formateador es un hash de las fuentes de los módulos que
+# deciden la salida: cualquier cambio de código deja las entradas viejas sin
+# aciertos, y podar() las borra primero. Después, si la base supera
+# max_bytes, se borran las entradas usadas hace más corridas (LRU por
+# corrida). Cada valor lleva su suma de verificación: uno dañado cuenta como
+# fallo, se borra y se vuelve a calcular.
+#
+# Los valores se guardan con marshal (tuplas, listas y textos; leerlos cuesta
+# una fracción de json). La corrida en que se usó cada entrada va en una
+# tabla aparte y angosta, y se renueva cada REFRESCO_USO corridas, no en cada
+# acierto: una reconstrucción sin cambios casi no escribe.
+#
+#   python -m citador cache bibliografia.cache info|verificar|podar|limpiar
+import hashlib
+import marshal
+import os
+import sqlite3
+import sys
+
+MAX_BYTES_POR_DEFECTO = 256 * 2**20
+# Claves por consulta IN (...): por debajo del límite de variables de SQLite
+TAM_CONSULTA = 500
+# Un acierto solo vuelve a marcar su entrada si la marca tiene más corridas
+# que esto; podar() no borra entradas marcadas dentro de este margen
+REFRESCO_USO = 8
+# Módulos del paquete cuya fuente entra en la versión del formateador
+MODULOS_FORMATO = ("core", "plantillas", "registros", "fechas", "render", "texto", "bibliografia")
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS salidas (
+    id INTEGER PRIMARY KEY,
+    clave BLOB NOT NULL UNIQUE,
+    version TEXT NOT NULL,
+    valor BLOB NOT NULL,
+    suma BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usos (clave BLOB PRIMARY KEY, usada INTEGER NOT NULL) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_usos_usada ON usos(usada);
+CREATE TABLE IF NOT EXISTS meta (nombre TEXT PRIMARY KEY, valor TEXT NOT NULL);
+"""
+
+# Los valores se leen como BLOB aunque una escritura externa los haya dejado
+# como texto: así un valor dañado falla la suma en vez de la decodificación
+_SELECT = ("SELECT s.clave, CAST(s.valor AS BLOB), CAST(s.suma AS BLOB), u.usada "
+           "FROM salidas s LEFT JOIN usos u ON u.clave = s.clave")
+
+_version = None
+
+
+def version_formateador():
+    """Hash de las fuentes de MODULOS_FORMATO; cambia con cualquier edición del formateador."""
+    global _version
+    if _version is None:
+        h = hashlib.blake2b(f"marshal {marshal.version}".encode(), digest_size=12)
+        for nombre in MODULOS_FORMATO:
+            with open(os.path.join(_DIRECTORIO, nombre + ".py"), "rb") as f:
+                h.update(nombre.encode() + b"\0" + f.read() + b"\0")
+        _version = h.hexdigest()
+    return _version
+
+def _suma(valor):
+    return hashlib.blake2b(valor, digest_size=8).digest()
+
+
+class CacheDisco:
+    """
+    Valores por registro (lo que acepte marshal), en un archivo SQLite. Una
+    instancia es una corrida: al abrirla se numera, y las entradas leídas o
+    escritas quedan marcadas con ese número para la poda. Con
+    nueva_corrida=False (para revisarla o podarla) no se cuenta otra.
+    """
+
+    def __init__(self, ruta, max_bytes=MAX_BYTES_POR_DEFECTO, nueva_corrida=True):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.version = version_formateador()
+        self.conn = sqlite3.connect(ruta)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_ESQUEMA)
+        with self.conn:
+            fila = self.conn.execute("SELECT valor FROM meta WHERE nombre = 'corrida'").fetchone()
+            self.corrida = (int(fila[0]) if fila else 0) + bool(nueva_corrida)
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('corrida', ?)", (str(self.corrida),))
+        self.aciertos = self.fallos = self.dañadas = 0
+        self.bytes_leidos = self.bytes_escritos = 0
+
+    def clave(self, tipo, registro, libro_y_otros, config):
+        """
+        Hash estable del contenido: los campos del registro ya normalizado, la
+        config ordenada y la versión, serializados con marshal versión 2 (sin
+        referencias entre objetos, así que el resultado no depende del proceso).
+        """
+        campos = tuple(tuple(map(tuple, v)) if isinstance(v, tuple) else v
+                       for v in map(registro.get, (c.nombre for c in registro.campos)))
+        contenido = (self.version, tipo, campos, bool(libro_y_otros), tuple(sorted(config.items())))
+        return hashlib.blake2b(marshal.dumps(contenido, 2), digest_size=16).digest()
+
+    def obtener_muchos(self, claves):
+        """
+        {clave: valor} de las claves que están y no están dañadas; cuenta
+        aciertos y fallos. Si se piden al menos la mitad de las entradas, se lee
+        la tabla de corrido en vez de buscar cada clave.
+        """
+        encontrados, dañadas, viejas = {}, [], []
+        limite = self.corrida - REFRESCO_USO
+        if 2 * len(claves) >= self.tamaño()[0]:
+            buscadas = set(claves)
+            filas = (f for f in self.conn.execute(_SELECT) if f[0] in buscadas)
+        else:
+            filas = (f for i in range(0, len(claves), TAM_CONSULTA) for f in self.conn.execute(
+                f"{_SELECT} WHERE s.clave IN ({','.join('?' * len(claves[i:i + TAM_CONSULTA]))})",
+                claves[i:i + TAM_CONSULTA]))
+        for clave, valor, suma, usada in filas:
+            if _suma(valor) != suma:
+                dañadas.append((clave,))
+                continue
+            encontrados[clave] = marshal.loads(valor)
+            self.bytes_leidos += len(valor)
+            if usada is None or usada < limite:
+                viejas.append((clave, self.corrida))
+        if dañadas or viejas:
+            with self.conn:
+                self._borrar(dañadas)
+                self.conn.executemany("INSERT OR REPLACE INTO usos VALUES (?, ?)", viejas)
+        self.dañadas += len(dañadas)
+        self.aciertos += len(encontrados)
+        self.fallos += len(claves) - len(encontrados)
+        return encontrados
+
+    def guardar_muchos(self, pares):
+        """pares: iterable de (clave, valor). Una sola transacción."""
+        filas = []
+        for clave, valor in pares:
+            valor = marshal.dumps(valor)
+            self.bytes_escritos += len(valor)
+            filas.append((clave, self.version, valor, _suma(valor)))
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO salidas (clave, version, valor, suma) VALUES (?, ?, ?, ?)",
+                                  filas)
+            self.conn.executemany("INSERT OR REPLACE INTO usos VALUES (?, ?)", ((f[0], self.corrida) for f in filas))
+
+    def _borrar(self, claves):
+        self.conn.executemany("DELETE FROM salidas WHERE clave = ?", claves)
+        self.conn.executemany("DELETE FROM usos WHERE clave = ?", claves)
+
+    # ---------------- Mantenimiento ----------------
+    def tamaño(self):
+        """(entradas, bytes de los valores)."""
+        n, b = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(valor)), 0) FROM salidas").fetchone()
+        return n, b
+
+    def podar(self):
+        """
+        Borra las entradas de otras versiones del formateador y, si aún se pasa
+        de max_bytes, las de las corridas más antiguas (nunca las marcadas en
+        las últimas REFRESCO_USO corridas). Devuelve cuántas borró.
+        """
+        with self.conn:
+            borradas = self.conn.execute("DELETE FROM salidas WHERE version != ?", (self.version,)).rowcount
+            _, total = self.tamaño()
+            if total > self.max_bytes:
+                por_corrida = self.conn.execute(
+                    "SELECT u.usada, SUM(LENGTH(s.valor)) FROM usos u JOIN salidas s ON s.clave = u.clave "
+                    "WHERE u.usada < ? GROUP BY u.usada ORDER BY u.usada",
+                    (self.corrida - REFRESCO_USO,)).fetchall()
+                hasta = None
+                for usada, b in por_corrida:
+                    if total <= self.max_bytes:
+                        break
+                    total -= b
+                    hasta = usada
+                if hasta is not None:
+                    borradas += self.conn.execute(
+                        "DELETE FROM salidas WHERE clave IN (SELECT clave FROM usos WHERE usada <= ?)",
+                        (hasta,)).rowcount
+            self.conn.execute("DELETE FROM usos WHERE clave NOT IN (SELECT clave FROM salidas)")
+        return borradas
+
+    def verificar(self):
+        """Revisa la base (integrity_check) y la suma de cada valor; borra los dañados. Devuelve (revisadas, dañadas)."""
+        estado = self.conn.execute("PRAGMA integrity_check").fetchone()[0]
+        if estado != "ok":
+            raise sqlite3.DatabaseError(f"{self.ruta}: {estado}")
+        dañadas = [(c,) for c, v, s in self.conn.execute(
+            "SELECT clave, CAST(valor AS BLOB), CAST(suma AS BLOB) FROM salidas") if _suma(v) != s]
+        with self.conn:
+            self._borrar(dañadas)
+        self.dañadas += len(dañadas)
+        return self.tamaño()[0] + len(dañadas), len(dañadas)
+
+    def limpiar(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM salidas")
+            self.conn.execute("DELETE FROM usos")
+
+    def estadisticas(self):
+        entradas, b = self.tamaño()
+        consultas = self.aciertos + self.fallos
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "dañadas": self.dañadas,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "bytes_leidos": self.bytes_leidos, "bytes_escritos": self.bytes_escritos,
+                "entradas": entradas, "bytes": b, "bytes_archivo": _bytes_archivo(self.ruta),
+                "version": self.version, "corrida": self.corrida}
+
+    def informe(self):
+        e = self.estadisticas()
+        return (f"caché {self.ruta}: {e['aciertos']} aciertos, {e['fallos']} fallos "
+                f"({e['tasa_aciertos']:.1%}), {e['dañadas']} dañadas; leídos {e['bytes_leidos']:,} B, "
+                f"escritos {e['bytes_escritos']:,} B; {e['entradas']} entradas, {e['bytes']:,} B de valores, "
+                f"{e['bytes_archivo']:,} B en disco (versión {e['version']}, corrida {e['corrida']})")
+
+    def cerrar(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+def _bytes_archivo(ruta):
+    return sum(os.path.getsize(r) for r in (ruta, ruta + "-wal") if os.path.exists(r))
+
+
+# ---------------- CLI ----------------
+def agregar_argumentos(p):
+    p.add_argument("archivo", help="archivo de la caché (el de 'bibliografia --cache')")
+    p.add_argument("accion", choices=["info", "verificar", "podar", "limpiar"])
+    p.add_argument("--max-mb", type=float, default=MAX_BYTES_POR_DEFECTO / 2**20,
+                   help="tamaño máximo de los valores para podar")
+
+def ejecutar(args):
+    if not os.path.exists(args.archivo):
+        print(f"no existe {args.archivo}", file=sys.stderr)
+        return 1
+    with CacheDisco(args.archivo, max_bytes=int(args.max_mb * 2**20), nueva_corrida=False) as cache:
+        if args.accion == "verificar":
+            revisadas, dañadas = cache.verificar()
+            print(f"{revisadas} entradas revisadas, {dañadas} dañadas (borradas)")
+        elif args.accion == "podar":
+            print(f"{cache.podar()} entradas borradas")
+        elif args.accion == "limpiar":
+            cache.limpiar()
+        print(cache.informe())
+    return 0
@@ -0,0 +1,402 @@
+# citador/columnar.py
+# Formateo por lotes en columnas (Apache Arrow), para reconstruir catálogos
+# grandes: lee Parquet, Arrow IPC/Feather o CSV de a un RecordBatch y hace la
+# normalización común sobre columnas completas con pyarrow.compute (strip,
+# versalitas de apellidos y campos, prefijo p./pp. de las páginas, tomos en
+# romanos con una tabla). Por fila solo queda el armado: las plantillas de
+# core compiladas para leer esos valores ya calculados (compilar_tipos con
+# precalculados) y la cita abreviada con los apellidos ya en versalitas. La
+# salida es Parquet con n, tipo, referencia, cita y error, en el orden de
+# entrada e igual a la de `python -m citador formatear`.
+#
+# pyarrow es opcional: se importa recién al usar este modo.
+#
+#   python -m citador columnar registros.parquet -o citas.parquet [--html]
+import csv
+import os
+import re
+import sys
+import time
+from collections import Counter, namedtuple
+from itertools import accumulate
+
+from . import core
+from .core import CONFIG_POR_DEFECTO, TIPOS_CON_ABREVIADA
+from .lotes import _VERDADERO, RegistroInvalido, parsear_autores
+from .registros import CLASES, Autor
+from .render import NORMAL, VERSALITAS, a_html, a_texto
+
+TAM_LOTE = 65536
+FORMATOS_ENTRADA = ("parquet", "arrow", "csv")
+_EXTENSIONES = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow",
+                ".ipc": "arrow", ".csv": "csv"}
+# Filtros de las plantillas que se calculan por columna antes de armar las filas
+PRECALCULADOS = frozenset(("versalitas", "tomo", "autores"))
+# Los tomos de 1 a 4 dígitos salen de una tabla hecha con to_roman
+_TAM_TABLA_ROMANOS = 10000
+
+
+def _pyarrow():
+    """Importa pyarrow y sus submódulos; ImportError con el paquete a instalar si falta."""
+    try:
+        import pyarrow
+        import pyarrow.compute  # noqa: F401
+        import pyarrow.csv  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError("el modo columnar necesita pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+# ---------------- Lectura ----------------
+def detectar_formato(ruta):
+    return _EXTENSIONES.get(os.path.splitext(ruta.lower())[1], "csv")
+
+def leer_lotes(ruta, formato=None, tam_lote=TAM_LOTE):
+    """Itera los RecordBatch de un archivo sin cargarlo completo."""
+    pa = _pyarrow()
+    formato = formato or detectar_formato(ruta)
+    if formato == "parquet":
+        yield from pa.parquet.ParquetFile(ruta).iter_batches(batch_size=tam_lote)
+    elif formato == "arrow":
+        with pa.memory_map(ruta) as f:
+            try:
+                lector = pa.ipc.open_file(f)
+            except pa.ArrowInvalid:
+                f.seek(0)
+                yield from pa.ipc.open_stream(f)
+            else:
+                for i in range(lector.num_record_batches):
+                    yield lector.get_batch(i)
+    else:
+        # Todo como texto, igual que csv.DictReader en lotes ("007" no pasa a 7)
+        with open(ruta, encoding="utf-8-sig", newline="") as f:
+            columnas = next(csv.reader(f), [])
+        yield from pa.csv.open_csv(
+            ruta, read_options=pa.csv.ReadOptions(block_size=1 << 24),
+            convert_options=pa.csv.ConvertOptions(column_types={c: pa.string() for c in columnas},
+                                                  strings_can_be_null=False))
+
+
+# ---------------- Normalización por columnas ----------------
+def _texto(pa, col):
+    """Columna como texto sin espacios alrededor, con los nulos como ''."""
+    if not pa.types.is_string(col.type):
+        col = pa.compute.cast(col, pa.string())
+    return pa.compute.utf8_trim_whitespace(pa.compute.fill_null(col, ""))
+
+_patron_especiales = None
+
+def _especiales(pa):
+    """
+    Clase de caracteres cuya mayúscula en Arrow no es la de str.upper (ß ->
+    SS, ligaduras...); se calcula una vez comparando ambas en todo el BMP.
+    """
+    global _patron_especiales
+    if _patron_especiales is None:
+        letras = [chr(c) for c in range(0x80, 0x10000) if not 0xD800 <= c < 0xE000]
+        arrow = pa.compute.utf8_upper(pa.array(letras)).to_pylist()
+        distintas = "".join(c for c, a in zip(letras, arrow) if c.upper() != a)
+        _patron_especiales = "[" + distintas.replace("\\", "\\\\").replace("]", "\\]").replace("^", "\\^") + "]"
+    return _patron_especiales
+
+def _versalitas(pa, col):
+    """versalitas por columna; los valores con caracteres especiales pasan por str.upper."""
+    pc = pa.compute
+    mayusculas = pc.utf8_upper(col)
+    especiales = pc.match_substring_regex(col, _especiales(pa))
+    if pc.any(especiales).as_py():
+        valores = pc.filter(col, especiales).to_pylist()
+        mayusculas = pc.replace_with_mask(mayusculas, especiales, pa.array([v.upper() for v in valores], pa.string()))
+    return mayusculas
+
+_tabla_romanos = None
+
+def _tomos(pa, col):
+    """El filtro tomo por columna: 'Tomo ' + romano (de la tabla) para los números, el valor tal cual si no."""
+    global _tabla_romanos
+    pc = pa.compute
+    if _tabla_romanos is None:
+        _tabla_romanos = pa.array([core.to_roman(i) for i in range(_TAM_TABLA_ROMANOS)], pa.string())
+    numero = pc.match_substring_regex(col, r"^[0-9]{1,4}$")
+    if pc.any(numero).as_py():
+        romanos = pc.take(_tabla_romanos, pc.cast(pc.if_else(numero, col, "0"), pa.int64()))
+        col = pc.if_else(numero, pc.binary_join_element_wise("Tomo ", romanos, ""), col)
+    # Números más largos y dígitos que no son ASCII: como en core
+    otros = pc.or_(pc.match_substring_regex(col, r"^[0-9]{5,}$"), pc.invert(pc.string_is_ascii(col)))
+    if pc.any(otros).as_py():
+        valores = pc.filter(col, otros).to_pylist()
+        col = pc.replace_with_mask(col, otros, pa.array([core._tomo(v) for v in valores], pa.string()))
+    return col
+
+def _prefijo_paginas(pa, col):
+    """', p. 45' / ', pp. 45-47' de la cita abreviada (pages_prefix), '' sin páginas."""
+    pc = pa.compute
+    prefijo = pc.if_else(pc.match_substring_regex(col, "[-–]"), ", pp. ", ", p. ")
+    return pc.if_else(pc.equal(col, ""), "", pc.binary_join_element_wise(prefijo, col, ""))
+
+def _autores_planos(pa, col):
+    """
+    Los autores de una columna, uno por elemento: (filas, apellido1,
+    apellido2, nombre, filas con error). La columna puede ser texto en el
+    formato de CSV ('Apellido1|Apellido2|Nombre; ...') o lista de structs.
+    """
+    pc = pa.compute
+    if pa.types.is_list(col.type) or pa.types.is_large_list(col.type):
+        planos = pc.list_flatten(col)
+        filas = pc.list_parent_indices(col)
+        nombres = {f.name for f in planos.type}
+        ape1, ape2, nom = (_texto(pa, pc.struct_field(planos, c)) if c in nombres
+                           else pa.array([""] * len(planos), pa.string())
+                           for c in ("apellido1", "apellido2", "nombre"))
+        return filas, ape1, ape2, nom, pa.array([], pa.int64())
+    partes = pc.split_pattern(pc.fill_null(_texto(pa, col), ""), ";")
+    planos, filas = pc.list_flatten(partes), pc.list_parent_indices(partes)
+    hay = pc.not_equal(pc.utf8_trim_whitespace(planos), "")
+    planos, filas = pc.filter(planos, hay), pc.filter(filas, hay)
+    # Con "||" al final siempre hay al menos 3 campos; más de 5 es un autor con más de 3
+    campos = pc.split_pattern(pc.binary_join_element_wise(planos, "||", ""), "|")
+    ape1, ape2, nom = (pc.utf8_trim_whitespace(pc.list_element(campos, i)) for i in range(3))
+    malas = pc.filter(filas, pc.greater(pc.list_value_length(campos), 5))
+    return filas, ape1, ape2, nom, malas
+
+def _autores(pa, col, n, umbral, con_runs, con_cita, con_crudos):
+    """
+    Los autores de una columna, por fila: (crudos, runs, apellidos1, filas
+    con error). crudos son las tuplas de Autor (solo si la plantilla lee el
+    campo tal cual), runs los de autores_runs y apellidos1 los primeros
+    apellidos en versalitas de los autores válidos, para la cita abreviada.
+    Las versalitas se calculan por columna; por fila solo se reparten.
+    """
+    pc = pa.compute
+    filas, ape1, ape2, nom, malas = _autores_planos(pa, col)
+    crudos = runs = apellidos1 = None
+    if con_crudos:
+        por_fila = [[] for _ in range(n)]
+        for fila, autor in zip(filas.to_pylist(), map(Autor, ape1.to_pylist(), ape2.to_pylist(), nom.to_pylist())):
+            por_fila[fila].append(autor)
+        crudos = list(map(tuple, por_fila))
+    validos = pc.or_(pc.not_equal(ape1, ""), pc.not_equal(nom, ""))
+    cuenta = Counter(pc.filter(filas, validos).to_pylist())
+    limites = list(accumulate((cuenta[i] for i in range(n)), initial=0))
+    if con_runs:
+        ape1_v, ape2_v = pc.filter(ape1, validos), pc.filter(ape2, validos)
+        # Con la capitalización de la fuente, como core.autor_runs
+        apellidos = pc.if_else(pc.equal(ape2_v, ""), ape1_v,
+                               pc.binary_join_element_wise(ape1_v, ape2_v, " ")).to_pylist()
+        nombres = pc.binary_join_element_wise(", ", pc.filter(nom, validos), "").to_pylist()
+        runs = [_runs_autores(apellidos, nombres, a, b, umbral) for a, b in zip(limites, limites[1:])]
+    if con_cita:
+        primeros = _versalitas(pa, pc.filter(ape1, validos)).to_pylist()
+        apellidos1 = [primeros[a:b] for a, b in zip(limites, limites[1:])]
+    return crudos, runs, apellidos1, set(malas.to_pylist())
+
+def _runs_autores(apellidos, nombres, a, b, umbral):
+    """autores_runs de los autores válidos a..b, con los apellidos ya armados."""
+    if a == b:
+        return []
+    runs = [(apellidos[a], VERSALITAS), (nombres[a], NORMAL)]
+    if b - a >= umbral or b - a > 3:
+        runs.append((" y otros", NORMAL))
+        return runs
+    for j in range(a + 1, b):
+        runs += ((" y ", NORMAL), (apellidos[j], VERSALITAS), (nombres[j], NORMAL))
+    return runs
+
+def _cita(apellidos1, año, tomo, paginas, libro_y_otros, umbral):
+    """cita_abreviada con los apellidos en versalitas y tomo y páginas ya armados."""
+    n = len(apellidos1)
+    if n == 0:
+        return ""
+    if libro_y_otros or n >= umbral:
+        return f"{apellidos1[0]} y otros ({año}){tomo}{paginas}"
+    if n == 1:
+        return f"{apellidos1[0]} ({año}){tomo}{paginas}"
+    if n <= 3:
+        return f"{' y '.join(apellidos1)} ({año}){paginas}"
+    return f"{apellidos1[0]} y otros ({año}){paginas}"
+
+
+# ---------------- Armado por tipo ----------------
+_plantillas = None
+_filas = {}
+
+def _plantilla(tipo):
+    global _plantillas
+    if _plantillas is None:
+        _plantillas = core.compilar_tipos(PRECALCULADOS)
+    return _plantillas[tipo]
+
+def _clase_fila(tipo):
+    """namedtuple con los campos del tipo y los valores precalculados que lee su plantilla (campo__filtro)."""
+    if tipo not in _filas:
+        derivados = sorted(f"{campo}__{filtro}" for campo, filtro in _plantilla(tipo).precalculados)
+        _filas[tipo] = namedtuple("Fila", [c.nombre for c in CLASES[tipo].campos] + derivados)
+    return _filas[tipo]
+
+def _lee_crudo(plantilla, campo):
+    fuentes = getattr(plantilla, "fuentes", None) or (plantilla.fuente,)
+    return any(re.search(rf"\bd\.{campo}\b(?!__)", f) for f in fuentes)
+
+def _formatear_tipo(pa, tipo, lote, libro_y_otros, config, html):
+    """(referencias, citas, errores, htmls) para las filas de un lote que son todas del tipo."""
+    pc = pa.compute
+    n = lote.num_rows
+    umbral = config["y_otros_threshold"]
+    plantilla, clase = _plantilla(tipo), _clase_fila(tipo)
+    precalculados = dict(plantilla.precalculados)
+    con_cita = tipo not in TIPOS_CON_ABREVIADA
+    columnas, arrow, malas = {}, {}, set()
+    for campo in CLASES[tipo].campos:
+        # En filas planas el campo 'tipo' de Decreto / Oficio va como 'tipo_documento'
+        origen = "tipo_documento" if campo.nombre == "tipo" else campo.nombre
+        presente = origen in lote.schema.names
+        if campo.tipo == "autores":
+            con_runs = precalculados.get(campo.nombre) == "autores"
+            cita_campo = con_cita and campo.nombre == "autores"
+            if presente:
+                crudos, runs, apellidos1, m = _autores(pa, lote.column(origen), n, umbral, con_runs, cita_campo,
+                                                       _lee_crudo(plantilla, campo.nombre))
+                malas |= m
+            else:
+                crudos, runs, apellidos1 = [()] * n, [[] for _ in range(n)], [[]] * n
+            columnas[campo.nombre] = crudos or [None] * n
+            if con_runs:
+                columnas[f"{campo.nombre}__autores"] = runs
+            if cita_campo:
+                columnas["_apellidos1"] = apellidos1
+            continue
+        col = _texto(pa, lote.column(origen)) if presente else pa.array([campo.por_defecto] * n, pa.string())
+        arrow[campo.nombre] = col
+        columnas[campo.nombre] = col.to_pylist()
+        filtro = precalculados.get(campo.nombre)
+        if filtro == "versalitas":
+            columnas[f"{campo.nombre}__versalitas"] = _versalitas(pa, col).to_pylist()
+        elif filtro == "tomo":
+            columnas[f"{campo.nombre}__tomo"] = _tomos(pa, col).to_pylist()
+
+    filas = list(map(clase._make, zip(*(columnas[c] for c in clase._fields))))
+    errores = [None] * n
+    try:
+        resultados = [plantilla(f, config) for f in filas]
+    except Exception:
+        # Alguna fila falla: de nuevo una por una, para saber cuáles
+        resultados = []
+        for i, f in enumerate(filas):
+            try:
+                resultados.append(plantilla(f, config))
+            except Exception as e:
+                resultados.append(None)
+                errores[i] = f"{type(e).__name__}: {e}"
+    for i in malas:
+        # El mensaje exacto lo da el parser de filas
+        valores = lote.slice(i, 1).to_pylist()[0]
+        try:
+            for campo in CLASES[tipo].campos:
+                if campo.tipo == "autores":
+                    parsear_autores(valores.get(campo.nombre))
+        except RegistroInvalido as e:
+            resultados[i], errores[i] = None, f"RegistroInvalido: {e}"
+
+    if con_cita:
+        vacia = pa.array([""] * n, pa.string())
+        tomo = arrow.get("tomo", vacia)
+        tomo = pc.if_else(pc.equal(tomo, ""), "", pc.binary_join_element_wise(" ", _tomos(pa, tomo), ""))
+        citas = list(map(_cita, columnas.get("_apellidos1") or [[]] * n, columnas["año"], tomo.to_pylist(),
+                         _prefijo_paginas(pa, arrow.get("paginas", vacia)).to_pylist(), libro_y_otros,
+                         [umbral] * n))
+        runs = resultados
+    else:
+        citas = [r[1] if r is not None else None for r in resultados]
+        runs = [r[0] if r is not None else None for r in resultados]
+    if any(errores):
+        citas = [None if e else c for c, e in zip(citas, errores)]
+    referencias = [a_texto(r) if r is not None else None for r in runs]
+    htmls = [a_html(r) if r is not None else None for r in runs] if html else None
+    return referencias, citas, errores, htmls
+
+def formatear_lote(lote, config=None, html=False, inicio=1):
+    """
+    Formatea un RecordBatch con una columna 'tipo' y los campos planos de
+    cada tipo; devuelve el RecordBatch de salida, con n desde `inicio`. Cada
+    tipo se arma por separado y el orden de entrada se repone con un take.
+    """
+    pa = _pyarrow()
+    pc = pa.compute
+    config = config or CONFIG_POR_DEFECTO
+    n = lote.num_rows
+    nombres = lote.schema.names
+    tipos = _texto(pa, lote.column("tipo")) if "tipo" in nombres else pa.array([""] * n, pa.string())
+    if "libro_y_otros" in nombres:
+        libro_y_otros = pc.is_in(pc.utf8_lower(_texto(pa, lote.column("libro_y_otros"))),
+                                 value_set=pa.array(sorted(_VERDADERO)))
+    else:
+        libro_y_otros = pa.array([False] * n)
+    salida = {c: [] for c in ("indices", "tipo", "referencia", "cita", "error", "referencia_html")}
+    for tipo in pc.unique(tipos).to_pylist():
+        mascara = pc.equal(tipos, tipo)
+        indices = pc.indices_nonzero(mascara)
+        k = len(indices)
+        if tipo in CLASES:
+            referencias, citas, errores, htmls = _formatear_tipo(
+                pa, tipo, lote.filter(mascara), pc.filter(libro_y_otros, mascara).to_pylist(), config, html)
+            tipo_salida = [None if e else tipo for e in errores]
+        else:
+            error = "RegistroInvalido: falta 'tipo'" if not tipo else f"RegistroInvalido: tipo desconocido: {tipo!r}"
+            referencias = citas = tipo_salida = htmls = [None] * k
+            errores = [error] * k
+        for c, valores in (("tipo", tipo_salida), ("referencia", referencias), ("cita", citas), ("error", errores),
+                           ("referencia_html", htmls or [None] * k)):
+            salida[c].append(pa.array(valores, pa.string()))
+        salida["indices"].append(indices)
+    orden = pc.sort_indices(pa.chunked_array(salida.pop("indices"), pa.uint64()))
+    columnas = {"n": pa.array(range(inicio, inicio + n), pa.int64())}
+    for c, partes in salida.items():
+        if c != "referencia_html" or html:
+            columnas[c] = pc.take(pa.chunked_array(partes, pa.string()), orden).combine_chunks()
+    return pa.RecordBatch.from_pydict(columnas)
+
+def formatear_archivo(entrada, salida, config=None, html=False, formato=None, tam_lote=TAM_LOTE):
+    """Formatea entrada (Parquet, Arrow o CSV) en el Parquet salida, lote a lote; devuelve (ok, con_error)."""
+    pa = _pyarrow()
+    ok = malos = 0
+    escritor = None
+    try:
+        for lote in leer_lotes(entrada, formato, tam_lote):
+            resultado = formatear_lote(lote, config, html=html, inicio=ok + malos + 1)
+            if escritor is None:
+                escritor = pa.parquet.ParquetWriter(salida, resultado.schema)
+            escritor.write_batch(resultado)
+            con_error = resultado.num_rows - resultado.column("error").null_count
+            malos += con_error
+            ok += resultado.num_rows - con_error
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return ok, malos
+
+
+# ---------------- CLI ----------------
+def agregar_argumentos(p):
+    p.add_argument("entrada", help="Parquet, Arrow IPC/Feather o CSV con una columna 'tipo' y los campos de datos")
+    p.add_argument("-o", "--salida", required=True, help="archivo Parquet de salida")
+    p.add_argument("--formato-entrada", choices=FORMATOS_ENTRADA)
+    p.add_argument("--umbral", type=int, default=CONFIG_POR_DEFECTO["y_otros_threshold"],
+                   help="umbral para 'y otros' (3 o 4)")
+    p.add_argument("--html", action="store_true", help="agrega la columna referencia_html")
+    p.add_argument("--tam-lote", type=int, default=TAM_LOTE, help="filas por lote de Parquet")
+
+def ejecutar(args):
+    try:
+        _pyarrow()
+    except ImportError as e:
+        print(e, file=sys.stderr)
+        return 2
+    t0 = time.perf_counter()
+    ok, malos = formatear_archivo(args.entrada, args.salida, {"y_otros_threshold": args.umbral}, html=args.html,
+                                  formato=args.formato_entrada, tam_lote=args.tam_lote)
+    dt = time.perf_counter() - t0
+    print(f"{ok} registros formateados, {malos} con error en {dt:.2f} s "
+          f"({(ok + malos) / dt if dt else 0:.0f} registros/s)", file=sys.stderr)
+    return 0
@@ -0,0 +1,402 @@
+# citador/core.py
+# Motor de formato RChD sin dependencias de Streamlit: helpers, generadores,
+# cita abreviada y el mapeo TIPOS. Importar este módulo no tiene efectos.
+import re
+
+from .fechas import normalizar_fecha
+from .memo import memoizar
+from .plantillas import compilar
+from .registros import ESQUEMAS, Autor, como_registro
+from .render import NORMAL, VERSALITAS, a_html, a_texto
+
+# ---------------- Helpers ----------------
+@memoizar()
+def versalitas(texto):
+    return texto.upper() if texto else ""
+
+@memoizar()
+def smallcaps_html(texto):
+    return f"<span style='font-variant: small-caps'>{versalitas(texto)}</span>"
+
+_RE_ETIQUETA = re.compile('<.*?>')
+
+def limpiar_html(html_text):
+    return _RE_ETIQUETA.sub('', html_text)
+
+@memoizar()
+def to_roman(num):
+    try:
+        n = int(num)
+        if n <= 0:
+            return str(num)
+        val = [
+            1000, 900, 500, 400,
+            100, 90, 50, 40,
+            10, 9, 5, 4, 1
+        ]
+        syms = [
+            "M", "CM", "D", "CD",
+            "C", "XC", "L", "XL",
+            "X", "IX", "V", "IV", "I"
+        ]
+        roman_num = ''
+        i = 0
+        while n > 0:
+            for _ in range(n // val[i]):
+                roman_num += syms[i]
+                n -= val[i]
+            i += 1
+        return roman_num
+    except Exception:
+        return str(num)
+
+_ORDINAL_ES = {
+    2: "segunda",
+    3: "tercera",
+    4: "cuarta",
+    5: "quinta",
+    6: "sexta",
+    7: "séptima",
+    8: "octava",
+    9: "novena",
+    10: "décima"
+}
+@memoizar()
+def edicion_spanish(ed):
+    if not ed:
+        return ""
+    ed_clean = str(ed).strip()
+    try:
+        n = int(ed_clean)
+        if n == 1:
+            return ""
+        return f"{_ORDINAL_ES.get(n, str(n) + 'ª')} edición"
+    except Exception:
+        ed_lower = ed_clean.lower()
+        if "ed" in ed_lower or "edición" in ed_lower or "ª" in ed_lower:
+            return ed_clean
+        return f"{ed_clean} edición"
+
+@memoizar()
+def pages_prefix(pags):
+    if not pags:
+        return ""
+    pags = pags.strip()
+    if "-" in pags or "–" in pags:
+        return f"pp. {pags}"
+    else:
+        return f"p. {pags}"
+
+@memoizar()
+def normalize_date(date_str):
+    """
+    Normaliza una fecha a dd/mm/YYYY (mm/YYYY si falta el día, "A–B" si es
+    un rango) con el parser de citador.fechas, que no depende del locale.
+    Si no puede, devuelve el string original.
+    Nota: el formulario ahora pedirá solo AÑO en la mayoría de campos.
+    """
+    if not date_str:
+        return ""
+    d = date_str.strip()
+    return normalizar_fecha(d) or d
+
+# ---------------- Autor formatting ----------------
+def clave_autor(a):
+    """Tupla hashable (apellido1, apellido2, nombre) para un autor en dict."""
+    if isinstance(a, Autor):
+        return a
+    return (a.get('apellido1', '').strip(), a.get('apellido2', '').strip(), a.get('nombre', '').strip())
+
+@memoizar(nombre="formatear_autor")
+def _autor_runs_clave(clave):
+    ape1, ape2, nom = clave
+    # Con la capitalización de la fuente: ver VERSALITAS en render.py
+    apellidos = f"{ape1} {ape2}" if ape2 else ape1
+    return ((apellidos, VERSALITAS), (f", {nom}", NORMAL))
+
+def autor_runs(a):
+    return _autor_runs_clave(clave_autor(a))
+
+def formatear_autor(a, html=False):
+    runs = autor_runs(a)
+    return a_html(runs) if html else a_texto(runs)
+
+def autores_runs(autores, y_otros_threshold=4):
+    autores_validos = [a for a in autores if (a.get('apellido1') or a.get('nombre'))]
+    n = len(autores_validos)
+    if n == 0:
+        return []
+    if n >= y_otros_threshold or n > 3:
+        return [*autor_runs(autores_validos[0]), (" y otros", NORMAL)]
+    runs = list(autor_runs(autores_validos[0]))
+    for a in autores_validos[1:]:
+        runs.append((" y ", NORMAL))
+        runs.extend(autor_runs(a))
+    return runs
+
+def formatear_autores(autores, html=False, y_otros_threshold=4):
+    runs = autores_runs(autores, y_otros_threshold=y_otros_threshold)
+    return a_html(runs) if html else a_texto(runs)
+
+# ---------------- Cita abreviada ----------------
+def cita_abreviada(autores, año, paginas=None, tomo=None, tipo=None, libro_y_otros=False, y_otros_threshold=4):
+    autores_validos = [a for a in autores if (a.get('apellido1') or a.get('nombre'))]
+    n = len(autores_validos)
+    tomo_part = f" Tomo {to_roman(tomo)}" if tomo and str(tomo).isdigit() else (f" {tomo}" if tomo else "")
+    pag_part = ""
+    if paginas:
+        pag_part = f", {pages_prefix(paginas)}"
+    if tipo == "Norma" or tipo == "Jurisprudencia":
+        return ""
+    if n == 0:
+        return ""
+    if libro_y_otros or (n >= y_otros_threshold):
+        apellido = versalitas(autores_validos[0].get('apellido1',''))
+        return f"{apellido} y otros ({año}){tomo_part}{pag_part}"
+    if n == 1:
+        apellido = versalitas(autores_validos[0].get('apellido1',''))
+        return f"{apellido} ({año}){tomo_part}{pag_part}"
+    elif 2 <= n <= 3:
+        apellidos = " y ".join([versalitas(a.get('apellido1','')) for a in autores_validos])
+        return f"{apellidos} ({año}){pag_part}"
+    else:
+        apellido = versalitas(autores_validos[0].get('apellido1',''))
+        return f"{apellido} y otros ({año}){pag_part}"
+
+# ---------------- Plantillas por tipo ----------------
+# Cada tipo (y cada subtipo de norma) se define como una plantilla de
+# referencia y, si no usa cita_abreviada, otra de su cita (sintaxis en
+# plantillas.py). Al importar el módulo se compilan a funciones
+# f(registro, config) que arman los runs (ver render.py) sin interpretar nada.
+def _tomo(tomo):
+    return f"Tomo {to_roman(tomo)}" if tomo.isdigit() else tomo
+
+def _edicion_libro(edicion):
+    if not edicion:
+        return ""
+    if edicion.isdigit():
+        e = edicion_spanish(edicion)
+    else:
+        e = edicion if "ed" in edicion.lower() else f"{edicion} edición"
+    return e.lstrip(", ").strip()
+
+FILTROS = {
+    "versalitas": versalitas,
+    "tomo": _tomo,
+    "edicion": _edicion_libro,
+    "fecha": normalize_date,
+    "autores_texto": formatear_autores,
+}
+FILTROS_RUNS = {"autores": autores_runs}
+
+PLANTILLAS = {
+    "Libro": (
+        "{autores|autores} ({año}): [*{titulo}*][, {tomo|tomo}][ ({ciudad, editorial, edicion|edicion})].",
+        None),
+    "Traducción de libro": (
+        r"{autores|autores} ([\[{año_original}\] ]{año}): *{titulo}* (trad. {traductor}, {ciudad}, {editorial}).",
+        None),
+    "Capítulo de libro": (
+        '{autor_capitulo|autores} ({año}): "{titulo_capitulo}", en {editores|autores} (edit.), '
+        '*{titulo_libro}* ({ciudad}, {editorial})[ pp. {paginas}].',
+        None),
+    "Artículo de revista": (
+        '{autores|autores} ({año}): "{titulo}", [*{revista}*][, vol. {volumen}][, N° {numero}]'
+        '[: pp. {paginas}][. DOI: {doi}][. Disponible en: {url}].',
+        None),
+    "Decreto / Oficio / Reglamento": (
+        "{pais|versalitas}[, {organismo|versalitas}], {tipo}[ {numero}][, *{titulo}*][ ({año})].",
+        "{pais|versalitas}, {tipo}[ {numero}]"),
+    "Proyecto de ley": (
+        "{pais|versalitas}, [*{nombre}*|Proyecto de ley][ (Boletín N° {boletin}[, {año}]).|[ ({año})].]",
+        "{pais|versalitas}, Proyecto de ley[ {boletin}]"),
+    "Historia de la ley": (
+        "{pais|versalitas}, *Historia de la Ley N° {numero}[, {titulo}]*[ ({año})].",
+        "{pais|versalitas}, Historia de la Ley N° {numero}"),
+    "Documento internacional (ONU, OEA, etc.)": (
+        "[{organismo|versalitas}, ]*{titulo}*[ ({año})].",
+        "[{organismo|versalitas}, ]{titulo}"),
+    "Instrumento emanado de congreso / conferencia": (
+        "[*{nombre}*][, {conferencia}][ ({año})].",
+        "{nombre}"),
+    "Jurisprudencia": (
+        "[{estado|versalitas}, ]{tribunal}[, {año/fecha|fecha}][, rol {rol}][ ({nombre_caso})][, {info_extra}]"
+        "[. Fuente: {fuente}].",
+        "{tribunal, año/fecha|fecha}"),
+    "Jurisprudencia internacional": (
+        "{tribunal|versalitas}, *{nombre_caso}*[, Sentencia de {fecha}][ ({serie})].",
+        "{tribunal|versalitas}, {nombre_caso}[ ({fecha})]"),
+    "Página web o blog": (
+        "[?{autores|autores_texto/autor_sin_autor, titulo}:{autores|autores_texto/autor_sin_autor} ({año}): "
+        "{titulo}, Disponible en: {url}.|{url}][ Fecha de consulta: {fecha_consulta}.]",
+        "[{autores|autores_texto|versalitas/autor_sin_autor|versalitas}[ ({año})]|{autor_sin_autor}]"),
+    "Tesis": (
+        "{autores|autores} ({año}): *{titulo}*. Memoria para optar al grado de {grado} en la {institucion}.",
+        None),
+}
+
+# Norma: un par (referencia, cita) por subtipo; el subtipo sale de
+# clasificar_norma. "otra" es cualquier tipo de norma sin palabra clave.
+PLANTILLAS_NORMA = {
+    "constitucion": ("{pais|versalitas}, *{nombre_norma/tipo_norma}*[ ({año})].",
+                     "{pais|versalitas}, {nombre_norma/tipo_norma}"),
+    "ley": ("{pais|versalitas}, Ley[ N° {numero}][. *{nombre_norma}*][ ({año})].",
+            "{pais|versalitas}, Ley[ N° {numero}]"),
+    "codigo": ("{pais|versalitas}, *{nombre_norma/tipo_norma}*[ ({año})| (s.d.)].",
+               "{pais|versalitas}, {nombre_norma/tipo_norma}"),
+    "decreto": ("{pais|versalitas}[, {organismo|versalitas}], {tipo_norma}[ {numero}][, *{nombre_norma}*][ ({año})].",
+                "{pais|versalitas}, {tipo_norma}[ {numero}]"),
+    "tratado": ("*{nombre_norma/tipo_norma}*[ ({año})].",
+                "{nombre_norma/tipo_norma}"),
+    "union_europea": ("UNIÓN EUROPEA, *{nombre_norma/tipo_norma}*[, de {año}].",
+                      "UNIÓN EUROPEA, {nombre_norma/tipo_norma}"),
+    "sin_tipo": ("{pais|versalitas}, {nombre_norma}[ {numero}][ ({año})].",
+                 "{pais|versalitas}, {nombre_norma}"),
+}
+PLANTILLAS_NORMA["otra"] = PLANTILLAS_NORMA["decreto"]
+
+# Palabras clave por subtipo, en orden de prioridad (se busca en minúsculas)
+PALABRAS_NORMA = (
+    ("constitucion", ("constit",)),
+    ("ley", ("ley",)),
+    ("codigo", ("código", "codigo")),
+    ("decreto", ("decreto", "reglamento", "oficio", "circular")),
+    ("tratado", ("tratado", "convención", "convencion")),
+    ("union_europea", ("directiva", "decisión", "decision")),
+)
+
+@memoizar()
+def _subtipo_norma(tipo_norma):
+    t = tipo_norma.lower()
+    for subtipo, palabras in PALABRAS_NORMA:
+        if any(p in t for p in palabras):
+            return subtipo
+    return "otra" if tipo_norma else "sin_tipo"
+
+def clasificar_norma(tipo_norma, nombre_norma=""):
+    """Subtipo de PLANTILLAS_NORMA para un tipo de norma (y su nombre, por 'Constitución ...')."""
+    if "constitución" in nombre_norma.lower():
+        return "constitucion"
+    return _subtipo_norma(tipo_norma)
+
+def _nombre_funcion(tipo):
+    return "_" + "".join(c if c.isalnum() else "_" for c in tipo.lower())
+
+def compilar_tipos(precalculados=()):
+    """
+    {tipo: f(registro, config)} con las plantillas de todos los tipos; Norma
+    elige la de su subtipo en cada llamada. Con precalculados, esos filtros
+    se leen del registro ya aplicados (ver plantillas.compilar).
+    """
+    def _compilar(nombre, ref, cita):
+        return compilar(nombre, ref, cita, filtros=FILTROS, filtros_runs=FILTROS_RUNS, precalculados=precalculados)
+
+    compiladas = {tipo: _compilar(_nombre_funcion(tipo), ref, cita) for tipo, (ref, cita) in PLANTILLAS.items()}
+    normas = {sub: _compilar(f"_norma_{sub}", ref, cita) for sub, (ref, cita) in PLANTILLAS_NORMA.items()}
+
+    def _norma(d, config):
+        return normas[clasificar_norma(d.tipo_norma, d.nombre_norma)](d, config)
+    _norma.precalculados = frozenset().union(*(f.precalculados for f in normas.values()))
+    compiladas["Norma"] = _norma
+    return compiladas
+
+_COMPILADAS = compilar_tipos()
+
+# Generadores *_runs con la firma de siempre: aceptan dicts o registros
+def _generador(tipo, nombre):
+    compilada = _COMPILADAS[tipo]
+
+    def gen(datos, y_otros_threshold=4):
+        return compilada(como_registro(tipo, datos), {"y_otros_threshold": y_otros_threshold})
+    gen.__name__ = gen.__qualname__ = nombre
+    return gen
+
+libro_runs = _generador("Libro", "libro_runs")
+traduccion_libro_runs = _generador("Traducción de libro", "traduccion_libro_runs")
+capitulo_libro_runs = _generador("Capítulo de libro", "capitulo_libro_runs")
+articulo_revista_runs = _generador("Artículo de revista", "articulo_revista_runs")
+norma_runs = _generador("Norma", "norma_runs")
+jurisprudencia_runs = _generador("Jurisprudencia", "jurisprudencia_runs")
+jurisprudencia_internacional_runs = _generador("Jurisprudencia internacional", "jurisprudencia_internacional_runs")
+decreto_oficio_runs = _generador("Decreto / Oficio / Reglamento", "decreto_oficio_runs")
+proyecto_ley_runs = _generador("Proyecto de ley", "proyecto_ley_runs")
+historia_ley_runs = _generador("Historia de la ley", "historia_ley_runs")
+documento_internacional_runs = _generador("Documento internacional (ONU, OEA, etc.)", "documento_internacional_runs")
+instrumento_conferencia_runs = _generador("Instrumento emanado de congreso / conferencia",
+                                          "instrumento_conferencia_runs")
+web_runs = _generador("Página web o blog", "web_runs")
+tesis_runs = _generador("Tesis", "tesis_runs")
+
+# Versiones HTML, con la firma de siempre
+def _html(gen_runs):
+    def gen(datos, *args, **kwargs):
+        r = gen_runs(datos, *args, **kwargs)
+        if isinstance(r, tuple):
+            return a_html(r[0]), r[1]
+        return a_html(r)
+    gen.__name__ = gen_runs.__name__[:-len("_runs")]
+    return gen
+
+libro = _html(libro_runs)
+traduccion_libro = _html(traduccion_libro_runs)
+capitulo_libro = _html(capitulo_libro_runs)
+articulo_revista = _html(articulo_revista_runs)
+norma = _html(norma_runs)
+jurisprudencia = _html(jurisprudencia_runs)
+jurisprudencia_internacional = _html(jurisprudencia_internacional_runs)
+decreto_oficio = _html(decreto_oficio_runs)
+proyecto_ley = _html(proyecto_ley_runs)
+historia_ley = _html(historia_ley_runs)
+documento_internacional = _html(documento_internacional_runs)
+instrumento_conferencia = _html(instrumento_conferencia_runs)
+web = _html(web_runs)
+tesis = _html(tesis_runs)
+
+# ---------------- TIPOS mapping ----------------
+# f(registro, config): las plantillas compiladas, sin envoltorio. Reciben el
+# registro ya tipado (generar_runs lo convierte).
+TIPOS_RUNS = {tipo: _COMPILADAS[tipo] for tipo in ESQUEMAS}
+
+def _desde_datos(tipo):
+    compilada = _COMPILADAS[tipo]
+
+    def gen_runs(datos, config):
+        return compilada(como_registro(tipo, datos), config)
+    return gen_runs
+
+TIPOS = {tipo: _html(_desde_datos(tipo)) for tipo in TIPOS_RUNS}
+
+CONFIG_POR_DEFECTO = {"y_otros_threshold": 4}
+
+# Tipos cuyo generador devuelve una tupla (ref, abreviada)
+TIPOS_CON_ABREVIADA = frozenset(tipo for tipo, (_, cita) in PLANTILLAS.items() if cita is not None) | {"Norma"}
+
+# ---------------- Generación ----------------
+def generar_runs(tipo, datos, config=None, libro_y_otros=False):
+    """
+    Devuelve (runs, cita) para un registro. Lanza KeyError si el tipo no existe.
+    """
+    if config is None:
+        config = CONFIG_POR_DEFECTO
+    datos = como_registro(tipo, datos)
+    gen = TIPOS_RUNS[tipo](datos, config)
+    if tipo in TIPOS_CON_ABREVIADA:
+        return gen
+    cita_texto = cita_abreviada(
+        datos.autores,
+        datos.año,
+        paginas=datos.get('paginas'),
+        tomo=datos.get('tomo'),
+        tipo=tipo,
+        libro_y_otros=libro_y_otros,
+        y_otros_threshold=config['y_otros_threshold']
+    )
+    return gen, cita_texto
+
+def generar_cita(tipo, datos, config=None, libro_y_otros=False):
+    """
+    Genera (ref_html, ref_texto, cita) para un registro, igual que el botón
+    "Generar cita" de la UI. Ambas referencias salen de los mismos runs.
+    """
+    runs, cita_texto = generar_runs(tipo, datos, config, libro_y_otros)
+    return a_html(runs), a_texto(runs), cita_texto
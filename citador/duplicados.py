@@ -0,0 +1,240 @@
+# citador/duplicados.py
+# Detección de referencias casi duplicadas en bibliografías fusionadas.
+#
+# 1. Bloqueo: cada registro cae en un bloque según (primer apellido plegado,
+#    año). Solo se comparan registros del mismo bloque, así que el trabajo
+#    crece con el tamaño de los bloques y no con n².
+# 2. Dentro del bloque, los registros con la misma huella de título (palabras
+#    significativas, sin tildes ni orden) se unen directo; el resto se compara
+#    con similitud difusa de título y se descartan pares con edición, tomo,
+#    volumen, número o tipo distintos. Los bloques muy grandes se recorren
+#    con una ventana deslizante sobre la huella (sorted neighbourhood).
+# 3. Los pares aceptados se agrupan con union-find. Cada grupo guarda la firma
+#    combinada de sus miembros (edición, tomo, volumen, número, editorial) y
+#    solo se une a otro si las firmas son compatibles, para que un registro
+#    sin edición no junte la 2ª y la 3ª edición. De cada grupo se sugiere como
+#    canónico el registro más completo.
+import json
+import re
+import sys
+from collections import defaultdict, namedtuple
+from difflib import SequenceMatcher
+
+from .registros import como_registro, primer_apellido, titulo_principal
+from .texto import plegar_palabras
+
+UMBRAL_SIMILITUD = 0.88
+MAX_BLOQUE_COMPLETO = 60     # sobre esto se usa ventana deslizante
+VENTANA = 15
+
+_VACIAS = frozenset("""
+a al ante con de del el en la las lo los para por sobre su sus un una unas unos y e o u
+the of and in on for to an
+""".split())
+
+_ORDINALES = {
+    "primera": "1", "segunda": "2", "tercera": "3", "cuarta": "4", "quinta": "5",
+    "sexta": "6", "septima": "7", "séptima": "7", "octava": "8", "novena": "9",
+    "decima": "10", "décima": "10",
+}
+_RE_NUMERO = re.compile(r"\d+")
+_RE_EDITORIAL = re.compile(r"\b(?:editorial|ediciones|ed|edit|ltda)\b")
+
+Grupo = namedtuple("Grupo", "canonico miembros similitud")
+_Entrada = namedtuple("_Entrada", "id tipo registro huella titulo palabras edicion tomo volumen numero editorial completitud")
+
+
+# ---------------- Normalización ----------------
+def _significativas(titulo_plegado):
+    return frozenset(titulo_plegado.split()) - _VACIAS
+
+def huella_titulo(titulo):
+    """Palabras significativas del título, plegadas, únicas y ordenadas."""
+    return " ".join(sorted(_significativas(plegar_palabras(titulo))))
+
+def normalizar_edicion(edicion):
+    """'2ª', '2a ed.', 'segunda', 'Segunda edición' y '2' -> '2'."""
+    e = plegar_palabras(edicion)
+    if not e:
+        return ""
+    m = _RE_NUMERO.search(e)
+    if m:
+        return str(int(m.group()))
+    for palabra in e.split():
+        if palabra in _ORDINALES:
+            return _ORDINALES[palabra]
+    return e
+
+def normalizar_editorial(editorial):
+    return " ".join(_RE_EDITORIAL.sub(" ", plegar_palabras(editorial)).split())
+
+def clave_bloque(registro):
+    return (plegar_palabras(primer_apellido(registro)), registro.get("año"))
+
+def _entrada(id_registro, tipo, registro):
+    titulo = plegar_palabras(titulo_principal(registro))
+    palabras = _significativas(titulo)
+    edicion = normalizar_edicion(registro.get("edicion"))
+    if edicion == "1":
+        edicion = ""    # la primera edición no se indica
+    completitud = sum(1 for c in registro.campos if registro.get(c.nombre))
+    return _Entrada(
+        id_registro, tipo, registro, " ".join(sorted(palabras)), titulo, palabras, edicion,
+        plegar_palabras(registro.get("tomo")), registro.get("volumen"), registro.get("numero"),
+        normalizar_editorial(registro.get("editorial")), completitud,
+    )
+
+
+# ---------------- Comparación ----------------
+def _compatibles(a, b):
+    # Se llama por cada par candidato: comparaciones desenrolladas a propósito
+    if a.tipo != b.tipo:
+        return False
+    if a.edicion and b.edicion and a.edicion != b.edicion:
+        return False
+    if a.tomo and b.tomo and a.tomo != b.tomo:
+        return False
+    if a.volumen and b.volumen and a.volumen != b.volumen:
+        return False
+    if a.numero and b.numero and a.numero != b.numero:
+        return False
+    return not (a.editorial and b.editorial and a.editorial != b.editorial
+                and a.editorial not in b.editorial and b.editorial not in a.editorial)
+
+def _combinar(a, b):
+    """Firma de la unión de dos grupos: el primer valor no vacío de cada campo."""
+    return a._replace(
+        edicion=a.edicion or b.edicion, tomo=a.tomo or b.tomo, volumen=a.volumen or b.volumen,
+        numero=a.numero or b.numero, editorial=max(a.editorial, b.editorial, key=len),
+    )
+
+def similitud(a, b):
+    """0..1; 1.0 si las huellas coinciden."""
+    if a.huella == b.huella:
+        return 1.0
+    if not a.palabras or not b.palabras:
+        return 0.0
+    jaccard = len(a.palabras & b.palabras) / len(a.palabras | b.palabras)
+    if jaccard < 0.5:
+        return jaccard
+    return SequenceMatcher(None, a.titulo, b.titulo).ratio()
+
+def _pares_candidatos(bloque):
+    if len(bloque) <= MAX_BLOQUE_COMPLETO:
+        for i in range(len(bloque)):
+            for j in range(i + 1, len(bloque)):
+                yield bloque[i], bloque[j]
+    else:
+        ordenado = sorted(bloque, key=lambda e: e.huella)
+        for i in range(len(ordenado)):
+            for j in range(i + 1, min(i + 1 + VENTANA, len(ordenado))):
+                yield ordenado[i], ordenado[j]
+
+
+class _UnionFind:
+    def __init__(self):
+        self.padre = {}
+
+    def buscar(self, x):
+        padre = self.padre
+        raiz = x
+        while padre.get(raiz, raiz) != raiz:
+            raiz = padre[raiz]
+        while x != raiz:
+            padre[x], x = raiz, padre.get(x, x)
+        return raiz
+
+    def unir(self, a, b):
+        ra, rb = self.buscar(a), self.buscar(b)
+        if ra != rb:
+            self.padre[rb] = ra
+
+
+# ---------------- API ----------------
+def detectar_duplicados(registros, umbral=UMBRAL_SIMILITUD):
+    """
+    registros: iterable de (id, tipo, datos). Devuelve una lista de Grupo con
+    los grupos de 2 o más registros que parecen la misma obra.
+    """
+    bloques = defaultdict(list)
+    for id_registro, tipo, datos in registros:
+        registro = como_registro(tipo, datos)
+        bloques[clave_bloque(registro)].append(_entrada(id_registro, tipo, registro))
+
+    uf = _UnionFind()
+    por_id = {}
+    minima = {}
+    firmas = {}     # raíz -> firma combinada del grupo
+    for bloque in bloques.values():
+        if len(bloque) < 2:
+            continue
+        for a, b in _pares_candidatos(bloque):
+            if not _compatibles(a, b):
+                continue
+            s = similitud(a, b)
+            if s < umbral:
+                continue
+            ra, rb = uf.buscar(a.id), uf.buscar(b.id)
+            if ra != rb:
+                fa, fb = firmas.get(ra, a), firmas.get(rb, b)
+                if not _compatibles(fa, fb):
+                    continue
+                uf.unir(a.id, b.id)
+                firmas[uf.buscar(a.id)] = _combinar(fa, fb)
+            por_id[a.id], por_id[b.id] = a, b
+            minima[(a.id, b.id)] = s
+
+    grupos = defaultdict(list)
+    for id_registro in por_id:
+        grupos[uf.buscar(id_registro)].append(por_id[id_registro])
+    sims = defaultdict(lambda: 1.0)
+    for (a, _), s in minima.items():
+        raiz = uf.buscar(a)
+        sims[raiz] = min(sims[raiz], s)
+
+    resultado = []
+    for raiz, miembros in grupos.items():
+        canonico = min(miembros, key=lambda e: (-e.completitud, _orden(e.id)))
+        resultado.append(Grupo(canonico.id, sorted((e.id for e in miembros), key=_orden), sims[raiz]))
+    resultado.sort(key=lambda g: _orden(g.miembros[0]))
+    return resultado
+
+def _orden(id_registro):
+    return (0, id_registro) if isinstance(id_registro, int) else (1, str(id_registro))
+
+
+# ---------------- CLI ----------------
+def agregar_argumentos(p):
+    from .lotes import FORMATOS_ENTRADA
+
+    p.add_argument("entrada", help="registros en CSV, JSONL, BibTeX, RIS o CSL-JSON (como 'formatear')")
+    p.add_argument("-o", "--salida", default="-", help="JSONL con un grupo por línea ('-' = stdout)")
+    p.add_argument("--formato-entrada", choices=FORMATOS_ENTRADA)
+    p.add_argument("--umbral", type=float, default=UMBRAL_SIMILITUD,
+                   help="similitud mínima de títulos (0-1)")
+
+def ejecutar(args):
+    from . import lotes
+
+    fmt = args.formato_entrada or lotes.detectar_formato(args.entrada)
+
+    def registros():
+        for n, fila in lotes.leer_filas(entrada, fmt):
+            try:
+                tipo, registro, _ = lotes.registro_desde_fila(fila)
+            except lotes.RegistroInvalido as e:
+                print(f"fila {n}: {e}", file=sys.stderr)
+                continue
+            yield n, tipo, registro
+
+    with lotes.abrir_texto(args.entrada) as entrada:
+        grupos = detectar_duplicados(registros(), umbral=args.umbral)
+    salida = lotes.abrir_texto(args.salida, "w")
+    for g in grupos:
+        salida.write(json.dumps({"canonico": g.canonico, "miembros": g.miembros,
+                                 "similitud": round(g.similitud, 3)}) + "\n")
+    if salida is not sys.stdout:
+        salida.close()
+    print(f"{len(grupos)} grupos de duplicados, {sum(len(g.miembros) for g in grupos)} registros",
+          file=sys.stderr)
+    return 0
@@ -0,0 +1,116 @@
+# citador/fechas.py
+# Parser de fechas en una pasada, sin strptime ni locale: una sola regex
+# precompilada reconoce todas las formas aceptadas y los nombres de mes están
+# en una tabla propia (español, más los ingleses que aceptaba el %B en locale C).
+#
+# Formas reconocidas (también como rango "A al B", "A - B", "A – B"):
+#   05/03/2020  5-3-2020  05/03/20  2020-03-05  05032020
+#   5 de marzo de 2020  5 marzo 2020  1° de marzo del 2020  5 March 2020
+#   5-7 de marzo de 2020  5 al 7 de marzo de 2020     (rango de días)
+#   marzo de 2020  03/2020                             (mes y año)
+import re
+from collections import namedtuple
+
+MESES = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
+    "julio": 7, "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10,
+    "noviembre": 11, "diciembre": 12,
+    "ene": 1, "feb": 2, "mar": 3, "abr": 4, "may": 5, "jun": 6, "jul": 7,
+    "ago": 8, "sep": 9, "sept": 9, "set": 9, "oct": 10, "nov": 11, "dic": 12,
+    "january": 1, "february": 2, "march": 3, "april": 4, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+}
+
+_DIAS_MES = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+_MES = r"[a-záéíóú]+\.?"
+_RE_FECHA = re.compile(
+    r"(?P<d>\d{1,2})(?P<s>[/-])(?P<m>\d{1,2})(?P=s)(?P<y>\d{4}|\d{2})"
+    r"|(?P<iy>\d{4})-(?P<im>\d{1,2})-(?P<id>\d{1,2})"
+    r"|(?P<cd>\d{2})(?P<cm>\d{2})(?P<cy>\d{4})"
+    r"|(?P<td>\d{1,2})[°º]?(?:\s*(?:-|–|al?)\s*(?P<td2>\d{1,2})[°º]?)?"
+    rf"(?:\s+de)?\s+(?P<tm>{_MES})(?:\s+del?)?\s+(?P<ty>\d{{4}})"
+    r"|(?P<pm>\d{1,2})[/-](?P<py>\d{4})"
+    rf"|(?P<ptm>{_MES})(?:\s+del?)?\s+(?P<pty>\d{{4}})"
+)
+_RE_RANGO = re.compile(r"\s+(?:al?|-|–)\s+|\s*–\s*")
+
+Fecha = namedtuple("Fecha", "dia mes año")   # dia es None en fechas de mes y año
+
+
+def _año(texto):
+    y = int(texto)
+    if len(texto) == 2:
+        # mismo pivote que %y: 69-99 -> 19xx, 00-68 -> 20xx
+        y += 1900 if y >= 69 else 2000
+    return y
+
+def _mes(texto):
+    if texto.isdigit():
+        return int(texto)
+    return MESES.get(texto.rstrip("."), 0)
+
+def _valida(dia, mes, año):
+    if not 1 <= mes <= 12 or año < 1:
+        return False
+    if dia is None:
+        return True
+    if mes == 2 and dia == 29:
+        return año % 4 == 0 and (año % 100 != 0 or año % 400 == 0)
+    return 1 <= dia <= _DIAS_MES[mes]
+
+def _fechas(texto):
+    """Fechas (1 o 2 si es rango de días) de un texto sin separador de rango."""
+    m = _RE_FECHA.fullmatch(texto)
+    if m is None:
+        return None
+    g = m.groupdict()
+    if g["d"] is not None:
+        fechas = [(int(g["d"]), int(g["m"]), _año(g["y"]))]
+    elif g["iy"] is not None:
+        fechas = [(int(g["id"]), int(g["im"]), int(g["iy"]))]
+    elif g["cd"] is not None:
+        fechas = [(int(g["cd"]), int(g["cm"]), int(g["cy"]))]
+    elif g["td"] is not None:
+        mes, año = _mes(g["tm"]), int(g["ty"])
+        fechas = [(int(g["td"]), mes, año)]
+        if g["td2"] is not None:
+            fechas.append((int(g["td2"]), mes, año))
+    elif g["pm"] is not None:
+        fechas = [(None, int(g["pm"]), int(g["py"]))]
+    else:
+        fechas = [(None, _mes(g["ptm"]), int(g["pty"]))]
+    if not all(_valida(*f) for f in fechas):
+        return None
+    return [Fecha(*f) for f in fechas]
+
+def parsear_fecha(texto):
+    """
+    Devuelve una lista con una Fecha (o dos si es un rango), o None si el
+    texto no es una fecha reconocible o no existe (p.ej. 31/02/2020).
+    """
+    t = texto.strip().lower()
+    if not t:
+        return None
+    fechas = _fechas(t)
+    if fechas is not None:
+        return fechas
+    partes = _RE_RANGO.split(t)
+    if len(partes) != 2:
+        return None
+    a, b = _fechas(partes[0]), _fechas(partes[1])
+    if a is None or b is None or len(a) != 1 or len(b) != 1:
+        return None
+    return a + b
+
+def formatear_fecha(f):
+    if f.dia is None:
+        return f"{f.mes:02d}/{f.año}"
+    return f"{f.dia:02d}/{f.mes:02d}/{f.año}"
+
+def normalizar_fecha(texto):
+    """dd/mm/YYYY, mm/YYYY o un rango "A–B"; None si no se reconoce."""
+    fechas = parsear_fecha(texto)
+    if fechas is None:
+        return None
+    return "–".join(formatear_fecha(f) for f in fechas)
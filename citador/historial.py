@@ -0,0 +1,90 @@
+# citador/historial.py
+# Historial de citas de una sesión: buffer circular con capacidad fija y
+# páginas de tamaño fijo, para que el costo de cada rerun de la UI no crezca
+# con la cantidad de citas generadas. Cada entrada recibe un id creciente que
+# no se reutiliza, y que sirve como key estable de los widgets.
+#
+# Las entradas guardan el registro (tipo, datos, libro_y_otros), no el texto:
+# renderizar() formatea con la configuración vigente y memoiza por (registro,
+# configuración), así que cambiar el umbral de "y otros" solo vuelve a
+# formatear las entradas que se muestran, cuando se muestran.
+from collections import deque, namedtuple
+from itertools import islice
+
+from .core import generar_runs
+from .memo import memoizar
+from .registros import como_registro
+from .render import a_html, a_texto
+
+CAPACIDAD_POR_DEFECTO = 200
+TAM_PAGINA_POR_DEFECTO = 10
+# Entradas por configuración que quedan formateadas (el historial tiene a lo más 1000)
+TAM_CACHE_RENDER = 4096
+
+Renderizada = namedtuple("Renderizada", "runs referencia_html referencia cita")
+
+
+@memoizar(maxsize=TAM_CACHE_RENDER, nombre="renderizar_historial")
+def _renderizar(tipo, registro, libro_y_otros, clave_config):
+    runs, cita = generar_runs(tipo, registro, dict(clave_config), libro_y_otros=libro_y_otros)
+    return Renderizada(runs, a_html(runs), a_texto(runs), cita)
+
+def renderizar(entrada, config):
+    """
+    Renderizada(runs, referencia_html, referencia, cita) de una entrada con
+    config. Las entradas sin datos (solo con el texto, de versiones anteriores)
+    se devuelven tal como se guardaron.
+    """
+    if "datos" not in entrada:
+        return Renderizada(entrada.get("runs"), None, entrada["referencia"], entrada["cita"])
+    return _renderizar(entrada["tipo"], entrada["datos"], entrada.get("libro_y_otros", False),
+                       tuple(sorted(config.items())))
+
+
+class Historial:
+    def __init__(self, capacidad=CAPACIDAD_POR_DEFECTO):
+        self._entradas = deque(maxlen=capacidad)
+        self._siguiente_id = 1
+
+    @property
+    def capacidad(self):
+        return self._entradas.maxlen
+
+    def redimensionar(self, capacidad):
+        """Cambia la capacidad; si baja, se descartan las entradas más antiguas."""
+        if capacidad != self._entradas.maxlen:
+            self._entradas = deque(self._entradas, maxlen=capacidad)
+
+    def agregar(self, entrada):
+        """
+        Agrega una entrada (dict con tipo, datos y libro_y_otros) y devuelve su
+        id. Los datos se guardan como registro (inmutable y hashable).
+        """
+        entrada = dict(entrada, id=self._siguiente_id)
+        if "datos" in entrada:
+            entrada["datos"] = como_registro(entrada["tipo"], entrada["datos"])
+        self._siguiente_id += 1
+        self._entradas.append(entrada)
+        return entrada["id"]
+
+    def limpiar(self):
+        self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __iter__(self):
+        """De la más reciente a la más antigua."""
+        return reversed(self._entradas)
+
+    def num_paginas(self, tam_pagina=TAM_PAGINA_POR_DEFECTO):
+        return max(1, -(-len(self._entradas) // tam_pagina))
+
+    def pagina(self, numero, tam_pagina=TAM_PAGINA_POR_DEFECTO):
+        """
+        Entradas de la página `numero` (desde 1), de la más reciente a la más
+        antigua. Solo recorre las entradas de esa página.
+        """
+        numero = min(max(1, numero), self.num_paginas(tam_pagina))
+        inicio = (numero - 1) * tam_pagina
+        return list(islice(reversed(self._entradas), inicio, inicio + tam_pagina))
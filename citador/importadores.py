@@ -0,0 +1,615 @@
+# citador/importadores.py
+# Importadores de exportaciones de gestores bibliográficos (Zotero, EndNote,
+# Mendeley): BibTeX, RIS y CSL-JSON. Cada uno lee el archivo de a poco y
+# entrega filas {"tipo": <clave de TIPOS>, "datos": {...}} iguales a las del
+# JSONL de lotes, así que sirven para formatear, la biblioteca, la
+# bibliografía y los duplicados sin pasos intermedios.
+#
+# Las tres lecturas pasan primero a un dict neutro (autores, editores,
+# titulo, contenedor, año, editorial, ...) y de ahí al esquema del tipo con
+# fila_desde_campos. Las entradas de tipos sin equivalente salen con tipo
+# "<formato>:<tipo original>" para que lleguen a rechazos con un error claro.
+import json
+import re
+import unicodedata
+
+from .fechas import normalizar_fecha
+
+# ---------------- Nombres ----------------
+# Partículas que van pegadas al apellido siguiente: "de la Fuente" es un apellido
+_PARTICULAS = frozenset("de del la las los y van von der da di du dos das san".split())
+
+def dividir_apellidos(apellidos):
+    """'Pérez García' -> ('Pérez', 'García'); 'de la Fuente Soto' -> ('de la Fuente', 'Soto')."""
+    grupos, actual = [], []
+    for palabra in apellidos.split():
+        actual.append(palabra)
+        if palabra.lower() not in _PARTICULAS:
+            grupos.append(" ".join(actual))
+            actual = []
+    if actual:
+        grupos.append(" ".join(actual))
+    if len(grupos) <= 1:
+        return (grupos[0] if grupos else ""), ""
+    return grupos[0], " ".join(grupos[1:])
+
+def autor_desde_nombre(texto):
+    """
+    Autor (dict) desde un nombre escrito como 'Apellidos, Nombre' o
+    'Nombre Apellido'. Sin coma se toma la última palabra como apellido,
+    salvo que venga entre llaves (BibTeX: '{Corte Suprema}').
+    """
+    texto = " ".join(texto.split())
+    if texto.startswith("{") and texto.endswith("}"):
+        return {"apellido1": texto[1:-1], "apellido2": "", "nombre": ""}
+    texto = texto.replace("{", "").replace("}", "")
+    if "," in texto:
+        partes = [p.strip() for p in texto.split(",")]
+        apellidos, nombre = partes[0], partes[-1] if len(partes) > 1 else ""
+        if len(partes) == 3:        # 'von Last, Jr, First'
+            nombre = partes[2]
+    else:
+        palabras = texto.split()
+        if len(palabras) < 2:
+            return {"apellido1": texto, "apellido2": "", "nombre": ""}
+        # las partículas en minúscula antes del apellido son parte de él
+        i = len(palabras) - 1
+        while i > 1 and palabras[i - 1].lower() in _PARTICULAS:
+            i -= 1
+        apellidos, nombre = " ".join(palabras[i:]), " ".join(palabras[:i])
+    ape1, ape2 = dividir_apellidos(apellidos)
+    return {"apellido1": ape1, "apellido2": ape2, "nombre": nombre}
+
+def _nombre_corrido(autores):
+    # Para campos de texto libre como traductor: 'Ana Pérez y Juan Soto'
+    return " y ".join(" ".join(p for p in (a["nombre"], a["apellido1"], a["apellido2"]) if p)
+                      for a in autores)
+
+
+# ---------------- Campos neutros -> esquema ----------------
+_RE_AÑO = re.compile(r"\d{4}")
+
+def _año(texto):
+    m = _RE_AÑO.search(texto or "")
+    return m.group() if m else ""
+
+def _fecha(texto):
+    return normalizar_fecha(texto) or texto
+
+def _paginas(texto):
+    return re.sub(r"\s*-+\s*|\s*–\s*", "-", (texto or "").strip())
+
+def _fila_ilegible(formato, error, clave=""):
+    """
+    Fila para una entrada que no se pudo convertir: lotes.registro_desde_fila
+    la rechaza con el error, así la entrada va a rechazos y la lectura sigue.
+    """
+    fila = {"tipo": f"{formato}:?", "error_lectura": f"{type(error).__name__}: {error}"}
+    if clave:
+        fila["clave"] = clave
+    return fila
+
+def fila_desde_campos(tipo, c):
+    """
+    Arma la fila {"tipo", "datos"} para tipo (clave de TIPOS) desde el dict
+    neutro c. Los campos que el tipo no usa se ignoran.
+    """
+    autores = c.get("autores") or []
+    g = c.get
+    if tipo == "Libro" and c.get("traductores"):
+        tipo = "Traducción de libro"
+    if tipo == "Libro":
+        datos = {"autores": autores, "año": g("año", ""), "titulo": g("titulo", ""),
+                 "ciudad": g("ciudad", ""), "editorial": g("editorial", ""),
+                 "edicion": g("edicion", ""), "tomo": g("volumen", "")}
+    elif tipo == "Traducción de libro":
+        datos = {"autores": autores, "año_original": g("año_original", ""), "año": g("año", ""),
+                 "titulo": g("titulo", ""), "traductor": _nombre_corrido(g("traductores")),
+                 "ciudad": g("ciudad", ""), "editorial": g("editorial", "")}
+    elif tipo == "Capítulo de libro":
+        # 'autores' alimenta la cita abreviada y 'autor_capitulo' la referencia
+        datos = {"autores": autores, "autor_capitulo": autores, "editores": g("editores") or [],
+                 "año": g("año", ""), "titulo_capitulo": g("titulo", ""),
+                 "titulo_libro": g("contenedor", ""), "ciudad": g("ciudad", ""),
+                 "editorial": g("editorial", ""), "paginas": g("paginas", "")}
+    elif tipo == "Artículo de revista":
+        datos = {"autores": autores, "año": g("año", ""), "titulo": g("titulo", ""),
+                 "revista": g("contenedor", ""), "volumen": g("volumen", ""), "numero": g("numero", ""),
+                 "paginas": g("paginas", ""), "doi": g("doi", ""), "url": g("url", "")}
+    elif tipo == "Tesis":
+        datos = {"autores": autores, "año": g("año", ""), "titulo": g("titulo", ""),
+                 "grado": g("grado", ""), "institucion": g("institucion", "")}
+    elif tipo == "Página web o blog":
+        # Las entidades ('{Tribunal Constitucional}') van como autor sin autores
+        entidades = [a["apellido1"] for a in autores if not a["nombre"] and not a["apellido2"]]
+        if entidades and len(entidades) == len(autores):
+            autores = []
+        datos = {"autores": autores, "año": g("año", ""), "titulo": g("titulo", ""),
+                 "url": g("url", ""), "fecha_consulta": _fecha(g("fecha_consulta", ""))}
+        if not autores:
+            datos["autor_sin_autor"] = " y ".join(entidades) or g("editorial") or g("contenedor", "")
+    elif tipo == "Jurisprudencia":
+        datos = {"tribunal": g("tribunal", ""), "año": g("año", ""), "rol": g("numero", ""),
+                 "nombre_caso": g("titulo", ""), "fuente": g("url", "")}
+    else:
+        return {"tipo": tipo, "datos": {}}
+    return {"tipo": tipo, "datos": datos}
+
+
+# ---------------- BibTeX ----------------
+TIPOS_BIBTEX = {
+    "book": "Libro", "mvbook": "Libro",
+    "inbook": "Capítulo de libro", "incollection": "Capítulo de libro",
+    "inproceedings": "Capítulo de libro", "conference": "Capítulo de libro",
+    "article": "Artículo de revista",
+    "phdthesis": "Tesis", "mastersthesis": "Tesis", "thesis": "Tesis",
+    "online": "Página web o blog", "electronic": "Página web o blog", "www": "Página web o blog",
+    "jurisdiction": "Jurisprudencia",
+}
+_GRADO_BIBTEX = {"phdthesis": "Doctor", "mastersthesis": "Magíster"}
+# Campos que se usan y se pasan por latex_a_texto (abstract, keywords, etc. no);
+# los nombres se decodifican persona a persona y url/doi van tal cual
+_CAMPOS_TEXTO_BIBTEX = (
+    "title", "chapter", "journal", "journaltitle", "booktitle", "year", "date", "origyear", "origdate",
+    "publisher", "address", "location", "edition", "volume", "number", "issue", "pages", "school",
+    "institution", "type", "urldate", "court",
+)
+
+_MESES_BIBTEX = {m: str(i) for i, m in enumerate(
+    "jan feb mar apr may jun jul aug sep oct nov dec".split(), 1)}
+
+_RE_ARROBA = re.compile(r"@\s*(\w+)\s*([{(])")
+_RE_LLAVES = re.compile(r"[{}]")
+_RE_CAMPO = re.compile(r"\s*([\w:.+-]+)\s*=\s*")
+_RE_PALABRA = re.compile(r"[\w:.+-]+")
+_RE_Y_OTROS = re.compile(r"\sand\s+others\s*$", re.IGNORECASE)
+
+# Acentos de LaTeX -> marca combinante (se recompone con NFC)
+_ACENTOS_LATEX = {"'": "\u0301", "`": "\u0300", "^": "\u0302", '"': "\u0308", "~": "\u0303",
+                  "=": "\u0304", ".": "\u0307", "c": "\u0327", "v": "\u030c", "u": "\u0306", "H": "\u030b"}
+_RE_ACENTO = re.compile(r"""\{?\\([`'^"~=.])\s*\{?\\?([A-Za-z])\}?\}?|\{?\\([cvuH])\s*\{([A-Za-z])\}\}?""")
+_SIMBOLOS_LATEX = {r"\ss": "ß", r"\o": "ø", r"\O": "Ø", r"\ae": "æ", r"\AE": "Æ", r"\&": "&",
+                   r"\%": "%", r"\$": "$", r"\_": "_", r"\#": "#", "---": "—", "--": "–",
+                   "!`": "¡", "?`": "¿", r"\textendash": "–", r"\textemdash": "—"}
+_RE_SIMBOLO = re.compile("|".join(re.escape(s) for s in sorted(_SIMBOLOS_LATEX, key=len, reverse=True)))
+_RE_COMANDO = re.compile(r"\\[a-zA-Z]+\s*")
+
+def latex_a_texto(valor):
+    """'P{\\'e}rez \\& Mu{\\~n}oz' -> 'Pérez & Muñoz'. Quita llaves y comandos no reconocidos."""
+    if "\\" not in valor and "{" not in valor and "-" not in valor and "`" not in valor:
+        return " ".join(valor.split())
+
+    def acento(m):
+        marca, letra = (m.group(1), m.group(2)) if m.group(1) else (m.group(3), m.group(4))
+        return unicodedata.normalize("NFC", letra + _ACENTOS_LATEX[marca])
+
+    valor = _RE_ACENTO.sub(acento, valor)
+    valor = _RE_SIMBOLO.sub(lambda m: _SIMBOLOS_LATEX[m.group()], valor)
+    valor = _RE_COMANDO.sub("", valor)
+    return " ".join(valor.replace("{", "").replace("}", "").split())
+
+def _entradas_bibtex(archivo):
+    """
+    Itera (tipo, cuerpo, error) por cada entrada @tipo{...}. Lee línea a línea
+    y solo guarda el texto de la entrada en curso; el nivel de llaves se
+    arrastra entre líneas, así que cada carácter se revisa una vez.
+
+    Una entrada con una llave sin cerrar se daría por abierta hasta el final
+    del archivo: si mientras está abierta llega una línea que empieza con
+    @tipo{, o se acaba el archivo, sale con error (y cuerpo hasta ahí) y la
+    lectura sigue desde esa línea.
+    """
+    buf = ""
+    tipo = None          # tipo de la entrada abierta (su cuerpo empieza en inicio)
+    inicio = nivel = escaneado = 0
+    parentesis = False
+    for linea in archivo:
+        if tipo is not None and "@" in linea and _RE_ARROBA.match(linea.lstrip()):
+            yield tipo, buf[inicio:], "entrada sin cerrar (llaves o paréntesis desbalanceados)"
+            buf, tipo = "", None
+        buf += linea
+        while True:
+            if tipo is None:
+                m = _RE_ARROBA.search(buf)
+                if not m:
+                    arroba = buf.rfind("@")
+                    buf = buf[arroba:] if arroba >= 0 else ""   # '@book' con la llave en otra línea
+                    break
+                tipo, parentesis = m.group(1).lower(), m.group(2) == "("
+                buf = buf[m.start():]
+                inicio = escaneado = m.end() - m.start()
+                nivel = 1
+            fin = None
+            if parentesis:
+                fin = _cierre_parentesis(buf, inicio)
+            else:
+                for ll in _RE_LLAVES.finditer(buf, escaneado):
+                    nivel += 1 if ll.group() == "{" else -1
+                    if nivel == 0:
+                        fin = ll.start()
+                        break
+            if fin is None:
+                escaneado = len(buf)    # la entrada sigue en las próximas líneas
+                break
+            yield tipo, buf[inicio:fin], None
+            buf, tipo = buf[fin + 1:], None
+    if tipo is not None:
+        yield tipo, buf[inicio:], "entrada sin cerrar al final del archivo"
+
+def _cierre_parentesis(buf, inicio):
+    profundidad = 0
+    for i in range(inicio, len(buf)):
+        c = buf[i]
+        if c == "{":
+            profundidad += 1
+        elif c == "}":
+            profundidad -= 1
+        elif c == ")" and profundidad == 0:
+            return i
+    return None
+
+def _valor_bibtex(cuerpo, i, macros):
+    """Lee un valor desde cuerpo[i] ({...}, "...", número o macro, unidos con #). Devuelve (valor, fin)."""
+    partes = []
+    n = len(cuerpo)
+    while i < n:
+        while i < n and cuerpo[i].isspace():
+            i += 1
+        if i >= n:
+            break
+        c = cuerpo[i]
+        if c == "{":
+            j = cuerpo.find("}", i + 1)
+            if j < 0 or cuerpo.find("{", i + 1, j) >= 0:
+                # hay llaves internas (el caso común no las tiene)
+                nivel, j = 1, n
+                for ll in _RE_LLAVES.finditer(cuerpo, i + 1):
+                    nivel += 1 if ll.group() == "{" else -1
+                    if nivel == 0:
+                        j = ll.start()
+                        break
+            partes.append(cuerpo[i + 1:j])
+            i = j + 1
+        elif c == '"':
+            nivel, j = 0, i + 1
+            while j < n and not (cuerpo[j] == '"' and nivel == 0):
+                nivel += {"{": 1, "}": -1}.get(cuerpo[j], 0)
+                j += 1
+            partes.append(cuerpo[i + 1:j])
+            i = j + 1
+        else:
+            m = _RE_PALABRA.match(cuerpo, i)
+            if not m:
+                break
+            palabra = m.group()
+            partes.append(macros.get(palabra.lower(), palabra))
+            i = m.end()
+        while i < n and cuerpo[i].isspace():
+            i += 1
+        if i < n and cuerpo[i] == "#":
+            i += 1
+            continue
+        break
+    return "".join(partes), i
+
+def _campos_bibtex(cuerpo, macros):
+    """Clave de cita y dict de campos (nombres en minúscula) de una entrada."""
+    clave, _, resto = cuerpo.partition(",")
+    campos = {}
+    i, n = 0, len(resto)
+    while i < n:
+        m = _RE_CAMPO.match(resto, i)
+        if not m:
+            coma = resto.find(",", i)
+            if coma < 0:
+                break
+            i = coma + 1
+            continue
+        valor, i = _valor_bibtex(resto, m.end(), macros)
+        campos[m.group(1).lower()] = valor
+        coma = resto.find(",", i)
+        i = n if coma < 0 else coma + 1
+    return clave.strip(), campos
+
+def _nombres_bibtex(valor):
+    # ' and ' separa personas, salvo dentro de llaves
+    nombres, nivel, inicio = [], 0, 0
+    for m in re.finditer(r"[{}]|\s+and\s+", valor):
+        t = m.group()
+        if t == "{":
+            nivel += 1
+        elif t == "}":
+            nivel -= 1
+        elif nivel == 0:
+            nombres.append(valor[inicio:m.start()])
+            inicio = m.end()
+    nombres.append(valor[inicio:])
+    autores = []
+    for nombre in nombres:
+        nombre = nombre.strip()
+        if nombre.lower() == "others" or not nombre:
+            continue
+        crudo = nombre.startswith("{") and nombre.endswith("}") and nombre.count("{") == 1
+        autores.append(autor_desde_nombre("{" + latex_a_texto(nombre) + "}" if crudo
+                                          else latex_a_texto(nombre)))
+    return autores
+
+def leer_bibtex(archivo):
+    """
+    Itera filas desde un .bib abierto. Soporta @string; ignora @comment y
+    @preamble. Una entrada que no se puede convertir sale como fila ilegible.
+    """
+    macros = dict(_MESES_BIBTEX)
+    for tipo_bib, cuerpo, error in _entradas_bibtex(archivo):
+        if tipo_bib in ("comment", "preamble"):
+            continue
+        try:
+            if error:
+                raise ValueError(error)
+            if tipo_bib == "string":
+                nombre, _, valor = cuerpo.partition("=")
+                macros[nombre.strip().lower()] = _valor_bibtex(valor, 0, macros)[0]
+                continue
+            fila = _fila_bibtex(tipo_bib, cuerpo, macros)
+        except Exception as e:
+            fila = _fila_ilegible("bibtex", e, cuerpo.partition(",")[0].strip())
+        yield fila
+
+def _fila_bibtex(tipo_bib, cuerpo, macros):
+    clave, f = _campos_bibtex(cuerpo, macros)
+    tipo = TIPOS_BIBTEX.get(tipo_bib)
+    if tipo_bib == "misc" and f.get("url"):
+        tipo = "Página web o blog"
+    if tipo is None:
+        return {"tipo": f"bibtex:{tipo_bib}", "clave": clave}
+    t = {k: latex_a_texto(f[k]) for k in _CAMPOS_TEXTO_BIBTEX if k in f}
+    for k in ("url", "doi"):
+        if k in f:
+            t[k] = f[k].replace("{", "").replace("}", "").strip()
+    c = {
+        "autores": _nombres_bibtex(f.get("author", "")),
+        "editores": _nombres_bibtex(f.get("editor", "")),
+        "traductores": _nombres_bibtex(f.get("translator", "")),
+        "titulo": t.get("title", ""),
+        "contenedor": t.get("journal") or t.get("journaltitle") or t.get("booktitle", ""),
+        "año": t.get("year") or _año(t.get("date")),
+        "año_original": t.get("origyear") or _año(t.get("origdate")),
+        "editorial": t.get("publisher", ""),
+        "ciudad": t.get("address") or t.get("location", ""),
+        "edicion": t.get("edition", ""),
+        "volumen": t.get("volume", ""),
+        "numero": t.get("number") or t.get("issue", ""),
+        "paginas": _paginas(t.get("pages")),
+        "doi": t.get("doi", ""),
+        "url": t.get("url", ""),
+        "institucion": t.get("school") or t.get("institution", ""),
+        "grado": _GRADO_BIBTEX.get(tipo_bib) or t.get("type", ""),
+        "fecha_consulta": t.get("urldate", ""),
+        "tribunal": t.get("court") or t.get("institution", ""),
+    }
+    if tipo == "Capítulo de libro" and not c["titulo"] and t.get("chapter"):
+        c["titulo"] = t["chapter"]
+    fila = fila_desde_campos(tipo, c)
+    fila["clave"] = clave
+    if fila["tipo"] == "Libro" and _RE_Y_OTROS.search(f.get("author", "")):
+        fila["libro_y_otros"] = "1"
+    return fila
+
+
+# ---------------- RIS ----------------
+TIPOS_RIS = {
+    "BOOK": "Libro", "EBOOK": "Libro", "EDBOOK": "Libro",
+    "CHAP": "Capítulo de libro", "ECHAP": "Capítulo de libro", "CPAPER": "Capítulo de libro",
+    "JOUR": "Artículo de revista", "EJOUR": "Artículo de revista", "MGZN": "Artículo de revista",
+    "JFULL": "Artículo de revista",
+    "THES": "Tesis",
+    "ELEC": "Página web o blog", "WEB": "Página web o blog", "BLOG": "Página web o blog",
+    "CASE": "Jurisprudencia",
+}
+_RE_LINEA_RIS = re.compile(r"^([A-Z][A-Z0-9])  -\s?(.*)$")
+
+def _entradas_ris(archivo):
+    """Itera dicts etiqueta -> lista de valores, uno por registro TY ... ER."""
+    actual, ultima = None, None
+    for linea in archivo:
+        linea = linea.rstrip("\r\n").lstrip("\ufeff")
+        m = _RE_LINEA_RIS.match(linea)
+        if not m:
+            if actual is not None and ultima and linea.strip():
+                actual[ultima][-1] += " " + linea.strip()   # continuación
+            continue
+        etiqueta, valor = m.group(1), m.group(2).strip()
+        if etiqueta == "TY":
+            actual = {"TY": [valor]}
+        elif actual is None:
+            continue
+        elif etiqueta == "ER":
+            yield actual
+            actual, ultima = None, None
+            continue
+        else:
+            actual.setdefault(etiqueta, []).append(valor)
+        ultima = etiqueta
+    if actual is not None:
+        yield actual
+
+def leer_ris(archivo):
+    """Itera filas desde un .ris abierto. Un registro que no se puede convertir sale como fila ilegible."""
+    for r in _entradas_ris(archivo):
+        try:
+            fila = _fila_ris(r)
+        except Exception as e:
+            fila = _fila_ilegible("ris", e, (r.get("ID") or [""])[0])
+        yield fila
+
+def _fila_ris(r):
+    def uno(*etiquetas):
+        for e in etiquetas:
+            if r.get(e):
+                return r[e][0]
+        return ""
+
+    ty = uno("TY").upper()
+    tipo = TIPOS_RIS.get(ty)
+    if tipo is None:
+        return {"tipo": f"ris:{ty}"}
+    # SP puede traer ya el rango, con guion o raya ('235–262')
+    inicio, fin = _paginas(uno("SP")), uno("EP")
+    paginas = f"{inicio}-{fin}" if inicio and fin and "-" not in inicio else inicio
+    contenedor = uno("T2", "JO", "JF", "JA", "BT") if tipo != "Libro" else ""
+    c = {
+        "autores": [autor_desde_nombre(a) for a in r.get("AU", []) + r.get("A1", [])],
+        "editores": [autor_desde_nombre(a) for a in r.get("A2", []) + r.get("ED", [])
+                     ] if tipo == "Capítulo de libro" else [],
+        "traductores": [autor_desde_nombre(a) for a in r.get("A4", [])] if tipo == "Libro" else [],
+        "titulo": uno("TI", "T1", "CT") or (uno("BT") if tipo == "Libro" else ""),
+        "contenedor": contenedor,
+        "año": _año(uno("PY", "Y1", "DA")),
+        "año_original": _año(uno("OP")),
+        "editorial": uno("PB"),
+        "ciudad": uno("CY", "PP"),
+        "edicion": uno("ET"),
+        "volumen": uno("VL"),
+        "numero": uno("IS", "CP"),
+        "paginas": _paginas(paginas),
+        "doi": uno("DO"),
+        "url": uno("UR", "L2"),
+        "institucion": uno("PB"),
+        "grado": uno("M3"),
+        "fecha_consulta": uno("Y2"),
+        "tribunal": uno("A3", "PB"),
+    }
+    return fila_desde_campos(tipo, c)
+
+
+# ---------------- CSL-JSON ----------------
+TIPOS_CSL = {
+    "book": "Libro",
+    "chapter": "Capítulo de libro", "paper-conference": "Capítulo de libro",
+    "entry-encyclopedia": "Capítulo de libro", "entry-dictionary": "Capítulo de libro",
+    "article-journal": "Artículo de revista", "article": "Artículo de revista",
+    "article-magazine": "Artículo de revista",
+    "thesis": "Tesis",
+    "webpage": "Página web o blog", "post-weblog": "Página web o blog", "post": "Página web o blog",
+    "legal_case": "Jurisprudencia",
+}
+
+def _iterar_json_array(archivo, tam_trozo=1 << 16):
+    """
+    Itera los objetos de un arreglo JSON sin cargar el archivo completo: se
+    leen trozos y se decodifica un objeto a la vez con raw_decode. También
+    acepta un objeto por línea (JSONL).
+    """
+    decodificador = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,[]\ufeff":
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                return
+            buf, pos = archivo.read(tam_trozo), 0
+            eof = not buf
+            continue
+        try:
+            obj, fin = decodificador.raw_decode(buf, pos)
+        except ValueError:
+            if eof:
+                raise
+            trozo = archivo.read(tam_trozo)
+            eof = not trozo
+            buf, pos = buf[pos:] + trozo, 0
+            continue
+        yield obj
+        pos = fin
+        if pos > tam_trozo:
+            buf, pos = buf[pos:], 0
+
+def _nombres_csl(nombres):
+    autores = []
+    for n in nombres or []:
+        if not isinstance(n, dict):
+            continue
+        if n.get("literal"):
+            autores.append({"apellido1": n["literal"], "apellido2": "", "nombre": ""})
+            continue
+        familia = " ".join(p for p in (n.get("non-dropping-particle", ""), n.get("family", "")) if p)
+        ape1, ape2 = dividir_apellidos(familia)
+        nombre = " ".join(p for p in (n.get("given", ""), n.get("dropping-particle", "")) if p)
+        autores.append({"apellido1": ape1, "apellido2": ape2, "nombre": nombre})
+    return autores
+
+def _fecha_csl(fecha, completa=False):
+    if not isinstance(fecha, dict):
+        return ""
+    # date-parts mal formado (no lista, vacío, "2019-xx", null) cae a raw/literal
+    partes = fecha.get("date-parts")
+    try:
+        partes = [int(p) for p in partes[0]] if isinstance(partes[0], list) else []
+    except (TypeError, ValueError, IndexError, KeyError):
+        partes = []
+    if not partes:
+        return _año(str(fecha.get("raw") or fecha.get("literal") or ""))
+    if completa and len(partes) == 3:
+        return f"{partes[2]:02d}/{partes[1]:02d}/{partes[0]}"
+    return str(partes[0])
+
+def leer_csl_json(archivo):
+    """
+    Itera filas desde un CSL-JSON abierto (arreglo de ítems o un ítem por
+    línea). Un ítem que no se puede convertir sale como fila ilegible; si el
+    JSON mismo está roto, lo que resta del archivo sale como una última fila
+    ilegible.
+    """
+    items = _iterar_json_array(archivo)
+    while True:
+        try:
+            item = next(items)
+        except StopIteration:
+            return
+        except ValueError as e:
+            yield _fila_ilegible("csl", e)
+            return
+        try:
+            fila = _fila_csl(item)
+        except Exception as e:
+            fila = _fila_ilegible("csl", e, str(item.get("id", "")) if isinstance(item, dict) else "")
+        yield fila
+
+def _fila_csl(item):
+    if not isinstance(item, dict):
+        return {"tipo": "csl:?"}
+    tipo_csl = item.get("type", "")
+    tipo = TIPOS_CSL.get(tipo_csl)
+    if tipo is None:
+        return {"tipo": f"csl:{tipo_csl}"}
+    s = {k: str(v).strip() for k, v in item.items() if isinstance(v, (str, int, float))}
+    c = {
+        "autores": _nombres_csl(item.get("author")),
+        "editores": _nombres_csl(item.get("editor") or item.get("container-author")),
+        "traductores": _nombres_csl(item.get("translator")),
+        "titulo": s.get("title", ""),
+        "contenedor": s.get("container-title", ""),
+        "año": _fecha_csl(item.get("issued")),
+        "año_original": _fecha_csl(item.get("original-date")),
+        "editorial": s.get("publisher", ""),
+        "ciudad": s.get("publisher-place", ""),
+        "edicion": s.get("edition", ""),
+        "volumen": s.get("volume", ""),
+        "numero": s.get("issue") or s.get("number", ""),
+        "paginas": _paginas(s.get("page")),
+        "doi": s.get("DOI", ""),
+        "url": s.get("URL", ""),
+        "institucion": s.get("publisher", ""),
+        "grado": s.get("genre", ""),
+        "fecha_consulta": _fecha_csl(item.get("accessed"), completa=True),
+        "tribunal": s.get("authority", ""),
+    }
+    fila = fila_desde_campos(tipo, c)
+    if item.get("id") is not None:
+        fila["clave"] = str(item["id"])
+    return fila
+
+
+LECTORES = {"bibtex": leer_bibtex, "ris": leer_ris, "csl": leer_csl_json}
+EXTENSIONES = {".bib": "bibtex", ".bibtex": "bibtex", ".ris": "ris", ".json": "csl"}
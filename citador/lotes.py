@@ -0,0 +1,330 @@
+# citador/lotes.py
+# Formateo por lotes en streaming: lee registros desde CSV o JSONL, los pasa
+# por generar_runs (TIPOS + cita_abreviada) y escribe cada fila apenas se
+# produce. Nada se acumula en memoria, así que el consumo no depende del
+# tamaño de la entrada. Las filas malas van al archivo de rechazos.
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from . import importadores, memo
+from .core import TIPOS, CONFIG_POR_DEFECTO, generar_runs
+from .registros import CLASES, Autor
+from .render import RENDERERS
+
+COLUMNAS_SALIDA = ["n", "tipo", "referencia", "cita"]
+
+_VERDADERO = frozenset(["1", "true", "si", "sí", "x", "yes"])
+
+# runs es la referencia sin renderizar (ver render.py); cada escritor la
+# convierte solo a los formatos que necesita.
+Resultado = namedtuple("Resultado", "n tipo runs cita error fila")
+
+
+class RegistroInvalido(ValueError):
+    pass
+
+
+# ---------------- Lectura ----------------
+FORMATOS_ENTRADA = ("csv", "jsonl", "bibtex", "ris", "csl")
+
+def detectar_formato(ruta):
+    ruta = ruta.lower()
+    if ruta.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return importadores.EXTENSIONES.get(os.path.splitext(ruta)[1], "csv")
+
+def abrir_texto(ruta, modo="r"):
+    if ruta == "-":
+        return sys.stdin if "r" in modo else sys.stdout
+    return open(ruta, modo, encoding="utf-8", newline="")
+
+def leer_filas(archivo, formato):
+    """
+    Itera (n, fila) sobre un archivo abierto, una fila a la vez. n parte en 1.
+    En JSONL una línea que no es JSON válido se entrega como string para que
+    llegue a rechazos en vez de cortar la lectura. bibtex, ris y csl se leen
+    con citador.importadores, que entregan las entradas que no pueden
+    convertir como filas con 'error_lectura' (también van a rechazos).
+    """
+    if formato == "csv":
+        for n, fila in enumerate(csv.DictReader(archivo), 1):
+            yield n, fila
+    elif formato in importadores.LECTORES:
+        # BibTeX, RIS y CSL-JSON ya entregan filas {"tipo", "datos"}
+        for n, fila in enumerate(importadores.LECTORES[formato](archivo), 1):
+            yield n, fila
+    else:
+        n = 0
+        for linea in archivo:
+            if not linea.strip():
+                continue
+            n += 1
+            try:
+                yield n, json.loads(linea)
+            except ValueError:
+                yield n, linea.rstrip("\n")
+
+
+# ---------------- Normalización de filas ----------------
+def parsear_autores(valor):
+    """
+    Acepta una lista de dicts (JSONL) o el formato plano de CSV:
+    "Apellido1|Apellido2|Nombre; Apellido1||Nombre".
+    """
+    if not valor:
+        return []
+    if isinstance(valor, list):
+        autores = []
+        for a in valor:
+            if not isinstance(a, dict):
+                raise RegistroInvalido(f"autor inválido: {a!r}")
+            autores.append(Autor(_como_texto(a.get('apellido1')).strip(),
+                                 _como_texto(a.get('apellido2')).strip(),
+                                 _como_texto(a.get('nombre')).strip()))
+        return autores
+    if not isinstance(valor, str):
+        raise RegistroInvalido(f"lista de autores inválida: {valor!r}")
+    autores = []
+    for parte in valor.split(";"):
+        if not parte.strip():
+            continue
+        campos = [c.strip() for c in parte.split("|")]
+        if len(campos) > 3:
+            raise RegistroInvalido(f"autor con más de 3 campos: {parte.strip()!r}")
+        campos += [""] * (3 - len(campos))
+        autores.append(Autor(*campos))
+    return autores
+
+def _como_texto(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, (str, int, float)):
+        return str(valor)
+    raise RegistroInvalido(f"valor no escalar: {valor!r}")
+
+def registro_desde_fila(fila):
+    """
+    Convierte una fila cruda en (tipo, registro, libro_y_otros) usando el
+    esquema del tipo (citador.registros); las columnas que el esquema no
+    conoce se ignoran. Los campos pueden venir planos junto a 'tipo' o
+    anidados bajo 'datos'. En filas planas el campo 'tipo' de
+    "Decreto / Oficio / Reglamento" choca con la columna del tipo de fuente,
+    así que se escribe como 'tipo_documento'.
+    """
+    if not isinstance(fila, dict):
+        raise RegistroInvalido("la fila no es un objeto")
+    if fila.get("error_lectura"):
+        raise RegistroInvalido(f"entrada ilegible: {fila['error_lectura']}")
+    tipo = _como_texto(fila.get("tipo")).strip()
+    if not tipo:
+        raise RegistroInvalido("falta 'tipo'")
+    if tipo not in TIPOS:
+        raise RegistroInvalido(f"tipo desconocido: {tipo!r}")
+    crudos = fila.get("datos")
+    plana = crudos is None
+    if plana:
+        crudos = fila
+    elif not isinstance(crudos, dict):
+        raise RegistroInvalido("'datos' debe ser un objeto")
+
+    clase = CLASES[tipo]
+    valores = {}
+    for campo in clase.campos:
+        clave = "tipo_documento" if plana and campo.nombre == "tipo" else campo.nombre
+        if clave not in crudos:
+            continue
+        v = crudos[clave]
+        valores[campo.nombre] = parsear_autores(v) if campo.tipo == "autores" else _como_texto(v)
+    libro_y_otros = _como_texto(fila.get("libro_y_otros")).strip().lower() in _VERDADERO
+    return tipo, clase(**valores), libro_y_otros
+
+
+# ---------------- Procesamiento ----------------
+def procesar_fila(n, fila, config):
+    try:
+        tipo, datos, libro_y_otros = registro_desde_fila(fila)
+        runs, cita = generar_runs(tipo, datos, config, libro_y_otros=libro_y_otros)
+    except Exception as e:
+        return Resultado(n, None, None, None, f"{type(e).__name__}: {e}", fila)
+    return Resultado(n, tipo, runs, cita, None, None)
+
+def formatear_filas(filas, config=None):
+    """Itera Resultado para cada (n, fila), en orden y sin acumular."""
+    config = config or CONFIG_POR_DEFECTO
+    for n, fila in filas:
+        yield procesar_fila(n, fila, config)
+
+def _procesar_bloque(bloque, config):
+    return [procesar_fila(n, fila, config) for n, fila in bloque]
+
+def _bloques(filas, tam_bloque):
+    filas = iter(filas)
+    while True:
+        bloque = list(islice(filas, tam_bloque))
+        if not bloque:
+            return
+        yield bloque
+
+def formatear_filas_paralelo(filas, config=None, procesos=None, tam_bloque=500):
+    """
+    Igual que formatear_filas, pero reparte bloques de tam_bloque filas en un
+    pool de procesos. Los resultados salen en el orden de entrada y son los
+    mismos que en serie. Como máximo hay 2 bloques por proceso en vuelo, así
+    que la memoria sigue acotada.
+    """
+    config = config or CONFIG_POR_DEFECTO
+    procesos = procesos or os.cpu_count() or 1
+    max_en_vuelo = 2 * procesos
+    with ProcessPoolExecutor(max_workers=procesos, initializer=memo.aplicar_configuracion,
+                             initargs=(memo.configuracion_actual(),)) as pool:
+        en_vuelo = deque()
+        for bloque in _bloques(filas, tam_bloque):
+            en_vuelo.append(pool.submit(_procesar_bloque, bloque, config))
+            if len(en_vuelo) >= max_en_vuelo:
+                yield from en_vuelo.popleft().result()
+        while en_vuelo:
+            yield from en_vuelo.popleft().result()
+
+
+# ---------------- Escritura ----------------
+class EscritorSalida:
+    """Escribe resultados OK en CSV o JSONL a medida que llegan."""
+
+    def __init__(self, archivo, formato, html=False, render="texto"):
+        self.archivo = archivo
+        self.formato = formato
+        self.columnas = COLUMNAS_SALIDA + (["referencia_html"] if html else [])
+        self.html = html
+        self.render = RENDERERS[render]
+        if formato == "csv":
+            self._csv = csv.writer(archivo)
+            self._csv.writerow(self.columnas)
+
+    def escribir(self, r):
+        fila = [r.n, r.tipo, self.render(r.runs), r.cita]
+        if self.html:
+            fila.append(RENDERERS["html"](r.runs))
+        if self.formato == "csv":
+            self._csv.writerow(fila)
+        else:
+            self.archivo.write(json.dumps(dict(zip(self.columnas, fila)), ensure_ascii=False) + "\n")
+
+class EscritorDocumento:
+    """Pasa los runs de cada resultado OK a un exportador DOCX/RTF/HTML (ver exportar.py)."""
+
+    def __init__(self, exportador):
+        self.exportador = exportador
+
+    def escribir(self, r):
+        self.exportador.agregar(r.runs)
+
+class EscritorRechazos:
+    def __init__(self, archivo):
+        self.archivo = archivo
+
+    def escribir(self, r):
+        self.archivo.write(json.dumps({"n": r.n, "error": r.error, "fila": r.fila}, ensure_ascii=False) + "\n")
+
+def volcar(resultados, salida, rechazos=None):
+    """Consume los resultados escribiéndolos; devuelve (ok, rechazados)."""
+    ok = malos = 0
+    for r in resultados:
+        if r.error is None:
+            salida.escribir(r)
+            ok += 1
+        else:
+            if rechazos is not None:
+                rechazos.escribir(r)
+            malos += 1
+    return ok, malos
+
+
+# ---------------- CLI ----------------
+def entero_no_negativo(valor):
+    """Tipo de argparse para --procesos: 0 o más."""
+    try:
+        n = int(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"se esperaba un entero, no {valor!r}")
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"no puede ser negativo: {n}")
+    return n
+
+def entero_positivo(valor):
+    """Tipo de argparse para --tam-bloque: 1 o más."""
+    n = entero_no_negativo(valor)
+    if n == 0:
+        raise argparse.ArgumentTypeError("debe ser al menos 1")
+    return n
+
+def agregar_argumentos(p):
+    p.add_argument("entrada", help="CSV o JSONL con una columna 'tipo' y los campos de datos, o un .bib/.ris/.json "
+                        "(CSL-JSON) exportado de Zotero o EndNote ('-' = stdin)")
+    p.add_argument("-o", "--salida", default="-",
+                   help="archivo de salida CSV, JSONL, DOCX, RTF o HTML ('-' = stdout)")
+    p.add_argument("--rechazos", help="JSONL donde se escriben las filas que no se pudieron formatear")
+    p.add_argument("--formato-entrada", choices=FORMATOS_ENTRADA)
+    p.add_argument("--formato-salida", choices=["csv", "jsonl", "docx", "rtf", "html"],
+                   help="docx, rtf y html llevan cursivas y versalitas reales (por defecto según la extensión)")
+    p.add_argument("--umbral", type=int, default=CONFIG_POR_DEFECTO["y_otros_threshold"],
+                   help="umbral para 'y otros' (3 o 4)")
+    p.add_argument("--html", action="store_true", help="agrega la columna referencia_html")
+    p.add_argument("--render", choices=sorted(RENDERERS), default="texto",
+                   help="formato de la columna referencia (por defecto texto plano)")
+    p.add_argument("--procesos", type=entero_no_negativo, default=1,
+                   help="procesos en paralelo (1 = en serie, 0 = uno por núcleo)")
+    p.add_argument("--tam-bloque", type=entero_positivo, default=500, help="filas por bloque en modo paralelo")
+    p.add_argument("--sin-cache", action="store_true", help="desactiva la caché de helpers (para medir)")
+    p.add_argument("--metricas", metavar="ARCHIVO",
+                   help="mide tiempos por tipo y los escribe al terminar en formato Prometheus "
+                        "(solo en serie: los procesos del pool no se suman)")
+
+def ejecutar(args):
+    from . import exportar
+
+    fmt_in = args.formato_entrada or detectar_formato(args.entrada)
+    fmt_out = args.formato_salida or exportar.formato_por_extension(args.salida) or detectar_formato(args.salida)
+    config = {"y_otros_threshold": args.umbral}
+    if args.sin_cache:
+        memo.configurar_cache(activa=False)
+    if args.metricas:
+        from . import metricas
+        metricas.activar()
+
+    entrada = abrir_texto(args.entrada)
+    if fmt_out in exportar.EXPORTADORES:
+        salida = exportar.abrir_salida(args.salida, fmt_out)
+        escritor = EscritorDocumento(exportar.EXPORTADORES[fmt_out](salida))
+    else:
+        salida = abrir_texto(args.salida, "w")
+        escritor = EscritorSalida(salida, fmt_out, html=args.html, render=args.render)
+    rech = open(args.rechazos, "w", encoding="utf-8") if args.rechazos else None
+    t0 = time.perf_counter()
+    try:
+        filas = leer_filas(entrada, fmt_in)
+        if args.procesos == 1:
+            resultados = formatear_filas(filas, config)
+        else:
+            resultados = formatear_filas_paralelo(filas, config, procesos=args.procesos or None,
+                                                  tam_bloque=args.tam_bloque)
+        ok, malos = volcar(resultados, escritor, EscritorRechazos(rech) if rech else None)
+        if isinstance(escritor, EscritorDocumento):
+            escritor.exportador.cerrar()
+    finally:
+        for f in (entrada, salida, rech):
+            if f is not None and f not in (sys.stdin, sys.stdout, sys.stdout.buffer):
+                f.close()
+    dt = time.perf_counter() - t0
+    if args.metricas:
+        metricas.escribir_prometheus(args.metricas)
+    total = ok + malos
+    print(f"{ok} registros formateados, {malos} rechazados en {dt:.2f} s "
+          f"({total / dt if dt else 0:.0f} registros/s)", file=sys.stderr)
+    return 0
@@ -0,0 +1,260 @@
+# citador/manuscrito.py
+# Revisión de citas de un manuscrito contra su bibliografía: cada cita
+# abreviada del texto ("PÉREZ (2020a), p. 45") debe tener su referencia, y
+# cada referencia debe citarse al menos una vez.
+#
+# Las citas que produciría cita_abreviada para la bibliografía (ya con sus
+# sufijos 2020a/2020b, ver bibliografia.py) se cargan en un autómata
+# Aho-Corasick, y el texto plegado (sin mayúsculas ni tildes, mismo largo) se
+# recorre una sola vez. Aparte, una única regex detecta todo lo que parece
+# cita ("Palabra (año)"), para informar las que no calzan con ninguna
+# referencia.
+import bisect
+import re
+import sys
+import unicodedata
+import zipfile
+from collections import defaultdict, namedtuple
+from xml.etree import ElementTree
+
+from .aho_corasick import AhoCorasick
+from .texto import plegar_posicional
+
+CitaSinReferencia = namedtuple("CitaSinReferencia", "linea cita contexto sugerencias")
+# citadas: lista de (Entrada, veces); sin_citar: lista de Entrada
+Informe = namedtuple("Informe", "total_citas citadas sin_referencia sin_citar")
+
+# "Palabra (2020)", "Palabra y otros (2020a)", "Palabra (s.f.)", sobre texto plegado
+_RE_CANDIDATA = re.compile(r"(\w[\w'’-]*)((?: y otros)?) \((\d{4}[a-z]?|s\. ?f\.)\)")
+_RE_MARKDOWN = re.compile(r"<[^>\n]+>|[*_`]")
+_RE_ANTES_Y = re.compile(r"\w[\w'’-]* y $")
+# Lo que _plegar_texto reduce a un espacio: tramos de más de uno, o un salto/tab
+_RE_ESPACIOS = re.compile(r"\s{2,}|[^\S ]")
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Cuerpo, notas al pie y notas al final
+_PARTES_DOCX = ("word/document.xml", "word/footnotes.xml", "word/endnotes.xml")
+
+
+# ---------------- Lectura ----------------
+def _parrafos_docx(f):
+    partes = []
+    for _, elem in ElementTree.iterparse(f):
+        tag = elem.tag
+        if tag == _W + "t":
+            partes.append(elem.text or "")
+        elif tag == _W + "tab":
+            partes.append("\t")
+        elif tag in (_W + "br", _W + "cr"):
+            partes.append("\n")
+        elif tag == _W + "p":
+            yield "".join(partes)
+            partes = []
+            elem.clear()
+
+def leer_docx(archivo):
+    """Texto de un .docx (ruta o archivo binario): un párrafo por línea, con las notas al final."""
+    with zipfile.ZipFile(archivo) as z:
+        nombres = set(z.namelist())
+        parrafos = []
+        for parte in _PARTES_DOCX:
+            if parte in nombres:
+                with z.open(parte) as f:
+                    parrafos.extend(_parrafos_docx(f))
+    return "\n".join(parrafos)
+
+def leer_manuscrito(ruta):
+    """Texto de un manuscrito .docx, .md o de texto plano."""
+    if ruta.lower().endswith(".docx"):
+        return leer_docx(ruta)
+    with open(ruta, encoding="utf-8-sig") as f:
+        texto = f.read()
+    if ruta.lower().endswith((".md", ".markdown")):
+        # Énfasis y etiquetas fuera; los saltos de línea se conservan
+        texto = _RE_MARKDOWN.sub("", texto)
+    return texto
+
+
+# ---------------- Revisión ----------------
+def _patron(entrada):
+    """Parte de la cita que identifica la obra: 'PÉREZ (2020a)' sin tomo ni páginas."""
+    año = entrada.registro.get("año")
+    marca = f" ({año}{entrada.sufijo})"
+    pos = entrada.cita.find(marca) if año else -1
+    return entrada.cita[:pos + len(marca)] if pos > 0 else entrada.cita
+
+def _plegar_patron(patron):
+    return " ".join(plegar_posicional(unicodedata.normalize("NFC", patron)).split())
+
+def _plegar_texto(texto):
+    """
+    Texto plegado con los espacios reducidos como en _plegar_patron (cada
+    tramo de espacios, saltos o tabs pasa a un espacio), y una función que
+    lleva cada posición del resultado a la del texto original.
+    """
+    plegado = plegar_posicional(texto)
+    partes, cortes, deltas = [], [], []
+    ultimo = delta = 0
+    for m in _RE_ESPACIOS.finditer(plegado):
+        partes.append(plegado[ultimo:m.start()])
+        partes.append(" ")
+        delta += m.end() - m.start() - 1
+        cortes.append(m.end() - delta)      # posición (ya reducida) de lo que sigue al espacio
+        deltas.append(delta)
+        ultimo = m.end()
+    if not cortes:
+        return plegado, lambda pos: pos
+    partes.append(plegado[ultimo:])
+
+    def original(pos):
+        i = bisect.bisect_right(cortes, pos)
+        return pos + (deltas[i - 1] if i else 0)
+    return "".join(partes), original
+
+
+class Revisor:
+    """
+    Índice de una bibliografía (lista de Entrada de construir_bibliografia)
+    para revisar uno o más manuscritos. El autómata se arma una vez.
+    """
+
+    def __init__(self, bibliografia):
+        self.bibliografia = list(bibliografia)
+        self._automata = AhoCorasick()
+        self._entradas_de = []                  # índice de patrón -> índices de entradas
+        self._sugerencias = defaultdict(set)    # apellido plegado -> {(año, cita)}
+        patrones = {}
+        for i, e in enumerate(self.bibliografia):
+            patron = _patron(e)
+            if not patron:
+                continue
+            plegado = _plegar_patron(patron)
+            if plegado not in patrones:
+                patrones[plegado] = self._automata.agregar(plegado)
+                self._entradas_de.append([])
+            self._entradas_de[patrones[plegado]].append(i)
+            m = _RE_CANDIDATA.search(plegado)
+            if m:
+                self._sugerencias[m.group(1)].add((m.group(3)[:4], patron))
+
+    def _apariciones(self, plegado):
+        """Apariciones con límite de palabra al inicio, sin las contenidas en otra más larga."""
+        encontradas = []
+        for inicio, fin, indice in self._automata.buscar(plegado):
+            if inicio > 0 and plegado[inicio - 1].isalnum():
+                continue
+            if plegado[fin - 1].isalnum() and fin < len(plegado) and plegado[fin].isalnum():
+                continue
+            encontradas.append((inicio, fin, indice))
+        encontradas.sort(key=lambda a: (a[0], -a[1]))
+        resultado, max_fin = [], -1
+        for a in encontradas:
+            if a[1] > max_fin:
+                resultado.append(a)
+                max_fin = a[1]
+        return resultado
+
+    def _sugerir(self, apellido, año, maximo=3):
+        """Citas de la bibliografía con el mismo apellido, primero las de años cercanos."""
+        def distancia(par):
+            a = par[0]
+            return (abs(int(a) - int(año)) if a.isdigit() and año.isdigit() else 9999, par[1])
+        return [cita for _, cita in sorted(self._sugerencias.get(apellido, ()), key=distancia)[:maximo]]
+
+    def revisar(self, texto):
+        texto = unicodedata.normalize("NFC", texto)
+        plegado, original = _plegar_texto(texto)
+        saltos = [m.start() for m in re.finditer("\n", texto)]
+
+        def linea(pos):
+            return bisect.bisect_right(saltos, original(pos)) + 1
+
+        def fragmento(inicio, fin):
+            """(cita, contexto) del texto original entre dos posiciones de plegado."""
+            inicio, fin = original(inicio), original(fin - 1) + 1
+            desde = max(texto.rfind("\n", 0, inicio) + 1, inicio - 40)
+            return texto[inicio:fin], texto[desde:fin].strip()
+
+        # Una aparición precedida de "GÓMEZ y " es la cita de otra obra (la
+        # de GÓMEZ y PÉREZ), no la de PÉREZ solo: no cuenta como citada
+        veces = [0] * len(self.bibliografia)
+        aceptadas, rechazadas = set(), {}
+        for inicio, fin, indice in self._apariciones(plegado):
+            antes = _RE_ANTES_Y.search(plegado, max(0, inicio - 40), inicio)
+            if antes is not None and texto[original(antes.start())].isupper():
+                rechazadas[fin] = antes.start()
+                continue
+            aceptadas.add(fin)
+            for i in self._entradas_de[indice]:
+                veces[i] += 1
+
+        total = 0
+        sin_referencia = []
+        for m in _RE_CANDIDATA.finditer(plegado):
+            if not texto[original(m.start(1))].isupper():
+                continue    # "la reforma de la ley (2020)" no es una cita
+            total += 1
+            if m.end() in aceptadas:
+                continue
+            inicio_cita = rechazadas.get(m.end(), m.start(1))
+            cita, contexto = fragmento(inicio_cita, m.end())
+            sin_referencia.append(CitaSinReferencia(linea(m.start()), cita, contexto,
+                                                    self._sugerir(m.group(1), m.group(3)[:4])))
+
+        citadas = [(e, n) for e, n in zip(self.bibliografia, veces) if n]
+        sin_citar = [e for e, n in zip(self.bibliografia, veces) if not n]
+        return Informe(total, citadas, sin_referencia, sin_citar)
+
+
+def revisar(texto, bibliografia):
+    """Atajo para revisar un solo texto contra una lista de Entrada."""
+    return Revisor(bibliografia).revisar(texto)
+
+
+# ---------------- CLI ----------------
+def agregar_argumentos(p):
+    from .core import CONFIG_POR_DEFECTO
+    from .lotes import FORMATOS_ENTRADA
+
+    p.add_argument("manuscrito", help="manuscrito .docx, .md o .txt")
+    p.add_argument("bibliografia", help="registros en CSV, JSONL, BibTeX, RIS o CSL-JSON (como 'formatear')")
+    p.add_argument("--formato-entrada", choices=FORMATOS_ENTRADA)
+    p.add_argument("--umbral", type=int, default=CONFIG_POR_DEFECTO["y_otros_threshold"],
+                   help="umbral para 'y otros' (3 o 4)")
+
+def ejecutar(args):
+    import time
+
+    from . import lotes
+    from .bibliografia import construir_bibliografia
+    from .render import a_texto
+
+    fmt = args.formato_entrada or lotes.detectar_formato(args.bibliografia)
+
+    def registros():
+        for n, fila in lotes.leer_filas(entrada, fmt):
+            try:
+                yield lotes.registro_desde_fila(fila)
+            except lotes.RegistroInvalido as e:
+                print(f"bibliografía, fila {n}: {e}", file=sys.stderr)
+
+    with lotes.abrir_texto(args.bibliografia) as entrada:
+        bibliografia = construir_bibliografia(registros(), {"y_otros_threshold": args.umbral})
+    texto = leer_manuscrito(args.manuscrito)
+    t0 = time.perf_counter()
+    informe = Revisor(bibliografia).revisar(texto)
+    dt = time.perf_counter() - t0
+
+    print(f"{informe.total_citas} citas en el texto, {len(informe.citadas)} de "
+          f"{len(bibliografia)} referencias citadas ({dt * 1000:.0f} ms)")
+    if informe.sin_referencia:
+        print(f"\nCitas sin referencia ({len(informe.sin_referencia)}):")
+        for c in informe.sin_referencia:
+            print(f"  línea {c.linea}: {c.cita}    …{c.contexto}")
+            if c.sugerencias:
+                print(f"    ¿quiso decir {' / '.join(c.sugerencias)}?")
+    if informe.sin_citar:
+        print(f"\nReferencias no citadas ({len(informe.sin_citar)}):")
+        for e in informe.sin_citar:
+            print(f"  {a_texto(e.runs)}")
+    return 1 if informe.sin_referencia or informe.sin_citar else 0
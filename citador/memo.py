@@ -0,0 +1,89 @@
+# citador/memo.py
+# Caché LRU acotada para los helpers puros del núcleo (versalitas, to_roman,
+# normalize_date, formatear_autor, ...). Cada función memoizada queda
+# registrada por nombre para poder cambiar su tamaño, apagarla o leer sus
+# contadores de aciertos/fallos sin tocar a quienes la llaman.
+#
+# La variable de entorno CITADOR_CACHE=0 la deja apagada desde el arranque.
+import os
+from functools import lru_cache
+
+TAMAÑO_POR_DEFECTO = 2048
+
+_REGISTRO = {}
+_activa = os.environ.get("CITADOR_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+
+class Memoizada:
+    """Envuelve una función pura con un lru_cache reconfigurable."""
+
+    def __init__(self, fn, maxsize, nombre=None):
+        self.fn = fn
+        self.nombre = nombre or fn.__name__
+        self.maxsize = maxsize
+        self.__name__ = fn.__name__
+        self.__doc__ = fn.__doc__
+        self.__wrapped__ = fn
+        self._preparar()
+
+    def _preparar(self):
+        if _activa and self.maxsize:
+            self._llamar = lru_cache(maxsize=self.maxsize)(self.fn)
+        else:
+            self._llamar = self.fn
+
+    def __call__(self, *args):
+        return self._llamar(*args)
+
+    def info(self):
+        if self._llamar is self.fn:
+            return {"activa": False, "aciertos": 0, "fallos": 0, "maxsize": 0, "tamaño": 0}
+        ci = self._llamar.cache_info()
+        return {"activa": True, "aciertos": ci.hits, "fallos": ci.misses,
+                "maxsize": ci.maxsize, "tamaño": ci.currsize}
+
+    def limpiar(self):
+        if self._llamar is not self.fn:
+            self._llamar.cache_clear()
+
+
+def memoizar(maxsize=TAMAÑO_POR_DEFECTO, nombre=None):
+    def deco(fn):
+        m = Memoizada(fn, maxsize, nombre)
+        _REGISTRO[m.nombre] = m
+        return m
+    return deco
+
+
+# ---------------- Configuración ----------------
+def configurar_cache(activa=None, maxsize=None):
+    """
+    Cambia el estado de todas las cachés registradas y las vacía.
+    maxsize puede ser un int (para todas) o un dict {nombre: int}.
+    """
+    global _activa
+    if activa is not None:
+        _activa = bool(activa)
+    for nombre, m in _REGISTRO.items():
+        if isinstance(maxsize, dict):
+            m.maxsize = maxsize.get(nombre, m.maxsize)
+        elif maxsize is not None:
+            m.maxsize = maxsize
+        m._preparar()
+
+def configuracion_actual():
+    """Estado serializable, para replicarlo en procesos hijos con aplicar_configuracion."""
+    return {"activa": _activa, "maxsize": {n: m.maxsize for n, m in _REGISTRO.items()}}
+
+def aplicar_configuracion(conf):
+    configurar_cache(activa=conf["activa"], maxsize=conf["maxsize"])
+
+def cache_activa():
+    return _activa
+
+def estadisticas_cache():
+    return {nombre: m.info() for nombre, m in _REGISTRO.items()}
+
+def limpiar_cache():
+    for m in _REGISTRO.values():
+        m.limpiar()
@@ -0,0 +1,58 @@
+# citador/memoria.py
+# Memoria de una sesión de la UI: tamaño "profundo" de los valores de
+# st.session_state (cada objeto y todo lo que alcanza, con sys.getsizeof), para
+# el panel de depuración y para benchmarks/carga_sesiones.py.
+#
+# Cada objeto se cuenta una vez por medición. No se entra en clases, módulos
+# ni funciones, que son del proceso. Lo que la sesión comparte con el resto
+# del proceso (cadenas internadas, registros que también están en la caché de
+# renderizar) se cuenta igual, así que el resultado es una cota superior de
+# lo que se liberaría al cerrar la sesión.
+import sys
+import types
+from collections import deque
+
+_NO_CONTAR = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+_HOJAS = (str, bytes, bytearray, int, float, complex, bool, type(None))
+_SECUENCIAS = (list, tuple, set, frozenset, deque)
+
+
+def _slots(cls):
+    for c in cls.__mro__:
+        s = c.__dict__.get("__slots__", ())
+        yield from (s,) if isinstance(s, str) else s
+
+def tamaño(obj, vistos=None):
+    """
+    Bytes de obj y de todo lo que alcanza. `vistos` (set de ids) permite medir
+    varios objetos sin contar dos veces lo que comparten.
+    """
+    vistos = set() if vistos is None else vistos
+    total, pendientes = 0, [obj]
+    while pendientes:
+        o = pendientes.pop()
+        if id(o) in vistos or isinstance(o, _NO_CONTAR):
+            continue
+        vistos.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, _HOJAS):
+            continue
+        if isinstance(o, dict):
+            pendientes.extend(o.keys())
+            pendientes.extend(o.values())
+        elif isinstance(o, _SECUENCIAS):
+            pendientes.extend(o)
+        atributos = getattr(o, "__dict__", None)
+        if isinstance(atributos, dict):
+            pendientes.append(atributos)
+        pendientes.extend(getattr(o, s) for s in _slots(type(o))
+                          if s not in ("__dict__", "__weakref__") and hasattr(o, s))
+    return total
+
+def por_clave(estado):
+    """
+    [(clave, bytes)] de un dict como st.session_state.to_dict(), de mayor a
+    menor. Cada clave se mide por separado: lo que comparten dos claves cuenta
+    en ambas, y el total de la sesión es tamaño(estado).
+    """
+    return sorted(((k, tamaño(v)) for k, v in estado.items()), key=lambda kv: -kv[1])
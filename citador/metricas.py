@@ -0,0 +1,214 @@
+# citador/metricas.py
+# Métricas de uso y tiempos del motor: cuántas referencias se generan por tipo
+# de fuente, cuánto tarda cada generador y cita_abreviada, y las fases de la
+# UI y de la API. Se leen con resumen() o se exportan en formato de texto de
+# Prometheus (a_prometheus / escribir_prometheus).
+#
+# Apagadas no cuestan nada: core.py no sabe de este módulo. activar() reemplaza
+# las entradas de TIPOS_RUNS y las funciones de core por envoltorios que miden,
+# y desactivar() vuelve a poner las originales. Con la variable de entorno
+# CITADOR_METRICAS=1 quedan activas apenas se importa este módulo (la UI y la
+# CLI lo importan).
+#
+# Son del proceso, no de la sesión: con --procesos > 1 cada proceso del pool
+# tiene las suyas y no se suman.
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Límites superiores (segundos) de los buckets del histograma
+BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3, 1e-2, 0.1, 1.0)
+
+# nombre -> descripción (para # HELP)
+DESCRIPCIONES = {
+    "generar": "Generación de la referencia (runs) por tipo de fuente",
+    "cita_abreviada": "Cita abreviada de los tipos que no la traen del generador",
+    "ui_generar": "Botón 'Generar cita' de la UI, de punta a punta",
+    "ui_historial": "Construcción de la página visible del historial en la UI",
+    "api_formatear": "Petición POST /formatear de la API, de punta a punta",
+    "api_cita_abreviada": "Petición POST /cita_abreviada de la API",
+    "api_lotes": "Petición POST /lotes de la API, hasta la última línea",
+    "api_salud": "Petición GET /salud de la API",
+    "api_tipos": "Petición GET /tipos de la API",
+    "api_metricas": "Petición GET /metricas de la API",
+    "api_desconocida": "Peticiones a rutas que no existen",
+}
+
+_lock = threading.Lock()
+_tiempos = {}       # (nombre, tipo) -> [llamadas, suma, máximo, buckets...]
+_errores = {}       # (nombre, tipo) -> cantidad
+_originales = {}    # punto instrumentado -> función original
+_activas = False
+
+
+# ---------------- Registro ----------------
+def observar(nombre, segundos, tipo=""):
+    """Suma una observación de duración."""
+    clave = (nombre, tipo)
+    with _lock:
+        t = _tiempos.get(clave)
+        if t is None:
+            t = _tiempos[clave] = [0, 0.0, 0.0] + [0] * (len(BUCKETS) + 1)
+        t[0] += 1
+        t[1] += segundos
+        if segundos > t[2]:
+            t[2] = segundos
+        t[3 + bisect.bisect_left(BUCKETS, segundos)] += 1
+
+def contar_error(nombre, tipo=""):
+    clave = (nombre, tipo)
+    with _lock:
+        _errores[clave] = _errores.get(clave, 0) + 1
+
+class _Nulo:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULO = _Nulo()
+
+@contextmanager
+def _medido(nombre, tipo):
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        contar_error(nombre, tipo)
+        raise
+    finally:
+        observar(nombre, time.perf_counter() - t0, tipo)
+
+def medir(nombre, tipo=""):
+    """Context manager que mide un bloque; con las métricas apagadas no hace nada."""
+    return _medido(nombre, tipo) if _activas else _NULO
+
+def limpiar():
+    with _lock:
+        _tiempos.clear()
+        _errores.clear()
+
+
+# ---------------- Instrumentación ----------------
+def _envolver(fn, nombre, tipo):
+    reloj = time.perf_counter
+
+    def medida(*args, **kwargs):
+        t0 = reloj()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            contar_error(nombre, tipo)
+            raise
+        finally:
+            observar(nombre, reloj() - t0, tipo)
+    medida.__wrapped__ = fn
+    return medida
+
+def _envolver_cita(fn):
+    # La etiqueta es el tipo de fuente, que llega como keyword
+    def medida(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            observar("cita_abreviada", time.perf_counter() - t0, kwargs.get("tipo") or "")
+    medida.__wrapped__ = fn
+    return medida
+
+def activas():
+    return _activas
+
+def activar(activa=True):
+    """Enciende (o con False apaga) la instrumentación del motor."""
+    global _activas
+    from . import core
+
+    with _lock:
+        if activa and not _activas:
+            for tipo, gen in core.TIPOS_RUNS.items():
+                _originales[("TIPOS_RUNS", tipo)] = gen
+                core.TIPOS_RUNS[tipo] = _envolver(gen, "generar", tipo)
+            _originales[("core", "cita_abreviada")] = core.cita_abreviada
+            core.cita_abreviada = _envolver_cita(core.cita_abreviada)
+        elif not activa and _activas:
+            for (donde, nombre), fn in _originales.items():
+                if donde == "TIPOS_RUNS":
+                    core.TIPOS_RUNS[nombre] = fn
+                else:
+                    setattr(core, nombre, fn)
+            _originales.clear()
+        _activas = bool(activa)
+
+def desactivar():
+    activar(False)
+
+
+# ---------------- Lectura y exportación ----------------
+def resumen():
+    """Lista de dicts por (nombre, tipo), de más a menos tiempo total."""
+    with _lock:
+        tiempos = {k: list(v) for k, v in _tiempos.items()}
+        errores = dict(_errores)
+    filas = []
+    for (nombre, tipo), t in tiempos.items():
+        filas.append({
+            "métrica": nombre, "tipo": tipo, "llamadas": t[0], "errores": errores.get((nombre, tipo), 0),
+            "total_ms": round(t[1] * 1000, 3), "media_us": round(t[1] / t[0] * 1e6, 1) if t[0] else 0.0,
+            "máx_us": round(t[2] * 1e6, 1),
+        })
+    filas.sort(key=lambda f: -f["total_ms"])
+    return filas
+
+def _etiqueta(tipo):
+    return tipo.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _numero(x):
+    return repr(float(x)) if isinstance(x, float) else str(x)
+
+def a_prometheus(prefijo="citador"):
+    """Todas las métricas en el formato de texto de Prometheus (histogramas + contadores de errores)."""
+    with _lock:
+        tiempos = sorted((k, list(v)) for k, v in _tiempos.items())
+        errores = sorted(_errores.items())
+    lineas = []
+    anterior = None
+    for (nombre, tipo), t in tiempos:
+        metrica = f"{prefijo}_{nombre}_segundos"
+        if nombre != anterior:
+            lineas.append(f"# HELP {metrica} {DESCRIPCIONES.get(nombre, nombre)}")
+            lineas.append(f"# TYPE {metrica} histogram")
+            anterior = nombre
+        etiqueta = f'tipo="{_etiqueta(tipo)}",' if tipo else ""
+        acumulado = 0
+        for limite, n in zip(BUCKETS + ("+Inf",), t[3:]):
+            acumulado += n
+            le = limite if isinstance(limite, str) else repr(limite)
+            lineas.append(f'{metrica}_bucket{{{etiqueta}le="{le}"}} {acumulado}')
+        sel = f"{{{etiqueta[:-1]}}}" if etiqueta else ""
+        lineas.append(f"{metrica}_sum{sel} {_numero(t[1])}")
+        lineas.append(f"{metrica}_count{sel} {t[0]}")
+    anterior = None
+    for (nombre, tipo), n in errores:
+        metrica = f"{prefijo}_{nombre}_errores_total"
+        if nombre != anterior:
+            lineas.append(f"# HELP {metrica} Llamadas que terminaron en excepción")
+            lineas.append(f"# TYPE {metrica} counter")
+            anterior = nombre
+        sel = f'{{tipo="{_etiqueta(tipo)}"}}' if tipo else ""
+        lineas.append(f"{metrica}{sel} {n}")
+    return "\n".join(lineas) + "\n" if lineas else ""
+
+def escribir_prometheus(ruta, prefijo="citador"):
+    """Escribe a_prometheus() en ruta de forma atómica (para el textfile collector de node_exporter)."""
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(a_prometheus(prefijo))
+    os.replace(tmp, ruta)
+
+
+if os.environ.get("CITADOR_METRICAS", "0").strip().lower() in ("1", "true", "si", "sí", "yes"):
+    activar()
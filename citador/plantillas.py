@@ -0,0 +1,359 @@
+# citador/plantillas.py
+# Plantillas declarativas de referencias, compiladas una sola vez a funciones
+# Python (generación de código + compile) que arman los runs directamente.
+#
+# Sintaxis de una plantilla:
+#
+#   texto           se copia tal cual (\ escapa { } [ ] | * y \)
+#   {campo}         valor del campo del registro
+#   {campo|filtro}  valor pasado por un filtro (se pueden encadenar: |a|b)
+#   {a/b}           el primer campo no vacío (a si a tiene valor, si no b);
+#                   cada alternativa lleva sus propios filtros
+#   {a, b, c}       los valores no vacíos unidos con ", "
+#   [ ... ]         grupo opcional: sale solo si todos los campos que tiene
+#                   directamente (no en grupos internos) tienen valor
+#   [ ... | ... ]   grupo con alternativa para cuando no sale
+#   [?{expr}: ...]  grupo con condición explícita (una expresión de campo)
+#   *...*           cursiva; todo lo demás va en estilo normal
+#
+# Los filtros "de runs" (autores) devuelven una lista de runs con sus propios
+# estilos; solo pueden ir sueltos, fuera de grupos y cursivas.
+#
+# Con `precalculados`, un filtro de esa lista aplicado directamente a un campo
+# no se llama: se lee el valor ya calculado del registro, d.campo__filtro
+# (el modo columnar calcula esos valores por columna, ver columnar.py).
+from .render import CURSIVA, NORMAL
+
+
+class ErrorPlantilla(ValueError):
+    pass
+
+
+# ---------------- Parser ----------------
+# Nodos: ("texto", s), ("campo", campo), ("grupo", condicion, si, sino),
+# ("cursiva", secuencia). Un campo es una tupla de alternativas por cada
+# parte unida con ", "; cada alternativa es (nombre, filtros).
+def _parsear_campo(fuente, s):
+    partes = []
+    for parte in s.split(","):
+        alternativas = []
+        for alt in parte.split("/"):
+            nombre, *filtros = [x.strip() for x in alt.split("|")]
+            if not nombre.isidentifier() or not all(f.isidentifier() for f in filtros):
+                raise ErrorPlantilla(f"campo inválido {{{s}}} en {fuente!r}")
+            alternativas.append((nombre, tuple(filtros)))
+        partes.append(tuple(alternativas))
+    return tuple(partes)
+
+def _secuencia(f, i, cierres, en_cursiva):
+    nodos, texto = [], []
+    while i < len(f):
+        c = f[i]
+        if c in cierres:
+            break
+        if c == "\\":
+            if i + 1 == len(f):
+                raise ErrorPlantilla(f"\\ al final de {f!r}")
+            texto.append(f[i + 1])
+            i += 2
+            continue
+        if c not in "{[*":
+            if c in "}]|":
+                raise ErrorPlantilla(f"'{c}' inesperado en la posición {i} de {f!r}")
+            texto.append(c)
+            i += 1
+            continue
+        if texto:
+            nodos.append(("texto", "".join(texto)))
+            texto = []
+        if c == "{":
+            j = f.find("}", i)
+            if j < 0:
+                raise ErrorPlantilla(f"falta '}}' en {f!r}")
+            nodos.append(("campo", _parsear_campo(f, f[i + 1:j])))
+            i = j + 1
+        elif c == "[":
+            i += 1
+            condicion = None
+            if f.startswith("?{", i):
+                j = f.find("}", i)
+                if j < 0 or f[j + 1:j + 2] != ":":
+                    raise ErrorPlantilla(f"condición mal cerrada en {f!r}")
+                condicion = _parsear_campo(f, f[i + 2:j])
+                i = j + 2
+            si, i = _secuencia(f, i, "|]", en_cursiva)
+            sino = None
+            if f[i:i + 1] == "|":
+                sino, i = _secuencia(f, i + 1, "]", en_cursiva)
+            if f[i:i + 1] != "]":
+                raise ErrorPlantilla(f"falta ']' en {f!r}")
+            nodos.append(("grupo", condicion, si, sino))
+            i += 1
+        else:
+            if en_cursiva:
+                raise ErrorPlantilla(f"cursiva anidada en {f!r}")
+            seq, i = _secuencia(f, i + 1, "*", True)
+            if f[i:i + 1] != "*":
+                raise ErrorPlantilla(f"falta '*' de cierre en {f!r}")
+            nodos.append(("cursiva", seq))
+            i += 1
+    if texto:
+        nodos.append(("texto", "".join(texto)))
+    return nodos, i
+
+def parsear(fuente):
+    nodos, i = _secuencia(fuente, 0, "", False)
+    if i != len(fuente):
+        raise ErrorPlantilla(f"'{fuente[i]}' inesperado en la posición {i} de {fuente!r}")
+    return nodos
+
+
+# ---------------- Generación de código ----------------
+def _fstring(partes):
+    """partes: [("lit", s) | ("var", nombre)] -> expresión Python que las concatena."""
+    if not partes:
+        return "''"
+    if len(partes) == 1:
+        tipo, valor = partes[0]
+        return repr(valor) if tipo == "lit" else valor
+    s = "".join(v.replace("{", "{{").replace("}", "}}") if t == "lit" else "{" + v + "}" for t, v in partes)
+    return "f" + repr(s)
+
+def _campos_directos(secuencia):
+    for nodo in secuencia:
+        if nodo[0] == "campo":
+            yield nodo[1]
+        elif nodo[0] == "cursiva":
+            yield from _campos_directos(nodo[1])
+
+def campos_obligatorios(fuente):
+    """
+    Campos que la plantilla muestra fuera de grupos opcionales: si están
+    vacíos queda un hueco ("()", "(trad. , , )"). Una tupla de nombres por
+    campo; {a/b} y {a, b} se cumplen con cualquiera de ellos.
+    """
+    return tuple(dict.fromkeys(tuple(dict.fromkeys(nombre for parte in campo for nombre, _ in parte))
+                               for campo in _campos_directos(parsear(fuente))))
+
+
+class _Compilador:
+    def __init__(self, filtros, filtros_runs, precalculados=()):
+        self.filtros = filtros
+        self.filtros_runs = filtros_runs
+        self.precalculados = frozenset(precalculados)
+        self.leidos = set()     # (campo, filtro) que se leen ya calculados
+        self.globales = {"NORMAL": NORMAL, "CURSIVA": CURSIVA}
+        self.previas = []       # asignaciones de campos y grupos, al comienzo de la función
+        self.cuerpo = []
+        self.variables = {}
+        self.alternativas = {}
+        self.usa_umbral = False
+        self.runs_iniciados = False
+
+    # Campos -----------------------------------------------------------
+    def _es_runs(self, campo):
+        return any(filtros and filtros[-1] in self.filtros_runs for alts in campo for _, filtros in alts)
+
+    def _expr_alternativa(self, nombre, filtros, base=None):
+        e = base or f"d.{nombre}"
+        for k, f in enumerate(filtros):
+            if k == 0 and base is None and f in self.precalculados:
+                if f in self.filtros_runs and len(filtros) > 1:
+                    raise ErrorPlantilla(f"el filtro de runs '{f}' tiene que ser el último")
+                self.leidos.add((nombre, f))
+                e = f"d.{nombre}__{f}"
+            elif f in self.filtros_runs:
+                if k != len(filtros) - 1:
+                    raise ErrorPlantilla(f"el filtro de runs '{f}' tiene que ser el último")
+                self.globales[f"_f_{f}"] = self.filtros_runs[f]
+                e = f"_f_{f}({e}, umbral)"
+                self.usa_umbral = True
+            elif f in self.filtros:
+                self.globales[f"_f_{f}"] = self.filtros[f]
+                e = f"_f_{f}({e})"
+            else:
+                raise ErrorPlantilla(f"filtro desconocido: {f}")
+        return e
+
+    def _alternativa(self, nombre, filtros):
+        """
+        Alternativa con filtros que no es la última de su campo: variable
+        propia, calculada solo si el campo tiene valor ('' si no), que se
+        comparte con las demás alternativas iguales o que la extienden
+        ({autores|autores_texto} y {autores|autores_texto|versalitas}).
+        """
+        if not filtros:
+            return f"d.{nombre}"
+        if (nombre, filtros) not in self.alternativas:
+            base, resto = None, filtros
+            for k in range(len(filtros) - 1, 0, -1):
+                if (nombre, filtros[:k]) in self.alternativas:
+                    base, resto = self.alternativas[(nombre, filtros[:k])], filtros[k:]
+                    break
+            variable = f"_a{len(self.alternativas)}"
+            self.previas.append(f"{variable} = {self._expr_alternativa(nombre, resto, base)} if d.{nombre} else ''")
+            self.alternativas[(nombre, filtros)] = variable
+        return self.alternativas[(nombre, filtros)]
+
+    def _expr_campo(self, campo):
+        if len(campo) > 1:
+            # Cada parte es un campo por sí mismo, así se comparte si aparece suelto
+            partes = [self.variable((alternativas,)) for alternativas in campo]
+            if len(partes) == 2:
+                a, b = partes
+                return f"(f'{{{a}}}, {{{b}}}' if {b} else {a}) if {a} else {b}"
+            return f"', '.join(filter(None, ({', '.join(partes)})))"
+        *primeras, (nombre, filtros) = campo[0]
+        e = self._expr_alternativa(nombre, filtros)
+        for nombre, filtros in reversed(primeras):
+            e = f"{self._alternativa(nombre, filtros)} if d.{nombre} else {e}"
+        return e
+
+    def variable(self, campo):
+        """Expresión de un campo: d.campo si es directo; si no, una variable local calculada al comienzo."""
+        if len(campo) == 1 and len(campo[0]) == 1 and not campo[0][0][1]:
+            return f"d.{campo[0][0][0]}"
+        if campo not in self.variables:
+            expr = self._expr_campo(campo)      # primero: puede registrar sus partes
+            nombre = f"_c{len(self.variables)}"
+            self.previas.append(f"{nombre} = {expr}")
+            self.variables[campo] = nombre
+        return self.variables[campo]
+
+    # Texto plano (sin estilos) -----------------------------------------
+    def _es_plano(self, secuencia):
+        for nodo in secuencia:
+            if nodo[0] == "cursiva" or (nodo[0] == "campo" and self._es_runs(nodo[1])):
+                return False
+            if nodo[0] == "grupo" and not (self._es_plano(nodo[2]) and self._es_plano(nodo[3] or ())):
+                return False
+        return True
+
+    def condicion(self, nodo):
+        _, condicion, si, _ = nodo
+        if condicion is not None:
+            return self.variable(condicion)
+        campos = list(dict.fromkeys(_campos_directos(si)))
+        if not campos:
+            raise ErrorPlantilla("grupo sin campos: usar [?{campo}: ...]")
+        return " and ".join(self.variable(c) for c in campos)
+
+    def cadena(self, secuencia):
+        """Expresión Python del texto de una secuencia sin estilos."""
+        partes = []
+        for nodo in secuencia:
+            if nodo[0] == "texto":
+                partes.append(("lit", nodo[1]))
+            elif nodo[0] == "campo":
+                if self._es_runs(nodo[1]):
+                    raise ErrorPlantilla("los filtros de runs no van dentro de grupos ni cursivas")
+                partes.append(("var", self.variable(nodo[1])))
+            elif nodo[0] == "grupo":
+                partes.append(("grupo", self._grupo_plano(nodo)))
+            else:
+                raise ErrorPlantilla("cursiva anidada")
+        return self._unir(partes)
+
+    def _unir(self, partes):
+        if not any(t == "grupo" for t, _ in partes):
+            return _fstring(partes)
+        # Con grupos: concatenación, para que cada grupo se evalúe solo si hace falta
+        return " + ".join(repr(v) if t == "lit" else v for t, v in partes if v)
+
+    def _grupo_plano(self, nodo):
+        c = self.condicion(nodo)
+        si = self.cadena(nodo[2])
+        sino = self.cadena(nodo[3]) if nodo[3] is not None else "''"
+        return f"({si} if {c} else {sino})"
+
+    # Runs ----------------------------------------------------------------
+    def _linea(self, sangria, s):
+        self.cuerpo.append("    " * sangria + s)
+
+    def runs(self, secuencia, sangria):
+        pendientes = []
+
+        def volcar():
+            if pendientes:
+                self._agregar(sangria, f"({self._unir(pendientes)}, NORMAL)")
+                pendientes.clear()
+
+        for nodo in secuencia:
+            if nodo[0] == "texto":
+                pendientes.append(("lit", nodo[1]))
+            elif nodo[0] == "campo":
+                if self._es_runs(nodo[1]):
+                    volcar()
+                    v = self.variable(nodo[1])
+                    if not self.runs_iniciados and sangria == 1:
+                        # Los filtros de runs devuelven una lista nueva: se usa tal cual
+                        self._linea(sangria, f"runs = {v}")
+                        self.runs_iniciados = True
+                    else:
+                        self._iniciar(sangria)
+                        self._linea(sangria, f"runs.extend({v})")
+                else:
+                    pendientes.append(("var", self.variable(nodo[1])))
+            elif nodo[0] == "cursiva":
+                volcar()
+                self._agregar(sangria, f"({self.cadena(nodo[1])}, CURSIVA)")
+            elif self._es_plano([nodo]):
+                pendientes.append(("grupo", self._grupo_plano(nodo)))
+            else:
+                volcar()
+                self._iniciar(sangria)
+                self._linea(sangria, f"if {self.condicion(nodo)}:")
+                self._bloque(nodo[2], sangria + 1)
+                if nodo[3] is not None:
+                    self._linea(sangria, "else:")
+                    self._bloque(nodo[3], sangria + 1)
+        volcar()
+
+    def _bloque(self, secuencia, sangria):
+        n = len(self.cuerpo)
+        self.runs(secuencia, sangria)
+        if len(self.cuerpo) == n:
+            self._linea(sangria, "pass")
+
+    def _iniciar(self, sangria):
+        if not self.runs_iniciados:
+            self.cuerpo.insert(0, "    runs = []")
+            self.runs_iniciados = True
+
+    def _agregar(self, sangria, run):
+        if not self.runs_iniciados and sangria == 1:
+            self._linea(sangria, f"runs = [{run}]")
+            self.runs_iniciados = True
+            return
+        self._iniciar(sangria)
+        self._linea(sangria, f"runs.append({run})")
+
+
+def compilar(nombre, referencia, cita=None, filtros=None, filtros_runs=None, precalculados=()):
+    """
+    Compila la plantilla de una referencia (y, si se da, la de su cita
+    abreviada) a una función f(registro, config) que devuelve runs, o
+    (runs, cita). filtros son funciones str -> str; filtros_runs, funciones
+    (valor, y_otros_threshold) -> lista nueva de runs. La función lleva en
+    .precalculados los pares (campo, filtro) que lee ya calculados.
+    """
+    comp = _Compilador(filtros or {}, filtros_runs or {}, precalculados)
+    comp.runs(parsear(referencia), 1)
+    comp._iniciar(1)
+    retorno = "runs"
+    if cita is not None:
+        retorno = f"runs, {comp.cadena(parsear(cita))}"
+    lineas = [f"def {nombre}(d, config):"]
+    if comp.usa_umbral:
+        lineas.append("    umbral = config['y_otros_threshold']")
+    lineas += ["    " + s for s in comp.previas]
+    lineas += comp.cuerpo
+    lineas.append(f"    return {retorno}")
+    fuente = "\n".join(lineas) + "\n"
+    espacio = dict(comp.globales)
+    exec(compile(fuente, f"<plantilla {nombre}>", "exec"), espacio)
+    fn = espacio[nombre]
+    fn.fuente = fuente
+    fn.plantilla = referencia
+    fn.precalculados = frozenset(comp.leidos)
+    return fn
@@ -0,0 +1,254 @@
+# citador/registros.py
+# Registro de esquemas: una definición de campos por cada tipo de TIPOS, que
+# comparten el cargador por lotes, los formularios de la UI y los generadores.
+# De cada esquema sale una clase con __slots__ cuyos campos se normalizan
+# (strip, autores como tuplas) una sola vez, al construir el registro.
+from collections import namedtuple
+
+Campo = namedtuple("Campo", "nombre etiqueta tipo por_defecto solo_sin_autores",
+                   defaults=("texto", "", False))
+
+
+class Autor(namedtuple("Autor", "apellido1 apellido2 nombre")):
+    """Autor inmutable y hashable; sirve directamente como clave de caché."""
+    __slots__ = ()
+
+    @classmethod
+    def desde(cls, a):
+        if isinstance(a, Autor):
+            return a
+        return cls(_texto(a.get('apellido1')), _texto(a.get('apellido2')), _texto(a.get('nombre')))
+
+    def get(self, campo, default=""):
+        # Compatibilidad con el código que recibe autores como dict
+        return getattr(self, campo, default)
+
+    def a_dict(self):
+        return dict(self._asdict())
+
+
+def _texto(valor):
+    return "" if valor is None else str(valor).strip()
+
+
+class Registro:
+    """
+    Base de los registros tipados. Las subclases se crean con _crear_clase a
+    partir del esquema; cada una tiene un slot por campo.
+    """
+    __slots__ = ()
+    tipo_fuente = None   # clave de TIPOS ("tipo" es un campo de Decreto / Oficio)
+    campos = ()
+
+    def __init__(self, **valores):
+        for c in self.campos:
+            v = valores.get(c.nombre, c.por_defecto)
+            if c.tipo == "autores":
+                v = tuple(Autor.desde(a) for a in v) if v else ()
+            else:
+                v = _texto(v)
+            object.__setattr__(self, c.nombre, v)
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def get(self, campo, default=""):
+        # Misma interfaz que el dict de datos de la UI
+        return getattr(self, campo, default)
+
+    def a_dict(self):
+        d = {}
+        for c in self.campos:
+            v = getattr(self, c.nombre)
+            d[c.nombre] = [a.a_dict() for a in v] if c.tipo == "autores" else v
+        return d
+
+    def __reduce__(self):
+        # Las clases se crean dinámicamente: se serializa por tipo y campos
+        return (como_registro, (self.tipo_fuente, self.a_dict()))
+
+    def __eq__(self, otro):
+        return type(self) is type(otro) and all(
+            getattr(self, c.nombre) == getattr(otro, c.nombre) for c in self.campos)
+
+    def __hash__(self):
+        return hash((self.tipo_fuente,) + tuple(getattr(self, c.nombre) for c in self.campos))
+
+    def __repr__(self):
+        pares = ", ".join(f"{c.nombre}={getattr(self, c.nombre)!r}" for c in self.campos)
+        return f"{type(self).__name__}({pares})"
+
+
+# ---------------- Esquemas por tipo ----------------
+_AUTORES = Campo("autores", "Autores", "autores")
+_PAIS = Campo("pais", "País (ej: Chile)", por_defecto="Chile")
+
+ESQUEMAS = {
+    "Libro": ("Libro", (
+        _AUTORES,
+        Campo("año", "Año de publicación"),
+        Campo("titulo", "Título del libro"),
+        Campo("ciudad", "Ciudad de publicación (opcional)"),
+        Campo("editorial", "Editorial (ej: Editorial LexisNexis)"),
+        Campo("edicion", "Número de edición (opcional, p.ej. Segunda)"),
+        Campo("tomo", "Tomo o volumen (opcional, p.ej. '1' o 'Tomo I')"),
+        Campo("paginas", "Páginas (opcional para cita abreviada, ej. 45-47)"),
+    )),
+    "Traducción de libro": ("TraduccionLibro", (
+        _AUTORES,
+        Campo("año_original", "Año original"),
+        Campo("año", "Año de publicación"),
+        Campo("titulo", "Título"),
+        Campo("traductor", "Traductor"),
+        Campo("ciudad", "Ciudad"),
+        Campo("editorial", "Editorial (ej: Editorial LexisNexis)"),
+    )),
+    "Capítulo de libro": ("CapituloLibro", (
+        _AUTORES,
+        Campo("autor_capitulo", "Número de autores del capítulo", "autores"),
+        Campo("editores", "Número de editores", "autores"),
+        Campo("año", "Año"),
+        Campo("titulo_capitulo", "Título del capítulo"),
+        Campo("titulo_libro", "Título del libro"),
+        Campo("ciudad", "Ciudad"),
+        Campo("editorial", "Editorial (ej: Editorial LexisNexis)"),
+        Campo("paginas", "Páginas (ej. 101-146)"),
+    )),
+    "Artículo de revista": ("ArticuloRevista", (
+        _AUTORES,
+        Campo("año", "Año"),
+        Campo("titulo", "Título del artículo (sin cursivas)"),
+        Campo("revista", "Nombre de la revista (saldrá en cursiva)"),
+        Campo("volumen", "Volumen (opcional)"),
+        Campo("numero", "Número (opcional)"),
+        Campo("paginas", "Páginas (opcional)"),
+        Campo("doi", "DOI (opcional)"),
+        Campo("url", "URL (si es versión web)"),
+    )),
+    "Norma": ("Norma", (
+        _PAIS,
+        Campo("tipo_norma", "Tipo de norma (ej: Constitución Política de la República / Ley / Código / Decreto Supremo)"),
+        Campo("numero", "Número (ej: 18.575, 21.171) — dejar vacío si no aplica"),
+        Campo("nombre_norma", "Nombre o denominación legal (si aplica)"),
+        Campo("organismo", "Ministerio u órgano (opcional, ej: Ministerio de Salud)"),
+        Campo("año", "Año (opcional)"),
+    )),
+    "Decreto / Oficio / Reglamento": ("DecretoOficio", (
+        _PAIS,
+        Campo("organismo", "Ministerio u organismo (opcional, ej: Ministerio del Interior)"),
+        Campo("tipo", "Tipo (ej: Decreto, Reglamento, Oficio, Circular)"),
+        Campo("numero", "Número (ej: 1.234)"),
+        Campo("titulo", "Título o descripción (en cursiva)"),
+        Campo("año", "Año (opcional)"),
+    )),
+    "Proyecto de ley": ("ProyectoLey", (
+        _PAIS,
+        Campo("nombre", "Nombre del proyecto (en cursiva)"),
+        Campo("boletin", "Boletín N° (ej: 12.345-04)"),
+        Campo("año", "Año (opcional)"),
+    )),
+    "Historia de la ley": ("HistoriaLey", (
+        _PAIS,
+        Campo("numero", "Número de ley (ej: 21.400)"),
+        Campo("titulo", "Título o descripción (opcional, en cursiva)"),
+        Campo("año", "Año (opcional)"),
+    )),
+    "Documento internacional (ONU, OEA, etc.)": ("DocumentoInternacional", (
+        Campo("organismo", "Organismo internacional (ej: Organización de las Naciones Unidas)"),
+        Campo("titulo", "Título del documento (en cursiva)"),
+        Campo("año", "Año (opcional)"),
+    )),
+    "Instrumento emanado de congreso / conferencia": ("InstrumentoConferencia", (
+        Campo("nombre", "Nombre del instrumento (en cursiva, ej: Declaración de Río sobre Medio Ambiente y Desarrollo)"),
+        Campo("conferencia", "Congreso o conferencia (opcional, ej: Conferencia de las Naciones Unidas sobre Medio Ambiente y Desarrollo)"),
+        Campo("año", "Año (opcional)"),
+    )),
+    "Jurisprudencia": ("Jurisprudencia", (
+        Campo("estado", "Estado / País (opcional, ej: Chile)"),
+        Campo("tribunal", "Tribunal (ej: Corte Suprema)"),
+        Campo("año", "Año (opcional)"),
+        Campo("fecha", "Fecha completa (opcional)"),
+        Campo("rol", "Rol / RIT / RUC (opcional)"),
+        Campo("nombre_caso", "Nombre del caso (opcional)"),
+        Campo("info_extra", "Info extra (ej: 'protección', tomo, revista)"),
+        Campo("fuente", "Fuente / base de datos / URL (opcional)"),
+    )),
+    "Jurisprudencia internacional": ("JurisprudenciaInternacional", (
+        Campo("tribunal", "Tribunal internacional (ej: Corte Interamericana de DD.HH.)"),
+        Campo("nombre_caso", "Nombre del caso (ej: Velásquez Rodríguez vs. Honduras)"),
+        Campo("fecha", "Fecha (opcional)"),
+        Campo("serie", "Serie / número (opcional)"),
+    )),
+    "Página web o blog": ("Web", (
+        _AUTORES,
+        Campo("autor_sin_autor", "Autor o entidad (si no hay autores) — ej: TRIBUNAL CONSTITUCIONAL",
+              solo_sin_autores=True),
+        Campo("año", "Año (o año del sitio, si aplica)"),
+        Campo("titulo", "Título de la página / entrada"),
+        Campo("url", "URL"),
+        Campo("fecha_consulta", "Fecha de consulta (opcional)"),
+    )),
+    "Tesis": ("Tesis", (
+        _AUTORES,
+        Campo("año", "Año"),
+        Campo("titulo", "Título"),
+        Campo("grado", "Grado (ej: Licenciado)"),
+        Campo("institucion", "Institución (ej: Facultad de Leyes y Ciencias Políticas de la Universidad de Chile)"),
+        Campo("paginas", "Páginas (opcional para abreviada)"),
+    )),
+}
+
+
+def _crear_clase(nombre_clase, tipo, campos):
+    return type(nombre_clase, (Registro,), {
+        "__slots__": tuple(c.nombre for c in campos),
+        "tipo_fuente": tipo,
+        "campos": campos,
+    })
+
+CLASES = {tipo: _crear_clase(nombre, tipo, campos) for tipo, (nombre, campos) in ESQUEMAS.items()}
+
+
+# Campo que hace de "título" y de "autor" para búsquedas y comparaciones,
+# por orden de preferencia. Los tipos sin autores caen al organismo o tribunal.
+_CAMPOS_TITULO = ("titulo", "titulo_capitulo", "titulo_libro", "nombre_norma", "nombre", "nombre_caso")
+_CAMPOS_AUTORES = ("autores", "autor_capitulo", "editores")
+_CAMPOS_ENTIDAD = ("autor_sin_autor", "organismo", "tribunal")
+
+def titulo_principal(registro):
+    for campo in _CAMPOS_TITULO:
+        v = registro.get(campo)
+        if v:
+            return v
+    return ""
+
+def primer_autor(registro):
+    """Primer Autor con datos (de autores, autor_capitulo o editores), o None."""
+    for campo in _CAMPOS_AUTORES:
+        for a in registro.get(campo, ()):
+            if a.apellido1 or a.nombre:
+                return a
+    return None
+
+def primer_apellido(registro):
+    """apellido1 del primer autor; si no hay autores, la entidad responsable."""
+    a = primer_autor(registro)
+    if a is not None:
+        return a.apellido1
+    for campo in _CAMPOS_ENTIDAD:
+        v = registro.get(campo)
+        if v:
+            return v
+    return ""
+
+def campos_de(tipo):
+    return CLASES[tipo].campos
+
+def campos_autores(tipo):
+    return tuple(c.nombre for c in CLASES[tipo].campos if c.tipo == "autores")
+
+def como_registro(tipo, datos):
+    """Devuelve datos como registro tipado; no copia si ya lo es."""
+    if isinstance(datos, Registro):
+        return datos
+    return CLASES[tipo](**datos)
@@ -0,0 +1,34 @@
+# citador/render.py
+# Representación intermedia de una referencia: una lista de runs
+# (texto, estilo). Los generadores arman los runs una sola vez y cada salida
+# (HTML, texto plano, Markdown, y los exportadores) los recorre sin volver a
+# parsear marcas.
+NORMAL = 0
+CURSIVA = 1
+# El texto de un run VERSALITAS viene con la capitalización de la fuente
+# ("Pérez", "CORTE IDH", "McDonald"). Las salidas sin versalitas reales lo
+# pasan a mayúsculas; los exportadores (exportar.py) lo dejan al formato.
+VERSALITAS = 2
+
+_HTML_ABRE = {NORMAL: "", CURSIVA: "<i>", VERSALITAS: "<span style='font-variant: small-caps'>"}
+_HTML_CIERRA = {NORMAL: "", CURSIVA: "</i>", VERSALITAS: "</span>"}
+
+
+def a_html(runs):
+    return "".join(
+        texto if estilo == NORMAL
+        else f"{_HTML_ABRE[estilo]}{texto.upper() if estilo == VERSALITAS else texto}{_HTML_CIERRA[estilo]}"
+        for texto, estilo in runs
+    )
+
+def a_texto(runs):
+    return "".join([texto.upper() if estilo == VERSALITAS else texto for texto, estilo in runs])
+
+def a_markdown(runs):
+    # Markdown no tiene versalitas: quedan en mayúsculas, como en texto plano
+    return "".join([
+        f"*{texto}*" if estilo == CURSIVA and texto else texto.upper() if estilo == VERSALITAS else texto
+        for texto, estilo in runs
+    ])
+
+RENDERERS = {"html": a_html, "texto": a_texto, "markdown": a_markdown}
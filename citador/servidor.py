@@ -0,0 +1,213 @@
+# citador/servidor.py
+# Servidor HTTP/1.1 mínimo sobre asyncio para correr una app ASGI sin
+# dependencias (uvicorn es opcional). Soporta keep-alive, cuerpos con
+# Content-Length o chunked que la app lee de a trozos, respuestas en streaming
+# (chunked) y el ciclo lifespan. Pensado para uso local y pruebas de carga,
+# detrás de la red interna; no para exponer a internet.
+#
+# Toda lectura tiene plazo: una conexión keep-alive sin petición nueva se
+# cierra a los TIEMPO_INACTIVO segundos. Si un cliente no termina la línea de
+# petición o las cabeceras en TIEMPO_LECTURA segundos recibe 408; si deja de
+# enviar el cuerpo, la app recibe http.disconnect y la conexión se cierra al
+# responder. Una línea de petición o cabecera que no se puede interpretar
+# recibe 400.
+import asyncio
+import json
+import sys
+from urllib.parse import unquote
+
+_RAZONES = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    408: "Request Timeout", 413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+}
+_TROZO = 65536
+TIEMPO_INACTIVO = 15.0    # segundos de keep-alive sin petición nueva
+TIEMPO_LECTURA = 30.0     # segundos para cada línea o trozo de una petición en curso
+
+
+class _PeticionInvalida(Exception):
+    def __init__(self, estado):
+        super().__init__(estado)
+        self.estado = estado
+
+
+class _Conexion:
+    def __init__(self, app, reader, writer, tiempo_inactivo=TIEMPO_INACTIVO, tiempo_lectura=TIEMPO_LECTURA):
+        self.app = app
+        self.reader = reader
+        self.writer = writer
+        self.tiempo_inactivo = tiempo_inactivo
+        self.tiempo_lectura = tiempo_lectura
+
+    async def atender(self):
+        try:
+            while await self._una_peticion():
+                pass
+        except _PeticionInvalida as e:
+            await self._error(e.estado)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.writer.close()
+
+    async def _error(self, estado):
+        """Respuesta de error antes de llamar a la app; después se cierra la conexión."""
+        cuerpo = json.dumps({"error": _RAZONES[estado]}).encode()
+        self.writer.write(f"HTTP/1.1 {estado} {_RAZONES[estado]}\r\ncontent-type: application/json\r\n"
+                          f"content-length: {len(cuerpo)}\r\nconnection: close\r\n\r\n".encode("latin-1") + cuerpo)
+        try:
+            await asyncio.wait_for(self.writer.drain(), self.tiempo_lectura)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+
+    async def _leer_linea(self, plazo):
+        """readline con plazo (408 si vence); una línea más larga que el límite del stream es 400."""
+        try:
+            return await asyncio.wait_for(self.reader.readline(), plazo)
+        except asyncio.TimeoutError:
+            raise _PeticionInvalida(408) from None
+        except ValueError:
+            raise _PeticionInvalida(400) from None
+
+    async def _una_peticion(self):
+        reader, writer = self.reader, self.writer
+        try:
+            linea = await asyncio.wait_for(reader.readline(), self.tiempo_inactivo)
+        except asyncio.TimeoutError:
+            return False        # keep-alive inactivo: se cierra sin responder
+        except ValueError:
+            raise _PeticionInvalida(400) from None
+        if not linea:
+            return False
+        partes = linea.decode("latin-1").rstrip("\r\n").split(" ")
+        if len(partes) != 3 or not partes[0] or not partes[2].startswith("HTTP/1."):
+            raise _PeticionInvalida(400)
+        metodo, objetivo, version = partes
+        headers = []
+        while True:
+            h = await self._leer_linea(self.tiempo_lectura)
+            if h in (b"\r\n", b"\n", b""):
+                break
+            k, separador, v = h.decode("latin-1").partition(":")
+            if not separador or not k.strip() or k != k.rstrip():
+                raise _PeticionInvalida(400)
+            headers.append((k.strip().lower().encode("latin-1"), v.strip().encode("latin-1")))
+        hd = dict(headers)
+        ruta, _, query = objetivo.partition("?")
+        keep_alive = version == "HTTP/1.1" and hd.get(b"connection", b"").lower() != b"close"
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": version[5:], "method": metodo,
+            "scheme": "http", "path": unquote(ruta), "raw_path": ruta.encode("latin-1"),
+            "query_string": query.encode("latin-1"), "root_path": "", "headers": headers,
+            "client": writer.get_extra_info("peername"), "server": writer.get_extra_info("sockname"),
+        }
+
+        chunked = hd.get(b"transfer-encoding", b"").lower() == b"chunked"
+        try:
+            restante = int(hd.get(b"content-length", b"0") or 0)
+        except ValueError:
+            raise _PeticionInvalida(400) from None
+        if restante < 0:
+            raise _PeticionInvalida(400)
+        fin = not chunked and restante == 0
+        leido_vacio = False
+        cortada = False     # el cliente dejó de enviar el cuerpo: se cierra después
+
+        async def leer_trozo():
+            nonlocal restante, fin, leido_vacio
+            if chunked:
+                tam = int((await reader.readline()).split(b";")[0], 16)
+                if tam == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass    # trailers
+                    fin = leido_vacio = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                datos = await reader.readexactly(tam)
+                await reader.readline()
+                return {"type": "http.request", "body": datos, "more_body": True}
+            datos = await reader.readexactly(min(restante, _TROZO))
+            restante -= len(datos)
+            fin = leido_vacio = restante == 0
+            return {"type": "http.request", "body": datos, "more_body": not fin}
+
+        async def receive():
+            nonlocal fin, leido_vacio, cortada
+            if fin:
+                if not leido_vacio:
+                    leido_vacio = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                return {"type": "http.disconnect"}
+            try:
+                return await asyncio.wait_for(leer_trozo(), self.tiempo_lectura)
+            except asyncio.TimeoutError:
+                # Para la app es como si el cliente se hubiera ido
+                fin = leido_vacio = cortada = True
+                return {"type": "http.disconnect"}
+
+        respuesta_chunked = False
+
+        async def send(msg):
+            nonlocal respuesta_chunked
+            if msg["type"] == "http.response.start":
+                hs = list(msg.get("headers", []))
+                nombres = {k.lower() for k, _ in hs}
+                if b"content-length" not in nombres:
+                    respuesta_chunked = True
+                    hs.append((b"transfer-encoding", b"chunked"))
+                if not keep_alive:
+                    hs.append((b"connection", b"close"))
+                estado = msg["status"]
+                cabecera = [f"HTTP/1.1 {estado} {_RAZONES.get(estado, '')}".encode("latin-1")]
+                cabecera += [k + b": " + v for k, v in hs]
+                writer.write(b"\r\n".join(cabecera) + b"\r\n\r\n")
+            elif msg["type"] == "http.response.body":
+                cuerpo = msg.get("body", b"")
+                if respuesta_chunked:
+                    if cuerpo:
+                        writer.write(f"{len(cuerpo):x}\r\n".encode("latin-1") + cuerpo + b"\r\n")
+                    if not msg.get("more_body", False):
+                        writer.write(b"0\r\n\r\n")
+                else:
+                    writer.write(cuerpo)
+                await writer.drain()
+
+        await self.app(scope, receive, send)
+        # Lo que la app no leyó del cuerpo se descarta para poder seguir con keep-alive
+        while not fin:
+            await receive()
+        return keep_alive and not cortada
+
+
+async def _lifespan(app, evento, cola_entrada, cola_salida):
+    await cola_entrada.put({"type": f"lifespan.{evento}"})
+    msg = await cola_salida.get()
+    if msg["type"].endswith(".failed"):
+        raise RuntimeError(msg.get("message", f"lifespan.{evento} falló"))
+
+async def servir(app, host="127.0.0.1", puerto=8000, al_escuchar=None,
+                 tiempo_inactivo=TIEMPO_INACTIVO, tiempo_lectura=TIEMPO_LECTURA):
+    """Sirve app hasta que se cancele la tarea. al_escuchar(puerto) se llama con el puerto real."""
+    entrada, salida = asyncio.Queue(), asyncio.Queue()
+    tarea_lifespan = asyncio.ensure_future(app({"type": "lifespan", "asgi": {"version": "3.0"}},
+                                               entrada.get, salida.put))
+    await _lifespan(app, "startup", entrada, salida)
+    servidor = await asyncio.start_server(
+        lambda r, w: _Conexion(app, r, w, tiempo_inactivo, tiempo_lectura).atender(), host, puerto,
+        limit=_TROZO * 4)
+    puerto_real = servidor.sockets[0].getsockname()[1]
+    if al_escuchar:
+        al_escuchar(puerto_real)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await _lifespan(app, "shutdown", entrada, salida)
+        await tarea_lifespan
+
+def correr(app, host="127.0.0.1", puerto=8000):
+    def avisar(p):
+        print(f"escuchando en http://{host}:{p}", file=sys.stderr, flush=True)
+    try:
+        asyncio.run(servir(app, host, puerto, avisar))
+    except KeyboardInterrupt:
+        pass
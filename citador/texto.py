@@ -0,0 +1,78 @@
+# citador/texto.py
+# Utilidades de texto compartidas para búsquedas y comparaciones: plegado de
+# mayúsculas y tildes (la ñ se conserva, que en español es otra letra).
+import re
+import unicodedata
+
+_RE_NO_ALFANUM = re.compile(r"[^\w\s]")
+
+
+def _tabla_tildes():
+    # Latin-1 y Latin Extended-A/B precalculados: 'é' -> 'e', 'ñ' se queda
+    tabla = {}
+    for cp in range(0xC0, 0x250):
+        c = chr(cp)
+        base = unicodedata.normalize("NFD", c)
+        if len(base) > 1 and "\u0303" not in base and base[0].isascii():
+            tabla[cp] = base[0]
+    return tabla
+
+_TABLA_TILDES = _tabla_tildes()
+# Lo que la tabla no cubre (marcas combinantes sueltas, otros alfabetos) va
+# por el camino lento con NFD
+_RE_FUERA_DE_TABLA = re.compile(r"[^\x00-\x7f\u00aa\u00ba\u00c0-\u024f]")
+
+
+def _tabla_posicional():
+    # Como _TABLA_TILDES, más minúsculas y espacios, siempre 1 carácter por 1
+    tabla = {}
+    for cp in range(0x250):
+        c = chr(cp)
+        if c.isspace():
+            tabla[cp] = " "
+            continue
+        m = c.lower() if len(c.lower()) == 1 else c
+        m = _TABLA_TILDES.get(ord(m), m)
+        if m != c:
+            tabla[cp] = m
+    return tabla
+
+_TABLA_POSICIONAL = _tabla_posicional()
+
+
+def _plegar_lento(t):
+    t = unicodedata.normalize("NFD", t)
+    t = "".join(c for c in t if not unicodedata.combining(c) or c == "\u0303")
+    return unicodedata.normalize("NFC", t)
+
+def plegar(texto):
+    """'  Pérez  Núñez ' -> 'perez nuñez'."""
+    if not texto:
+        return ""
+    t = texto.casefold()
+    if not t.isascii():
+        t = t.translate(_TABLA_TILDES)
+        if _RE_FUERA_DE_TABLA.search(t):
+            t = _plegar_lento(t)
+    return " ".join(t.split())
+
+def plegar_posicional(texto):
+    """
+    Minúsculas, sin tildes (salvo la ñ) y todo espacio como ' ', sin cambiar
+    el largo: la posición i del resultado es la posición i de texto (en NFC).
+    """
+    return texto.translate(_TABLA_POSICIONAL)
+
+def plegar_palabras(texto):
+    """Como plegar, pero además quita la puntuación."""
+    return " ".join(_RE_NO_ALFANUM.sub(" ", plegar(texto)).split())
+
+# La ñ va después de toda palabra con n y antes de la o
+_ORDEN_ENIE = str.maketrans({"ñ": "n\uffff"})
+
+def clave_orden(texto):
+    """
+    Clave de ordenación alfabética en español: sin mayúsculas, tildes ni
+    puntuación, con la ñ como letra propia ('nuñez' < 'nuñoa' < 'ñuñoa' < 'o').
+    """
+    return plegar_palabras(texto).translate(_ORDEN_ENIE)
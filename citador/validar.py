@@ -0,0 +1,361 @@
+# citador/validar.py
+# Validación de registros antes de formatearlos: avisa lo que hoy sale como
+# una referencia rota sin que nadie lo note ("()" por un año vacío,
+# "(trad. , , )", rangos de páginas que mezclan "-" y "–", DOI o URL mal
+# escritos, números de ley o boletines sin punto de miles...).
+#
+# Las reglas de cada tipo son de dos clases:
+#
+#   obligatorios  los campos que la plantilla del tipo (core.PLANTILLAS y, en
+#                 Norma, la de su subtipo) muestra fuera de grupos opcionales,
+#                 más OBLIGATORIOS_EXTRA. Vacíos son un error.
+#   formato       por nombre de campo, con regex compiladas una vez: año,
+#                 páginas, DOI, URL, número de ley, boletín, rol y fechas, y
+#                 unas pocas entre campos (REGLAS_TIPO). Son advertencias, con
+#                 una sugerencia cuando el arreglo es seguro.
+#
+# Las reglas de cada tipo se arman la primera vez que se usan. validar()
+# revisa un registro; validar_filas() y validar_filas_paralelo() un lote de
+# filas como las de 'formatear', en orden y sin acumular.
+#
+#   python -m citador validar registros.csv -o avisos.jsonl --resumen resumen.json
+#   python -m citador validar citas.sqlite3 --biblioteca
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import PLANTILLAS, PLANTILLAS_NORMA, clasificar_norma
+from .fechas import parsear_fecha
+from .plantillas import campos_obligatorios
+from .registros import CLASES, como_registro
+
+ERROR = "error"
+ADVERTENCIA = "advertencia"
+
+# codigo: identificador estable de la regla (para filtrar el informe);
+# sugerencia: valor corregido del campo, o None
+Aviso = namedtuple("Aviso", "codigo nivel campo mensaje sugerencia")
+
+# Opcionales en la plantilla, pero sin ellos la referencia no sirve
+OBLIGATORIOS_EXTRA = {
+    "Libro": ("titulo",),
+    "Artículo de revista": ("revista",),
+    "Página web o blog": ("url",),
+}
+
+_AÑO_ACTUAL = time.localtime().tm_year
+
+_RE_AÑO = re.compile(r"\d{4}[a-z]?|s\. ?[fd]\.", re.I)
+_PAGINA = r"(?:\d+|[ivxlcdm]+)"
+_RE_PAGINAS = re.compile(rf"{_PAGINA}(?:\s*[-–—]\s*{_PAGINA})?(?:\s*,\s*{_PAGINA}(?:\s*[-–—]\s*{_PAGINA})?)*", re.I)
+_RE_RANGO = re.compile(r"(\d+)\s*[-–—]\s*(\d+)")
+_RE_PREFIJO_PAGINAS = re.compile(r"pp?\.\s*", re.I)
+_RE_DOI = re.compile(r"10\.\d{4,9}/\S+")
+_RE_PREFIJO_DOI = re.compile(r"https?://(?:dx\.)?doi\.org/|doi:\s*", re.I)
+_RE_URL = re.compile(r"https?://[^\s/?#]+\.[^\s/?#]+(?:[/?#]\S*)?", re.I)
+# Leyes chilenas: "18.575", "4.409", "20.000 bis"; boletines: "12.345-04"
+_RE_LEY = re.compile(r"\d{1,3}(?:\.\d{3})?(?: bis)?", re.I)
+_RE_BOLETIN = re.compile(r"\d{1,3}(?:\.\d{3})?-\d{2}")
+_RE_SIN_PUNTO = re.compile(r"(\d{4,6})((?:-\d{2})?)")
+# Roles "1234-2020", "C-1.234-2019", "O-12-2020" (RIT); RUC "2010012345-6"
+_RE_ROL = re.compile(r"(?<![\w.])(?:[a-z]{1,3}-)?\d{1,3}(?:\.?\d{3})*-\d{4}\b|\b\d{8,10}-[\dk]\b", re.I)
+_RE_PREFIJO_ROL = re.compile(r"rol\b\s*(?:n[°º.]?\s*)?", re.I)
+
+
+def etiqueta(tipo, campo):
+    """La etiqueta del formulario, sin lo que va entre paréntesis ni los ejemplos."""
+    for c in CLASES[tipo].campos:
+        if c.nombre == campo:
+            return re.split(r" \(| —", c.etiqueta)[0]
+    return campo
+
+def _con_punto(numero):
+    return f"{int(numero):,}".replace(",", ".")
+
+
+# ---------------- Reglas de formato por campo ----------------
+# Cada una recibe (tipo, campo, valor, avisos) y agrega sus avisos
+def _año(tipo, campo, valor, avisos):
+    if not _RE_AÑO.fullmatch(valor):
+        avisos.append(Aviso("año_formato", ADVERTENCIA, campo,
+                            f"{etiqueta(tipo, campo)}: '{valor}' no es un año (ej. 2020, 2020a o s.f.)", None))
+    elif valor[:4].isdigit() and int(valor[:4]) > _AÑO_ACTUAL + 1:
+        avisos.append(Aviso("año_futuro", ADVERTENCIA, campo, f"{etiqueta(tipo, campo)}: {valor} es un año futuro",
+                            None))
+
+def _paginas(tipo, campo, valor, avisos):
+    nombre = etiqueta(tipo, campo)
+    prefijo = _RE_PREFIJO_PAGINAS.match(valor)
+    if prefijo:
+        valor = valor[prefijo.end():]
+        avisos.append(Aviso("paginas_prefijo", ADVERTENCIA, campo,
+                            f"{nombre}: el 'p.'/'pp.' lo agrega la cita; quedaría repetido", valor))
+    if "–" in valor or "—" in valor:
+        mensaje = "mezcla '-' y '–'" if "-" in valor else "rango con raya"
+        avisos.append(Aviso("paginas_guion", ADVERTENCIA, campo, f"{nombre}: {mensaje}; los rangos van con guion",
+                            re.sub(r"\s*[–—]\s*", "-", valor)))
+    if not _RE_PAGINAS.fullmatch(valor):
+        avisos.append(Aviso("paginas_formato", ADVERTENCIA, campo,
+                            f"{nombre}: '{valor}' no es una página o rango (ej. 45 o 45-47)", None))
+        return
+    for m in _RE_RANGO.finditer(valor):
+        if int(m.group(2)) < int(m.group(1)):
+            avisos.append(Aviso("paginas_rango", ADVERTENCIA, campo,
+                                f"{nombre}: el rango {m.group(0)} termina antes de empezar", None))
+
+def _doi(tipo, campo, valor, avisos):
+    prefijo = _RE_PREFIJO_DOI.match(valor)
+    if prefijo:
+        valor = valor[prefijo.end():]
+        avisos.append(Aviso("doi_prefijo", ADVERTENCIA, campo,
+                            "DOI: va sin 'https://doi.org/' ni 'doi:' (la referencia ya dice 'DOI:')", valor))
+    if not _RE_DOI.fullmatch(valor):
+        avisos.append(Aviso("doi_formato", ADVERTENCIA, campo, f"DOI: '{valor}' no parece un DOI (10.xxxx/...)", None))
+
+def _url(tipo, campo, valor, avisos):
+    if not _RE_URL.fullmatch(valor):
+        sugerencia = "https://" + valor if _RE_URL.fullmatch("https://" + valor) else None
+        avisos.append(Aviso("url_formato", ADVERTENCIA, campo,
+                            f"{etiqueta(tipo, campo)}: '{valor}' no es una URL completa (https://...)", sugerencia))
+
+def _sin_punto(codigo, ejemplo, regex, tipo, campo, valor, avisos):
+    if regex.fullmatch(valor):
+        return
+    m = _RE_SIN_PUNTO.fullmatch(valor)
+    sugerencia = _con_punto(m.group(1)) + m.group(2) if m else None
+    if sugerencia is not None and not regex.fullmatch(sugerencia):
+        sugerencia = None
+    avisos.append(Aviso(codigo, ADVERTENCIA, campo,
+                        f"{etiqueta(tipo, campo)}: '{valor}' no tiene el formato de {ejemplo}", sugerencia))
+
+def _ley(tipo, campo, valor, avisos):
+    _sin_punto("ley_formato", "un número de ley (ej. 18.575)", _RE_LEY, tipo, campo, valor, avisos)
+
+def _boletin(tipo, campo, valor, avisos):
+    _sin_punto("boletin_formato", "un boletín (ej. 12.345-04)", _RE_BOLETIN, tipo, campo, valor, avisos)
+
+def _rol(tipo, campo, valor, avisos):
+    prefijo = _RE_PREFIJO_ROL.match(valor)
+    if prefijo:
+        valor = valor[prefijo.end():]
+        avisos.append(Aviso("rol_prefijo", ADVERTENCIA, campo, "Rol: la referencia ya dice 'rol'; quedaría repetido",
+                            valor))
+    if not _RE_ROL.search(valor):
+        avisos.append(Aviso("rol_formato", ADVERTENCIA, campo,
+                            f"Rol: '{valor}' no tiene número y año (ej. 1234-2020)", None))
+
+def _fecha(tipo, campo, valor, avisos):
+    if parsear_fecha(valor) is None:
+        avisos.append(Aviso("fecha_formato", ADVERTENCIA, campo,
+                            f"{etiqueta(tipo, campo)}: no se reconoce '{valor}' como fecha; saldrá tal cual", None))
+
+def _autores(tipo, campo, valor, avisos):
+    for i, a in enumerate(valor, 1):
+        if not a.apellido1 and (a.nombre or a.apellido2):
+            avisos.append(Aviso("autor_incompleto", ADVERTENCIA, campo,
+                                f"{etiqueta(tipo, campo)}: el autor {i} no tiene primer apellido", None))
+
+FORMATO = {
+    "año": _año, "año_original": _año, "paginas": _paginas, "doi": _doi, "url": _url,
+    "boletin": _boletin, "rol": _rol, "fecha": _fecha, "fecha_consulta": _fecha,
+}
+
+
+# ---------------- Reglas entre campos ----------------
+# Cada una recibe (registro, avisos)
+def _traduccion(d, avisos):
+    if d.año_original[:4].isdigit() and d.año[:4].isdigit() and d.año_original[:4] > d.año[:4]:
+        avisos.append(Aviso("año_original", ADVERTENCIA, "año_original",
+                            "Año original: es posterior al año de la traducción", None))
+
+def _web(d, avisos):
+    if not (d.autores or d.autor_sin_autor) or not d.titulo:
+        avisos.append(Aviso("web_solo_url", ADVERTENCIA, None,
+                            "Sin autor (o entidad) y título la referencia es solo la URL", None))
+
+def _norma_ley(d, avisos):
+    if not d.numero:
+        avisos.append(Aviso("ley_sin_numero", ADVERTENCIA, "numero", "Ley sin número: saldrá solo 'Ley'", None))
+
+def _proyecto(d, avisos):
+    if not d.boletin:
+        avisos.append(Aviso("boletin_vacio", ADVERTENCIA, "boletin", "Proyecto de ley sin número de boletín", None))
+
+REGLAS_TIPO = {
+    "Traducción de libro": (_traduccion,),
+    "Página web o blog": (_web,),
+    ("Norma", "ley"): (_norma_ley,),
+    "Proyecto de ley": (_proyecto,),
+}
+# Campos "numero" que son números de ley
+_NUMERO_LEY = ("Historia de la ley", ("Norma", "ley"))
+
+
+# ---------------- Reglas compiladas por tipo ----------------
+Reglas = namedtuple("Reglas", "obligatorios formato entre_campos")
+_reglas = {}
+
+def _armar(tipo, subtipo):
+    ref, cita = PLANTILLAS_NORMA[subtipo] if subtipo else PLANTILLAS[tipo]
+    clave = (tipo, subtipo) if subtipo else tipo
+    nombres = {c.nombre for c in CLASES[tipo].campos}
+    obligatorios = list(campos_obligatorios(ref))
+    obligatorios += [g for g in (campos_obligatorios(cita) if cita else ()) if g not in obligatorios]
+    obligatorios += [(c,) for c in OBLIGATORIOS_EXTRA.get(tipo, ()) if (c,) not in obligatorios]
+    # Un grupo que contiene a otro obligatorio ya se cumple con él
+    obligatorios = [g for g in obligatorios if not any(set(h) < set(g) for h in obligatorios)]
+    autores = {c.nombre for c in CLASES[tipo].campos if c.tipo == "autores"}
+    formato = [(c, FORMATO[c]) for c in FORMATO if c in nombres]
+    formato += [(c, _autores) for c in sorted(autores)]
+    if clave in _NUMERO_LEY:
+        formato.append(("numero", _ley))
+    mensajes = tuple((grupo, autores.issuperset(grupo), _mensaje_vacio(tipo, grupo))
+                     for grupo in obligatorios if nombres.issuperset(grupo))
+    return Reglas(mensajes, tuple(formato), REGLAS_TIPO.get(clave, ()))
+
+def _mensaje_vacio(tipo, grupo):
+    nombres_campos = " o ".join(etiqueta(tipo, c) for c in grupo)
+    if grupo == ("año",):
+        return f'{nombres_campos}: vacío; la referencia sale con "()"'
+    return f"{nombres_campos}: vacío; la referencia queda con un hueco"
+
+def reglas(tipo, registro):
+    """Reglas del tipo (en Norma, del subtipo del registro); se arman una vez."""
+    subtipo = clasificar_norma(registro.tipo_norma, registro.nombre_norma) if tipo == "Norma" else None
+    r = _reglas.get((tipo, subtipo))
+    if r is None:
+        r = _reglas[(tipo, subtipo)] = _armar(tipo, subtipo)
+    return r
+
+
+# ---------------- Validación ----------------
+def validar(tipo, datos):
+    """Lista de Aviso de un registro (o dict de datos) de tipo; vacía si no hay nada que avisar."""
+    d = como_registro(tipo, datos)
+    obligatorios, formato, entre_campos = reglas(tipo, d)
+    avisos = []
+    for grupo, de_autores, mensaje in obligatorios:
+        if de_autores:
+            vacio = not any(a.apellido1 or a.nombre for c in grupo for a in getattr(d, c))
+        else:
+            vacio = not any(getattr(d, c) for c in grupo)
+        if vacio:
+            avisos.append(Aviso("campo_vacio", ERROR, grupo[0], mensaje, None))
+    for campo, regla in formato:
+        valor = getattr(d, campo)
+        if valor:
+            regla(tipo, campo, valor, avisos)
+    for regla in entre_campos:
+        regla(d, avisos)
+    return avisos
+
+def validar_fila(n, fila):
+    """(n, tipo, avisos) de una fila cruda; las que no se pueden leer dan un aviso fila_invalida."""
+    from .lotes import RegistroInvalido, registro_desde_fila
+
+    try:
+        tipo, registro, _ = registro_desde_fila(fila)
+    except RegistroInvalido as e:
+        return n, None, [Aviso("fila_invalida", ERROR, None, str(e), None)]
+    return n, tipo, validar(tipo, registro)
+
+def validar_filas(filas):
+    """Itera (n, tipo, avisos) para cada (n, fila), en orden y sin acumular."""
+    for n, fila in filas:
+        yield validar_fila(n, fila)
+
+def _validar_bloque(bloque):
+    return [validar_fila(n, fila) for n, fila in bloque]
+
+def validar_filas_paralelo(filas, procesos=None, tam_bloque=2000):
+    """
+    Como validar_filas, repartiendo bloques de tam_bloque filas en un pool de
+    procesos (a lo más 2 por proceso en vuelo). Sale en el orden de entrada.
+    """
+    from .lotes import _bloques
+
+    procesos = procesos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        en_vuelo = deque()
+        for bloque in _bloques(filas, tam_bloque):
+            en_vuelo.append(pool.submit(_validar_bloque, bloque))
+            if len(en_vuelo) >= 2 * procesos:
+                yield from en_vuelo.popleft().result()
+        while en_vuelo:
+            yield from en_vuelo.popleft().result()
+
+def resumen(resultados, salida=None):
+    """
+    Consume (n, tipo, avisos); si se da `salida`, escribe en JSONL las filas
+    con avisos. Devuelve los totales (registros, con errores, con
+    advertencias, y avisos por código y por tipo).
+    """
+    total = con_errores = con_advertencias = 0
+    por_codigo, por_tipo = Counter(), Counter()
+    for n, tipo, avisos in resultados:
+        total += 1
+        if not avisos:
+            continue
+        con_errores += any(a.nivel == ERROR for a in avisos)
+        con_advertencias += any(a.nivel == ADVERTENCIA for a in avisos)
+        por_codigo.update(a.codigo for a in avisos)
+        por_tipo[tipo or ""] += 1
+        if salida is not None:
+            salida.write(json.dumps({"n": n, "tipo": tipo, "avisos": [a._asdict() for a in avisos]},
+                                    ensure_ascii=False) + "\n")
+    return {"registros": total, "con_errores": con_errores, "con_advertencias": con_advertencias,
+            "por_codigo": dict(por_codigo.most_common()), "por_tipo": dict(por_tipo.most_common())}
+
+
+# ---------------- CLI ----------------
+def agregar_argumentos(p):
+    from .lotes import FORMATOS_ENTRADA, entero_no_negativo, entero_positivo
+
+    p.add_argument("entrada", help="registros en CSV, JSONL, BibTeX, RIS o CSL-JSON (como 'formatear'), "
+                                   "o una biblioteca SQLite con --biblioteca")
+    p.add_argument("-o", "--salida", default="-", help="JSONL con los avisos de cada fila ('-' = stdout)")
+    p.add_argument("--formato-entrada", choices=FORMATOS_ENTRADA)
+    p.add_argument("--biblioteca", action="store_true", help="la entrada es una biblioteca (citador.biblioteca)")
+    p.add_argument("--resumen", metavar="ARCHIVO", help="guarda los totales por código y tipo en JSON")
+    p.add_argument("--procesos", type=entero_no_negativo, default=1, help="procesos en paralelo (1 = en serie, 0 = uno por núcleo)")
+    p.add_argument("--tam-bloque", type=entero_positivo, default=2000, help="filas por bloque en modo paralelo")
+    p.add_argument("--estricto", action="store_true", help="termina con código 1 también si hay advertencias")
+
+def ejecutar(args):
+    from . import lotes
+
+    t0 = time.perf_counter()
+    salida = lotes.abrir_texto(args.salida, "w")
+    try:
+        if args.biblioteca:
+            from .biblioteca import Biblioteca
+
+            with Biblioteca(args.entrada) as bib:
+                totales = resumen(((e["id"], e["tipo"], validar(e["tipo"], e["datos"])) for e in bib.iterar()),
+                                  salida)
+        else:
+            fmt = args.formato_entrada or lotes.detectar_formato(args.entrada)
+            with lotes.abrir_texto(args.entrada) as entrada:
+                filas = lotes.leer_filas(entrada, fmt)
+                if args.procesos == 1:
+                    resultados = validar_filas(filas)
+                else:
+                    resultados = validar_filas_paralelo(filas, procesos=args.procesos or None,
+                                                        tam_bloque=args.tam_bloque)
+                totales = resumen(resultados, salida)
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    dt = time.perf_counter() - t0
+    if args.resumen:
+        with open(args.resumen, "w", encoding="utf-8") as f:
+            json.dump(dict(totales, segundos=round(dt, 3)), f, ensure_ascii=False, indent=2)
+    print(f"{totales['registros']} registros revisados en {dt:.2f} s: {totales['con_errores']} con errores, "
+          f"{totales['con_advertencias']} con advertencias", file=sys.stderr)
+    for codigo, n in totales["por_codigo"].items():
+        print(f"  {codigo:<18} {n}", file=sys.stderr)
+    return 1 if totales["con_errores"] or (args.estricto and totales["con_advertencias"]) else 0
@@ -0,0 +1,7 @@
+# tests/conftest.py
+# Pruebas con pytest: python -m pytest tests
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
@@ -0,0 +1,150 @@
+# tests/test_importadores.py
+# Lectores de BibTeX, RIS y CSL-JSON (citador.importadores) y su contrato con
+# lotes: una entrada que no se puede leer sale como fila que se rechaza, y la
+# lectura sigue.
+import io
+
+import pytest
+
+from citador import importadores, lotes
+
+
+def leer(lector, texto):
+    return list(lector(io.StringIO(texto)))
+
+def rechazo(fila):
+    with pytest.raises(lotes.RegistroInvalido) as e:
+        lotes.registro_desde_fila(fila)
+    return str(e.value)
+
+
+# ---------------- BibTeX ----------------
+def test_bibtex_llave_sin_cerrar_no_se_come_el_resto():
+    filas = leer(importadores.leer_bibtex, """\
+@book{ok1, author={Pérez, Ana}, title={Uno}, year={2019}, publisher={X}}
+@book{broken, author = {Unclosed, title={x}, year=2020}
+@book{ok2,
+  author={Soto, Luis}, title={Dos}, year={2020}, publisher={Y}
+}
+""")
+    assert [f.get("clave") for f in filas] == ["ok1", "broken", "ok2"]
+    assert "sin cerrar" in rechazo(filas[1])
+    assert filas[2]["datos"]["titulo"] == "Dos"
+
+def test_bibtex_entrada_abierta_al_final_sale_rechazada():
+    filas = leer(importadores.leer_bibtex, "@book{ok, title={Uno}, year=2019}\n@article{cola, title={Tres\n")
+    assert [f.get("clave") for f in filas] == ["ok", "cola"]
+    assert "final del archivo" in rechazo(filas[1])
+
+def test_bibtex_string_meses_y_acentos_latex():
+    filas = leer(importadores.leer_bibtex, r"""
+@comment{se ignora}
+@string{rchd = "Revista Chilena de Derecho"}
+@article{cordero2010,
+  author  = {Cordero Vega, Luis and Fern{\'a}ndez, Jos{\'e} Mar{\'\i}a},
+  title   = {La supletoriedad de la {L}ey de {B}ases},
+  journal = rchd # ", Santiago",
+  year    = 2010, month = jun,
+  volume  = {37}, number = {2}, pages = {235--262},
+  doi     = {10.4067/S0718-34372010000200003}
+}
+""")
+    assert len(filas) == 1
+    f = filas[0]
+    assert (f["tipo"], f["clave"]) == ("Artículo de revista", "cordero2010")
+    d = f["datos"]
+    assert d["autores"] == [{"apellido1": "Cordero", "apellido2": "Vega", "nombre": "Luis"},
+                            {"apellido1": "Fernández", "apellido2": "", "nombre": "José María"}]
+    assert d["titulo"] == "La supletoriedad de la Ley de Bases"
+    assert d["revista"] == "Revista Chilena de Derecho, Santiago"
+    assert (d["año"], d["volumen"], d["numero"], d["paginas"]) == ("2010", "37", "2", "235-262")
+    assert d["doi"] == "10.4067/S0718-34372010000200003"
+
+def test_bibtex_and_others_entidades_y_tipos():
+    filas = leer(importadores.leer_bibtex, """
+@book{colectivo, author = {Pérez, Ana and others}, title = {Obra}, year = {2001}, publisher = {X}}
+@online{tc, author = {{Tribunal Constitucional}}, title = {Cuenta}, year = {2022}, url = {https://tc.cl}}
+@misc{sitio, title = {Blog}, url = {https://ej.cl}, year = {2020}}
+@phdthesis{tesis, author = {Soto, Luis}, title = {T}, school = {U. de Chile}, year = {2015}}
+@patent{p1, title = {Invento}}
+""")
+    assert [f["tipo"] for f in filas] == ["Libro", "Página web o blog", "Página web o blog", "Tesis",
+                                         "bibtex:patent"]
+    assert filas[0]["libro_y_otros"] == "1"
+    assert [a["apellido1"] for a in filas[0]["datos"]["autores"]] == ["Pérez"]
+    assert filas[1]["datos"]["autores"] == [] and filas[1]["datos"]["autor_sin_autor"] == "Tribunal Constitucional"
+    assert filas[3]["datos"]["grado"] == "Doctor"
+    assert "tipo desconocido" in rechazo(filas[4])
+
+
+# ---------------- RIS ----------------
+def test_ris_continuacion_paginas_y_editores():
+    filas = leer(importadores.leer_ris, "\ufeff" + """TY  - CHAP
+ID  - cap1
+AU  - Bordalí Salamanca, Andrés
+A2  - Ferrada Bórquez, Juan Carlos
+TI  - El recurso de protección
+  entre exigencias y posibilidades
+T2  - La justicia administrativa
+PY  - 2005///
+CY  - Santiago
+PB  - LexisNexis
+SP  - 101
+EP  - 146
+ER  - 
+
+TY  - JOUR
+AU  - Cordero, Luis
+TI  - Artículo
+JO  - Revista
+PY  - 2010
+SP  - 235–262
+EP  - 262
+ER  - 
+""")
+    assert [f["tipo"] for f in filas] == ["Capítulo de libro", "Artículo de revista"]
+    d = filas[0]["datos"]
+    assert d["titulo_capitulo"] == "El recurso de protección entre exigencias y posibilidades"
+    assert d["autor_capitulo"] == d["autores"] == [
+        {"apellido1": "Bordalí", "apellido2": "Salamanca", "nombre": "Andrés"}]
+    assert d["editores"] == [{"apellido1": "Ferrada", "apellido2": "Bórquez", "nombre": "Juan Carlos"}]
+    assert (d["titulo_libro"], d["año"], d["paginas"]) == ("La justicia administrativa", "2005", "101-146")
+    assert filas[1]["datos"]["paginas"] == "235-262"   # SP ya trae el rango
+
+def test_ris_tipo_desconocido_y_registro_sin_er():
+    filas = leer(importadores.leer_ris, "TY  - SOUND\nTI  - Disco\nER  - \nTY  - BOOK\nAU  - Kelsen, Hans\n"
+                                        "TI  - Teoría pura\nPY  - 1934\nA4  - Nilve, Moisés\n")
+    assert filas[0] == {"tipo": "ris:SOUND"}
+    assert "tipo desconocido" in rechazo(filas[0])
+    assert filas[1]["tipo"] == "Traducción de libro"
+    assert filas[1]["datos"]["traductor"] == "Moisés Nilve"
+
+
+# ---------------- CSL-JSON ----------------
+def test_csl_nombres_fechas_y_clave():
+    filas = leer(importadores.leer_csl_json, """[
+  {"id": "art", "type": "article-journal", "title": "Artículo", "container-title": "Revista",
+   "author": [{"family": "Fuente Soto", "non-dropping-particle": "de la", "given": "Ana"},
+              {"literal": "Corte Suprema"}],
+   "issued": {"date-parts": [[2019, 5, 2]]}, "page": "1 - 10", "volume": 3, "DOI": "10.1/x"},
+  {"id": 7, "type": "webpage", "title": "Sitio", "URL": "https://ej.cl",
+   "author": [{"family": "Peña", "given": "Carlos"}],
+   "issued": {"date-parts": [["2019-xx"]], "raw": "2019"}, "accessed": {"date-parts": [[2021, 5, 10]]}}
+]""")
+    assert [f["clave"] for f in filas] == ["art", "7"]
+    d = filas[0]["datos"]
+    assert d["autores"] == [{"apellido1": "de la Fuente", "apellido2": "Soto", "nombre": "Ana"},
+                            {"apellido1": "Corte Suprema", "apellido2": "", "nombre": ""}]
+    assert (d["año"], d["paginas"], d["volumen"], d["doi"]) == ("2019", "1-10", "3", "10.1/x")
+    w = filas[1]["datos"]
+    assert (w["año"], w["fecha_consulta"]) == ("2019", "10/05/2021")
+
+def test_csl_jsonl_tipo_desconocido_y_json_roto():
+    filas = leer(importadores.leer_csl_json, '{"type": "book", "title": "Uno", "issued": {"literal": "c. 1990"}}\n'
+                                             '{"type": "map", "title": "Mapa"}\n'
+                                             '"texto suelto"\n'
+                                             '{"type": "book", "title": ')
+    assert [f["tipo"] for f in filas] == ["Libro", "csl:map", "csl:?", "csl:?"]
+    assert filas[0]["datos"]["año"] == "1990"
+    assert "tipo desconocido" in rechazo(filas[1])
+    assert "entrada ilegible" in rechazo(filas[3])
@@ -0,0 +1,25 @@
+# tests/test_lotes.py
+# Opciones de la CLI de lotes: --procesos y --tam-bloque fuera de rango se
+# rechazan en argparse y no llegan al pool.
+import argparse
+
+import pytest
+
+from citador import api, lotes, validar
+
+
+@pytest.mark.parametrize("modulo", [lotes, validar, api])
+@pytest.mark.parametrize("opcion", [["--procesos", "-2"], ["--procesos", "x"], ["--tam-bloque", "0"]])
+def test_opciones_fuera_de_rango_son_error_de_uso(modulo, opcion, capsys):
+    p = argparse.ArgumentParser()
+    modulo.agregar_argumentos(p)
+    entrada = [] if modulo is api else ["x.csv"]
+    with pytest.raises(SystemExit) as e:
+        p.parse_args(entrada + opcion)
+    assert e.value.code == 2
+    assert opcion[0] in capsys.readouterr().err
+
+def test_procesos_cero_es_uno_por_nucleo():
+    p = argparse.ArgumentParser()
+    lotes.agregar_argumentos(p)
+    assert p.parse_args(["x.csv", "--procesos", "0"]).procesos == 0
@@ -0,0 +1,207 @@
+# tests/test_plantillas.py
+# Salida fija de los 14 tipos (referencia en texto, en HTML y cita abreviada)
+# sobre registros de ejemplo. Norma va por subtipo, con las dos ramas de texto
+# fijo: el tratado sin país y UNIÓN EUROPEA.
+import pytest
+
+from citador.core import TIPOS, clasificar_norma, generar_cita
+
+
+def A(apellido1, apellido2="", nombre=""):
+    return {"apellido1": apellido1, "apellido2": apellido2, "nombre": nombre}
+
+def sc(texto):
+    return f"<span style='font-variant: small-caps'>{texto}</span>"
+
+
+# ---------------- Casos ----------------
+# (tipo, datos, referencia en texto, cita abreviada)
+CASOS = [
+    ("Libro",
+     {"autores": [A("Alessandri", "Rodríguez", "Arturo"), A("Somarriva", "Undurraga", "Manuel")], "año": "1998",
+      "titulo": "Tratado de derecho civil", "ciudad": "Santiago", "editorial": "Editorial Jurídica de Chile",
+      "edicion": "Sexta", "tomo": "1", "paginas": "45-47"},
+     "ALESSANDRI RODRÍGUEZ, Arturo y SOMARRIVA UNDURRAGA, Manuel (1998): Tratado de derecho civil, Tomo I "
+     "(Santiago, Editorial Jurídica de Chile, Sexta edición).",
+     "ALESSANDRI y SOMARRIVA (1998), pp. 45-47"),
+    ("Traducción de libro",
+     {"autores": [A("Kelsen", "", "Hans")], "año_original": "1934", "año": "2009", "titulo": "Teoría pura del derecho",
+      "traductor": "Moisés Nilve", "ciudad": "Buenos Aires", "editorial": "Eudeba"},
+     "KELSEN, Hans ([1934] 2009): Teoría pura del derecho (trad. Moisés Nilve, Buenos Aires, Eudeba).",
+     "KELSEN (2009)"),
+    ("Capítulo de libro",
+     {"autores": [A("Bordalí", "Salamanca", "Andrés")], "autor_capitulo": [A("Bordalí", "Salamanca", "Andrés")],
+      "editores": [A("Ferrada", "Bórquez", "Juan Carlos")], "año": "2005", "titulo_capitulo": "El recurso de protección",
+      "titulo_libro": "La justicia administrativa", "ciudad": "Santiago", "editorial": "LexisNexis",
+      "paginas": "101-146"},
+     'BORDALÍ SALAMANCA, Andrés (2005): "El recurso de protección", en FERRADA BÓRQUEZ, Juan Carlos (edit.), '
+     "La justicia administrativa (Santiago, LexisNexis) pp. 101-146.",
+     "BORDALÍ (2005), pp. 101-146"),
+    ("Artículo de revista",
+     {"autores": [A("Cordero", "Vega", "Luis")], "año": "2010", "titulo": "La supletoriedad de la Ley de Bases",
+      "revista": "Revista Chilena de Derecho", "volumen": "37", "numero": "2", "paginas": "235-262",
+      "doi": "10.4067/S0718-34372010000200003"},
+     'CORDERO VEGA, Luis (2010): "La supletoriedad de la Ley de Bases", Revista Chilena de Derecho, vol. 37, N° 2: '
+     "pp. 235-262. DOI: 10.4067/S0718-34372010000200003.",
+     "CORDERO (2010), pp. 235-262"),
+    ("Decreto / Oficio / Reglamento",
+     {"pais": "Chile", "organismo": "Ministerio del Interior", "tipo": "Decreto", "numero": "1.234",
+      "titulo": "Aprueba reglamento", "año": "2019"},
+     "CHILE, MINISTERIO DEL INTERIOR, Decreto 1.234, Aprueba reglamento (2019).",
+     "CHILE, Decreto 1.234"),
+    ("Proyecto de ley",
+     {"pais": "Chile", "nombre": "Proyecto de ley de datos personales", "boletin": "11.144-07", "año": "2017"},
+     "CHILE, Proyecto de ley de datos personales (Boletín N° 11.144-07, 2017).",
+     "CHILE, Proyecto de ley 11.144-07"),
+    ("Proyecto de ley",
+     {"pais": "Chile", "año": "2017"},
+     "CHILE, Proyecto de ley (2017).",
+     "CHILE, Proyecto de ley"),
+    ("Historia de la ley",
+     {"pais": "Chile", "numero": "20.285", "titulo": "Sobre acceso a la información pública", "año": "2008"},
+     "CHILE, Historia de la Ley N° 20.285, Sobre acceso a la información pública (2008).",
+     "CHILE, Historia de la Ley N° 20.285"),
+    ("Documento internacional (ONU, OEA, etc.)",
+     {"organismo": "Organización de las Naciones Unidas", "titulo": "Declaración Universal de Derechos Humanos",
+      "año": "1948"},
+     "ORGANIZACIÓN DE LAS NACIONES UNIDAS, Declaración Universal de Derechos Humanos (1948).",
+     "ORGANIZACIÓN DE LAS NACIONES UNIDAS, Declaración Universal de Derechos Humanos"),
+    ("Instrumento emanado de congreso / conferencia",
+     {"nombre": "Declaración de Río sobre Medio Ambiente y Desarrollo",
+      "conferencia": "Conferencia de las Naciones Unidas sobre Medio Ambiente y Desarrollo", "año": "1992"},
+     "Declaración de Río sobre Medio Ambiente y Desarrollo, Conferencia de las Naciones Unidas sobre Medio Ambiente "
+     "y Desarrollo (1992).",
+     "Declaración de Río sobre Medio Ambiente y Desarrollo"),
+    ("Jurisprudencia",
+     {"estado": "Chile", "tribunal": "Corte Suprema", "fecha": "2019-03-05", "rol": "1234-2018",
+      "nombre_caso": "Pérez con Fisco", "info_extra": "protección", "fuente": "vLex"},
+     "CHILE, Corte Suprema, 05/03/2019, rol 1234-2018 (Pérez con Fisco), protección. Fuente: vLex.",
+     "Corte Suprema, 05/03/2019"),
+    ("Jurisprudencia internacional",
+     {"tribunal": "Corte Interamericana de Derechos Humanos", "nombre_caso": "Velásquez Rodríguez vs. Honduras",
+      "fecha": "29 de julio de 1988", "serie": "Serie C N° 4"},
+     "CORTE INTERAMERICANA DE DERECHOS HUMANOS, Velásquez Rodríguez vs. Honduras, Sentencia de 29 de julio de 1988 "
+     "(Serie C N° 4).",
+     "CORTE INTERAMERICANA DE DERECHOS HUMANOS, Velásquez Rodríguez vs. Honduras (29 de julio de 1988)"),
+    ("Página web o blog",
+     {"autores": [A("Peña", "", "Carlos")], "año": "2021", "titulo": "La nueva Constitución",
+      "url": "https://example.org/columna", "fecha_consulta": "10 de mayo de 2021"},
+     "PEÑA, Carlos (2021): La nueva Constitución, Disponible en: https://example.org/columna. "
+     "Fecha de consulta: 10 de mayo de 2021.",
+     "PEÑA, CARLOS (2021)"),
+    ("Página web o blog",
+     {"autor_sin_autor": "Tribunal Constitucional", "año": "2022", "titulo": "Cuenta pública",
+      "url": "https://www.tribunalconstitucional.cl"},
+     "Tribunal Constitucional (2022): Cuenta pública, Disponible en: https://www.tribunalconstitucional.cl.",
+     "TRIBUNAL CONSTITUCIONAL (2022)"),
+    ("Tesis",
+     {"autores": [A("González", "Pérez", "María")], "año": "2015", "titulo": "El principio de probidad",
+      "grado": "Licenciada en Ciencias Jurídicas y Sociales",
+      "institucion": "Facultad de Derecho de la Universidad de Chile", "paginas": "12"},
+     "GONZÁLEZ PÉREZ, María (2015): El principio de probidad. Memoria para optar al grado de Licenciada en "
+     "Ciencias Jurídicas y Sociales en la Facultad de Derecho de la Universidad de Chile.",
+     "GONZÁLEZ (2015), p. 12"),
+]
+
+# Norma: (subtipo, datos, referencia en texto, cita abreviada)
+CASOS_NORMA = [
+    ("constitucion",
+     {"pais": "Chile", "tipo_norma": "Constitución Política de la República", "año": "1980"},
+     "CHILE, Constitución Política de la República (1980).",
+     "CHILE, Constitución Política de la República"),
+    ("ley",
+     {"pais": "Chile", "tipo_norma": "Ley", "numero": "18.575",
+      "nombre_norma": "Ley Orgánica Constitucional de Bases Generales de la Administración del Estado", "año": "1986"},
+     "CHILE, Ley N° 18.575. Ley Orgánica Constitucional de Bases Generales de la Administración del Estado (1986).",
+     "CHILE, Ley N° 18.575"),
+    ("codigo",
+     {"pais": "Chile", "tipo_norma": "Código", "nombre_norma": "Código Civil"},
+     "CHILE, Código Civil (s.d.).",
+     "CHILE, Código Civil"),
+    ("decreto",
+     {"pais": "Chile", "tipo_norma": "Decreto Supremo", "organismo": "Ministerio de Salud", "numero": "3",
+      "nombre_norma": "Reglamento de autorización de licencias médicas", "año": "1984"},
+     "CHILE, MINISTERIO DE SALUD, Decreto Supremo 3, Reglamento de autorización de licencias médicas (1984).",
+     "CHILE, Decreto Supremo 3"),
+    ("tratado",
+     {"pais": "Chile", "tipo_norma": "Tratado", "nombre_norma": "Convención Americana sobre Derechos Humanos",
+      "año": "1969"},
+     "Convención Americana sobre Derechos Humanos (1969).",
+     "Convención Americana sobre Derechos Humanos"),
+    ("union_europea",
+     {"pais": "Chile", "tipo_norma": "Directiva", "nombre_norma": "Directiva 95/46/CE", "año": "1995"},
+     "UNIÓN EUROPEA, Directiva 95/46/CE, de 1995.",
+     "UNIÓN EUROPEA, Directiva 95/46/CE"),
+    ("sin_tipo",
+     {"pais": "Chile", "nombre_norma": "Auto Acordado sobre tramitación del recurso de protección", "año": "2007"},
+     "CHILE, Auto Acordado sobre tramitación del recurso de protección (2007).",
+     "CHILE, Auto Acordado sobre tramitación del recurso de protección"),
+    ("otra",
+     {"pais": "Chile", "tipo_norma": "Resolución Exenta", "organismo": "Servicio de Impuestos Internos",
+      "numero": "55", "año": "2020"},
+     "CHILE, SERVICIO DE IMPUESTOS INTERNOS, Resolución Exenta 55 (2020).",
+     "CHILE, Resolución Exenta 55"),
+]
+
+
+def test_los_casos_cubren_todos_los_tipos():
+    assert {tipo for tipo, *_ in CASOS} | {"Norma"} == set(TIPOS)
+    assert len(TIPOS) == 14
+
+
+@pytest.mark.parametrize("tipo, datos, texto, cita", CASOS, ids=[c[0] for c in CASOS])
+def test_referencia_y_cita(tipo, datos, texto, cita):
+    _, ref_texto, ref_cita = generar_cita(tipo, datos)
+    assert ref_texto == texto
+    assert ref_cita == cita
+
+
+@pytest.mark.parametrize("subtipo, datos, texto, cita", CASOS_NORMA, ids=[c[0] for c in CASOS_NORMA])
+def test_norma_por_subtipo(subtipo, datos, texto, cita):
+    assert clasificar_norma(datos.get("tipo_norma", ""), datos.get("nombre_norma", "")) == subtipo
+    _, ref_texto, ref_cita = generar_cita("Norma", datos)
+    assert ref_texto == texto
+    assert ref_cita == cita
+
+
+def test_constitucion_por_el_nombre():
+    datos = {"pais": "Chile", "tipo_norma": "Decreto Supremo", "numero": "100",
+             "nombre_norma": "Texto refundido de la Constitución Política de la República", "año": "2005"}
+    assert clasificar_norma(datos["tipo_norma"], datos["nombre_norma"]) == "constitucion"
+    assert generar_cita("Norma", datos)[1] == \
+        "CHILE, Texto refundido de la Constitución Política de la República (2005)."
+
+
+# ---------------- HTML ----------------
+def test_html_autores_en_versalitas_y_titulo_en_cursiva():
+    ref_html = generar_cita(*CASOS[0][:2])[0]
+    assert ref_html == (
+        f"{sc('ALESSANDRI RODRÍGUEZ')}, Arturo y {sc('SOMARRIVA UNDURRAGA')}, Manuel (1998): "
+        "<i>Tratado de derecho civil</i>, Tomo I (Santiago, Editorial Jurídica de Chile, Sexta edición).")
+
+def test_html_revista_en_cursiva():
+    ref_html = generar_cita(*CASOS[3][:2])[0]
+    assert ref_html == (
+        f'{sc("CORDERO VEGA")}, Luis (2010): "La supletoriedad de la Ley de Bases", '
+        "<i>Revista Chilena de Derecho</i>, vol. 37, N° 2: pp. 235-262. DOI: 10.4067/S0718-34372010000200003.")
+
+@pytest.mark.parametrize("subtipo, html", [
+    ("ley", "CHILE, Ley N° 18.575. <i>Ley Orgánica Constitucional de Bases Generales de la Administración del "
+            "Estado</i> (1986)."),
+    ("tratado", "<i>Convención Americana sobre Derechos Humanos</i> (1969)."),
+    ("union_europea", "UNIÓN EUROPEA, <i>Directiva 95/46/CE</i>, de 1995."),
+])
+def test_html_norma(subtipo, html):
+    datos = next(d for s, d, *_ in CASOS_NORMA if s == subtipo)
+    assert generar_cita("Norma", datos)[0] == html
+
+
+# ---------------- y otros ----------------
+def test_umbral_y_otros():
+    datos = {"autores": [A("Uno", "", "A"), A("Dos", "", "B"), A("Tres", "", "C")], "año": "2000",
+             "titulo": "Obra colectiva", "editorial": "Tirant lo Blanch"}
+    _, texto, cita = generar_cita("Libro", datos, {"y_otros_threshold": 3})
+    assert (texto, cita) == ("UNO, A y otros (2000): Obra colectiva (Tirant lo Blanch).", "UNO y otros (2000)")
+    _, texto, cita = generar_cita("Libro", datos, {"y_otros_threshold": 4})
+    assert (texto, cita) == ("UNO, A y DOS, B y TRES, C (2000): Obra colectiva (Tirant lo Blanch).",
+                             "UNO y DOS y TRES (2000)")